@@ -36,6 +36,7 @@ class AIInterviewer:
         await self.meeting.async_join()
 
         self.stt.set_pubsub(pubsub=self.publish_message)
+        self.stt.set_barge_in(barge_in=self.on_barge_in)
         self.intelligence.set_pubsub(pubsub=self.publish_message)
 
     def publish_message(self, message):
@@ -46,6 +47,11 @@ class AIInterviewer:
             )
         ))
 
+    def on_barge_in(self, peer_id: str, peer_name: str):
+        # candidate started talking over the interviewer, runs on the STT callback thread
+        print(f"[{peer_name}] barge-in")
+        self.audio_track.interrupt()
+
     async def leave(self):
         print("leaving meeting...")
         self.meeting.leave()
@@ -68,13 +74,15 @@ class MyMeetingEventListener(MeetingEventHandler):
 
     def on_participant_joined(self, participant: Participant):
         print(f"Participant {participant.display_name} joined")
+        # open the STT connection now so it is warm when they unmute
+        self.stt.prepare(peer_id=participant.id, peer_name=participant.display_name)
         participant.add_event_listener(
             MyParticipantEventListener(stt=self.stt, participant=participant)
         )
 
     def on_participant_left(self, participant: Participant):
         print(f"Participant {participant.display_name} left")
-        self.stt.stop(peer_id=participant.id)
+        self.stt.close(peer_id=participant.id)
 
 
 class MyParticipantEventListener(ParticipantEventHandler):
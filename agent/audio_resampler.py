@@ -0,0 +1,125 @@
+from math import gcd
+
+import numpy as np
+from numpy.lib.stride_tricks import as_strided
+
+# filter taps per polyphase branch of the streaming resampler
+RESAMPLER_TAPS = 16
+
+
+class StreamingResampler:
+    """Polyphase windowed-sinc resampler for chunked int16 PCM.
+
+    Converts any input rate and channel count to another rate and layout:
+    TTS audio to the track's, candidate audio to the STT format. The last
+    ``taps - 1`` input samples and the fractional output phase are carried
+    between chunks, so chunk boundaries are seamless.
+
+    An integer ratio down, such as 48 kHz to 16 kHz, has a single phase;
+    it is filtered as a plain FIR over strided windows of the input, with
+    the same filter as the general path and output equal to within one LSB.
+    """
+
+    def __init__(
+        self,
+        input_rate: int,
+        output_rate: int,
+        input_channels: int = 1,
+        output_channels: int = 1,
+        taps: int = RESAMPLER_TAPS,
+    ):
+        self.input_rate = input_rate
+        self.output_rate = output_rate
+        self.input_channels = input_channels
+        self.output_channels = output_channels
+        self.taps = taps
+
+        g = gcd(input_rate, output_rate)
+        self.up = output_rate // g
+        self.down = input_rate // g
+        self._bank = self._design_bank()
+        # downmix weights, one per input channel
+        self._mix_weights = np.full(input_channels, 1 / input_channels, dtype=np.float32)
+
+        self._history = np.zeros((taps - 1, output_channels), dtype=np.float32)
+        # position of the next output sample, in 1/up input samples from the history start
+        self._pos = 0
+        self._carry = b""
+
+    def _design_bank(self) -> np.ndarray:
+        # prototype low-pass at the upsampled rate, cut below the lower Nyquist
+        length = self.taps * self.up
+        cutoff = 0.5 * min(1.0, self.up / self.down) / self.up * 0.9
+        n = np.arange(length) - (length - 1) / 2
+        h = 2 * cutoff * np.sinc(2 * cutoff * n) * np.kaiser(length, 6.0)
+        # unity DC gain on every phase
+        h *= self.up / h.sum()
+        # bank[phase, j] weights history sample j for an output at that phase
+        j = np.arange(self.taps)
+        phases = np.arange(self.up)
+        return h[(self.taps - 1 - j)[None, :] * self.up + phases[:, None]].astype(np.float32)
+
+    def reset(self):
+        self._history[:] = 0
+        self._pos = 0
+        self._carry = b""
+
+    def _mix(self, x: np.ndarray) -> np.ndarray:
+        if self.input_channels == self.output_channels:
+            return x.astype(np.float32)
+        # a matrix-vector product, much cheaper than mean() across a short axis
+        mono = (x.astype(np.float32) @ self._mix_weights)[:, None]
+        if self.output_channels == 1:
+            return mono
+        # mono or narrower input is spread across every output channel
+        return np.repeat(mono, self.output_channels, axis=1)
+
+    def process_bytes(self, data: bytes) -> np.ndarray:
+        frame_bytes = 2 * self.input_channels
+        if self._carry:
+            data = self._carry + bytes(data)
+            self._carry = b""
+        remainder = len(data) % frame_bytes
+        if remainder:
+            self._carry = bytes(data[-remainder:])
+            data = data[:-remainder]
+        x = np.frombuffer(data, dtype=np.int16).reshape(-1, self.input_channels)
+        return self.process(x)
+
+    def process(self, x: np.ndarray) -> np.ndarray:
+        """Resample ``(samples, input_channels)`` int16 to interleaved int16."""
+        buf = np.concatenate((self._history, self._mix(x)))
+        # outputs whose filter window fits inside what has been received so far
+        last = len(buf) - self.taps
+        if last < 0:
+            self._history = buf
+            return np.zeros(0, dtype=np.int16)
+        count = max(0, ((last + 1) * self.up - 1 - self._pos) // self.down + 1)
+
+        if self.up == 1:
+            y = self._decimate(buf, count)
+        else:
+            p = self._pos + np.arange(count, dtype=np.int64) * self.down
+            base = p // self.up
+            phase = p % self.up
+            index = base[:, None] + np.arange(self.taps)[None, :]
+            y = np.einsum("kjc,kj->kc", buf[index], self._bank[phase])
+
+        consumed = len(buf) - (self.taps - 1)
+        self._pos += count * self.down - consumed * self.up
+        self._history = buf[consumed:]
+        return np.clip(np.rint(y), -32768, 32767).astype(np.int16).reshape(-1)
+
+    def _decimate(self, buf: np.ndarray, count: int) -> np.ndarray:
+        # output k is the dot product of the filter with taps samples from pos + k * down
+        row = buf.strides[0]
+        y = np.empty((count, self.output_channels), dtype=np.float32)
+        for channel in range(self.output_channels):
+            windows = as_strided(
+                buf[self._pos :, channel],
+                shape=(count, self.taps),
+                strides=(row * self.down, row),
+                writeable=False,
+            )
+            y[:, channel] = windows @ self._bank[0]
+        return y
@@ -0,0 +1,168 @@
+import threading
+from typing import Optional
+
+import numpy as np
+
+
+class AudioRingBuffer:
+    """Thread-safe ring of int16 samples.
+
+    The storage has a mirrored tail of ``max_read`` samples, so any read of
+    up to ``max_read`` samples is a contiguous NumPy view regardless of
+    where the read index sits. Both writes and reads are O(n) in the
+    samples moved, never in the samples queued.
+
+    A write that does not fit doubles the storage, up to ``max_capacity``
+    (by default the ring never grows). Only past that hard bound are the
+    oldest queued samples dropped to make room. Growth and drops are
+    counted in get_stats().
+    """
+
+    def __init__(self, capacity: int, max_read: int, max_capacity: Optional[int] = None):
+        if max_read > capacity:
+            raise ValueError("max_read must not exceed capacity")
+        self.capacity = capacity
+        self.max_capacity = max(capacity, max_capacity or capacity)
+        self.max_read = max_read
+        self._buf = np.zeros(capacity + max_read, dtype=np.int16)
+        self._read = 0
+        self._size = 0
+        # odd trailing byte of a write that split a sample in half
+        self._carry = b""
+        self._lock = threading.Lock()
+
+        self.grows = 0
+        self.overruns = 0
+        self.dropped_samples = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def available(self) -> int:
+        return self._size
+
+    @property
+    def free(self) -> int:
+        return self.capacity - self._size
+
+    def clear(self):
+        with self._lock:
+            self._read = 0
+            self._size = 0
+            self._carry = b""
+
+    def write_bytes(self, data: bytes) -> int:
+        """Append little-endian int16 PCM, returns the samples taken."""
+        with self._lock:
+            if self._carry:
+                data = self._carry + bytes(data)
+                self._carry = b""
+            if len(data) % 2:
+                self._carry = bytes(data[-1:])
+                data = data[:-1]
+            if not data:
+                return 0
+            return self._write(np.frombuffer(data, dtype=np.int16))
+
+    def write(self, samples: np.ndarray) -> int:
+        with self._lock:
+            return self._write(np.asarray(samples, dtype=np.int16).reshape(-1))
+
+    def _write(self, samples: np.ndarray) -> int:
+        n = written = len(samples)
+        if n > self.free and self.capacity < self.max_capacity:
+            self._grow(self._size + n)
+        if n > self.free:
+            # past the hard bound, the oldest audio goes
+            self.overruns += 1
+            if n > self.capacity:
+                self.dropped_samples += n - self.capacity
+                samples = samples[n - self.capacity :]
+                n = self.capacity
+            overflow = self._size + n - self.capacity
+            if overflow > 0:
+                self.dropped_samples += overflow
+                self._consume(overflow)
+
+        start = (self._read + self._size) % self.capacity
+        first = min(n, self.capacity - start)
+        self._buf[start : start + first] = samples[:first]
+        if first < n:
+            self._buf[: n - first] = samples[first:]
+
+        # keep the mirrored tail in sync with the head of the ring
+        self._mirror(start, n)
+        self._size += n
+        # dropped samples included, so write positions stay on the input timeline
+        return written
+
+    def _grow(self, needed: int):
+        # amortized: every sample is copied O(1) times however far the ring grows
+        capacity = self.capacity
+        while capacity < needed:
+            capacity *= 2
+        capacity = min(capacity, self.max_capacity)
+        buf = np.zeros(capacity + self.max_read, dtype=np.int16)
+        first = min(self._size, self.capacity - self._read)
+        buf[:first] = self._buf[self._read : self._read + first]
+        buf[first : self._size] = self._buf[: self._size - first]
+        self._buf = buf
+        self.capacity = capacity
+        self._read = 0
+        self._mirror(0, self._size)
+        self.grows += 1
+
+    def _mirror(self, start: int, n: int):
+        if start < self.max_read:
+            end = min(start + n, self.max_read)
+            self._buf[self.capacity + start : self.capacity + end] = self._buf[start:end]
+        if start + n > self.capacity:
+            end = min(start + n - self.capacity, self.max_read)
+            self._buf[self.capacity : self.capacity + end] = self._buf[:end]
+
+    def read_into(self, out: np.ndarray, n: Optional[int] = None) -> int:
+        """Copy up to ``n`` samples into ``out`` and consume them.
+
+        Returns the number of samples copied; the rest of ``out`` is left
+        untouched so callers can zero-pad the tail themselves.
+        """
+        n = len(out) if n is None else n
+        with self._lock:
+            n = min(n, self._size, self.max_read)
+            if n:
+                out[:n] = self._buf[self._read : self._read + n]
+                self._consume(n)
+            return n
+
+    def view(self, n: int) -> Optional[np.ndarray]:
+        """Contiguous, zero-copy view of the next ``n`` samples.
+
+        The view is only valid until the samples are consumed with
+        :meth:`consume`; returns None when fewer than ``n`` are queued.
+        """
+        with self._lock:
+            if n > self._size or n > self.max_read:
+                return None
+            return self._buf[self._read : self._read + n]
+
+    def consume(self, n: int) -> int:
+        with self._lock:
+            n = min(n, self._size)
+            self._consume(n)
+            return n
+
+    def _consume(self, n: int):
+        self._read = (self._read + n) % self.capacity
+        self._size -= n
+        if self._size == 0:
+            self._read = 0
+
+    def get_stats(self) -> dict:
+        return {
+            "available": self._size,
+            "capacity": self.capacity,
+            "grows": self.grows,
+            "overruns": self.overruns,
+            "dropped_samples": self.dropped_samples,
+        }
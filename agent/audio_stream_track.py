@@ -1,84 +1,458 @@
 import asyncio
+from bisect import bisect_left
 from fractions import Fraction
+import sys
 import threading
 import time
 import traceback
-from typing import Iterator, Optional
+from typing import Callable, Iterable, Iterator, List, Optional
 from av import AudioFrame
 from vsaiortc.mediastreams import AudioStreamTrack
 import numpy as np
 
+from agent.audio_resampler import StreamingResampler
+from agent.audio_ring_buffer import AudioRingBuffer
+
 
 AUDIO_PTIME = 0.02
+# TTS audio the playout ring is allocated for; TTS runs faster than real time,
+# so a long answer queues most of itself and the ring grows to hold it
+AUDIO_BUFFER_SECONDS = 120
+# hard bound on that growth, a whole interview of speech; only past it is the
+# oldest unplayed audio dropped, counted in the ring's get_stats()
+AUDIO_BUFFER_MAX_SECONDS = 3600
+
+# TTS ingestion modes: straight onto the event loop, or the legacy polling thread
+INGESTION_LOOP = "loop"
+INGESTION_THREAD = "thread"
+
+# catch-up policies for recv() pacing after an event-loop stall
+PACING_BURST = "burst"      # send the missed frames back to back until on schedule
+PACING_DROP = "drop"        # skip the missed frames and the audio they carried
+PACING_STRETCH = "stretch"  # shift the schedule, nothing is lost or bursted
+# lateness past which recv() treats itself as stalled and applies the policy
+STALL_THRESHOLD_MS = 60
+# upper edges of the frame lateness histogram buckets
+LATENESS_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+# barge-in fade applied to the audio still playing when the candidate cuts in
+FADE_OUT_MS = 10
+
+# native rate of the outbound track, what the Opus encoder runs at
+TRACK_SAMPLE_RATE = 48000
+# frames pre-built for recv(); the WebRTC sender encodes each frame before
+# asking for the next, so a few are plenty
+FRAME_POOL_SIZE = 4
+# a frame is only reused once nothing outside the pool references it; a
+# consumer that holds on to more grows the pool up to this many, 1 s of frames
+FRAME_POOL_MAX_SIZE = 50
 
 
-def build_audio_frame(chunk: bytes) -> AudioFrame:
-    data = np.frombuffer(chunk, dtype=np.int16)
-    data = data.reshape(-1, 1)
-    audio_frame = AudioFrame.from_ndarray(data.T, format="s16", layout="mono")
+def build_playout_ring(sample_rate: int, channels: int = 1) -> AudioRingBuffer:
+    # the ring CustomAudioStreamTrack plays TTS audio out of
+    return AudioRingBuffer(
+        capacity=int(AUDIO_BUFFER_SECONDS * sample_rate * channels),
+        max_read=int(AUDIO_PTIME * sample_rate) * channels,
+        max_capacity=int(AUDIO_BUFFER_MAX_SECONDS * sample_rate * channels),
+    )
+
+
+def build_audio_frame(
+    ring: AudioRingBuffer, samples: int, audio_frame: Optional[AudioFrame] = None
+) -> Optional[AudioFrame]:
+    # copy the next ptime of samples from the ring straight into the frame plane
+    if ring.available < samples:
+        return None
+    if audio_frame is None:
+        audio_frame = AudioFrame(format="s16", layout="mono", samples=samples)
+    plane = np.frombuffer(audio_frame.planes[0], dtype=np.int16)
+    ring.read_into(plane[:samples], samples)
     return audio_frame
 
+
+class PacingStats:
+    """Per-session outbound frame lateness counters and histogram."""
+
+    def __init__(self, buckets_ms: Iterable[float] = LATENESS_BUCKETS_MS):
+        self.buckets_ms = tuple(buckets_ms)
+        self.reset()
+
+    def reset(self):
+        self.frames = 0
+        self.late_frames = 0
+        self.max_lateness_ms = 0.0
+        self.total_lateness_ms = 0.0
+        # one count per bucket plus the overflow bucket
+        self.histogram = [0] * (len(self.buckets_ms) + 1)
+        self.stalls = 0
+        self.dropped_frames = 0
+        self.stretched_ms = 0.0
+
+    def record(self, lateness_ms: float):
+        self.frames += 1
+        lateness_ms = max(0.0, lateness_ms)
+        if lateness_ms > self.buckets_ms[0]:
+            self.late_frames += 1
+        self.max_lateness_ms = max(self.max_lateness_ms, lateness_ms)
+        self.total_lateness_ms += lateness_ms
+        self.histogram[bisect_left(self.buckets_ms, lateness_ms)] += 1
+
+    def snapshot(self) -> dict:
+        labels = [f"<={b}ms" for b in self.buckets_ms] + [f">{self.buckets_ms[-1]}ms"]
+        return {
+            "frames": self.frames,
+            "late_frames": self.late_frames,
+            "mean_lateness_ms": self.total_lateness_ms / self.frames if self.frames else 0.0,
+            "max_lateness_ms": self.max_lateness_ms,
+            "stalls": self.stalls,
+            "dropped_frames": self.dropped_frames,
+            "stretched_ms": self.stretched_ms,
+            "histogram": dict(zip(labels, self.histogram)),
+        }
+
+
+def _refs(pool: List[AudioFrame], index: int) -> int:
+    return sys.getrefcount(pool[index])
+
+
+class AudioFramePool:
+    """Round-robin pools of pre-built silence frames and recyclable audio frames.
+
+    recv() stamps pts, time_base and sample_rate on every frame it returns,
+    so reusing a frame object never changes timing semantics. A frame the
+    consumer still references is never handed out again: the pool skips it
+    and, if every frame is held, allocates a new one.
+    """
+
+    def __init__(
+        self,
+        samples: int,
+        sample_rate: int,
+        size: int = FRAME_POOL_SIZE,
+        max_size: int = FRAME_POOL_MAX_SIZE,
+    ):
+        self.samples = samples
+        self.sample_rate = sample_rate
+        self.max_size = max_size
+        self._silence = [self._new_silence() for _ in range(size)]
+        self._frames = [self._new_frame() for _ in range(size)]
+        self._silence_index = 0
+        self._frame_index = 0
+        # references to a frame only the pool holds, as _refs() counts them
+        self._free_refs = _refs(self._frames, 0)
+
+        self.allocations_avoided = 0
+        # frames allocated because every pooled one was still held
+        self.allocations = 0
+        self._rate_count = 0
+        self._rate_since = time.monotonic()
+
+    def _new_frame(self) -> AudioFrame:
+        frame = AudioFrame(format="s16", layout="mono", samples=self.samples)
+        frame.sample_rate = self.sample_rate
+        return frame
+
+    def _new_silence(self) -> AudioFrame:
+        frame = self._new_frame()
+        for p in frame.planes:
+            p.update(bytes(p.buffer_size))
+        return frame
+
+    def silence(self) -> AudioFrame:
+        frame, self._silence_index = self._take(self._silence, self._silence_index, self._new_silence)
+        return frame
+
+    def frame(self) -> AudioFrame:
+        frame, self._frame_index = self._take(self._frames, self._frame_index, self._new_frame)
+        return frame
+
+    def _take(self, pool: List[AudioFrame], start: int, new: Callable[[], AudioFrame]):
+        # round-robin from start, skipping frames the consumer still holds
+        for offset in range(len(pool)):
+            index = (start + offset) % len(pool)
+            if _refs(pool, index) <= self._free_refs:
+                self._avoided()
+                return pool[index], (index + 1) % len(pool)
+        self.allocations += 1
+        frame = new()
+        if len(pool) < self.max_size:
+            pool.insert(start, frame)
+            return frame, (start + 1) % len(pool)
+        return frame, start
+
+    def _avoided(self):
+        self.allocations_avoided += 1
+        self._rate_count += 1
+
+    def get_allocations_avoided_per_second(self) -> float:
+        # rate since the previous call, like DeepgramSTT.get_usage
+        now = time.monotonic()
+        elapsed = now - self._rate_since
+        rate = self._rate_count / elapsed if elapsed > 0 else 0.0
+        self._rate_count = 0
+        self._rate_since = now
+        return rate
+
 class MediaStreamError(Exception):
     pass
 
 
 class CustomAudioStreamTrack(AudioStreamTrack):
     def __init__(
-        self, loop, handle_interruption: Optional[bool] = True,
+        self,
+        loop,
+        handle_interruption: Optional[bool] = True,
+        ingestion_mode: str = INGESTION_LOOP,
+        sample_rate: int = TRACK_SAMPLE_RATE,
+        pacing_policy: str = PACING_BURST,
+        stall_threshold_ms: float = STALL_THRESHOLD_MS,
     ):
         super().__init__()
         self.loop = loop
         self._start = None
         self._timestamp = 0
 
-        # frame buffer to send frames in videosdk meeting
-        self.frame_buffer = []
-
-        # Audio data buffer to store incoming audio
-        self.audio_data_buffer = bytearray()
-
         # Audio frame properties
         self.frame_time = 0
-        self.sample_rate = 24000
+        self.sample_rate = sample_rate
         self.channels = 1
         self.sample_width = 2
         self.time_base_fraction = Fraction(1, self.sample_rate)
         self.samples = int(AUDIO_PTIME * self.sample_rate)
         self.chunk_size = int(self.samples * self.channels * self.sample_width)
 
-        self._process_audio_task_queue = asyncio.Queue()
-        self._process_audio_thread = threading.Thread(target=self.process_incoming_audio)
-        self._process_audio_thread.daemon = True
-        self._process_audio_thread.start()
+        # sample ring buffer holding TTS audio until recv() plays it out
+        self.audio_buffer = build_playout_ring(self.sample_rate, self.channels)
+
+        # recv() pacing runs on the monotonic clock, immune to wall-clock slews
+        if pacing_policy not in (PACING_BURST, PACING_DROP, PACING_STRETCH):
+            raise ValueError(f"Unknown pacing policy: {pacing_policy}")
+        self.pacing_policy = pacing_policy
+        self.stall_threshold = stall_threshold_ms / 1000
+        self.pacing_stats = PacingStats()
+        self._stalled = False
+        # samples of a partial frame recv() held back, waiting for the rest of it
+        self._partial = 0
+
+        # pre-built silence and recycled audio frames for recv()
+        self.frame_pool = AudioFramePool(samples=self.samples, sample_rate=self.sample_rate)
+
+        # interviewer speaking / idle state, flipped by recv() as playout starts and drains
+        self.speaking = asyncio.Event()
+        self.idle = asyncio.Event()
+        self.idle.set()
+
+        # time-to-first-audio-frame: first TTS bytes of an utterance -> first frame played
+        self._first_bytes_at: Optional[float] = None
+        self.first_frame_latencies: List[float] = []
+
+        # bumped on interrupt so audio scheduled before it is dropped
+        self._generation = 0
+        # set by interrupt(), TTS bytes are dropped until the next utterance begins
+        self._discarding = False
+
+        # barge-in: faded tail of the cut utterance and interrupt-to-silence latency
+        self.fade_out_samples = int(FADE_OUT_MS / 1000 * sample_rate)
+        self._fade_ramp = np.linspace(1.0, 0.0, self.fade_out_samples, dtype=np.float32)
+        self._fade_tail: Optional[np.ndarray] = None
+        self._interrupt_at: Optional[float] = None
+        self.interrupt_latencies: List[float] = []
+
+        # playout position on the audio-only timeline, in track samples; silence
+        # is not counted, so positions map one to one onto synthesized speech
+        self.samples_written = 0
+        self.samples_played = 0
+        self._interrupt_listeners: List[Callable[[int], None]] = []
+
+        self.ingestion_mode = ingestion_mode
+        self._process_audio_task_queue = None
+        if self.ingestion_mode == INGESTION_THREAD:
+            self._process_audio_task_queue = asyncio.Queue()
+            self._process_audio_thread = threading.Thread(target=self.process_incoming_audio)
+            self._process_audio_thread.daemon = True
+            self._process_audio_thread.start()
+        elif self.ingestion_mode != INGESTION_LOOP:
+            raise ValueError(f"Unknown ingestion mode: {ingestion_mode}")
 
         self.handle_interruption = handle_interruption
-        self.skip_next_chunk = False
-
-    def interrupt(self):
-        if self.handle_interruption == True:
-          length = len(self.frame_buffer)
-          self.frame_buffer.clear()
-          while not self._process_audio_task_queue.empty():
-              self.skip_next_chunk = True
-              self._process_audio_task_queue.get_nowait()
-              self._process_audio_task_queue.task_done()
-              
-          if length>0:
-              self.skip_next_chunk = True
+
+        # TTS audio arrives at the track's own format until a TTS negotiates otherwise
+        self.resampler: Optional[StreamingResampler] = None
+
+    def negotiate_input_format(self, sample_rates: Iterable[int], channels: int = 1) -> int:
+        """Pick the TTS output rate that is cheapest to play out.
+
+        The track's native rate needs no resampling at all; otherwise the
+        closest rate above it, then the highest rate offered.
+        """
+        sample_rates = sorted(sample_rates)
+        if self.sample_rate in sample_rates:
+            sample_rate = self.sample_rate
+        else:
+            higher = [r for r in sample_rates if r > self.sample_rate]
+            sample_rate = higher[0] if higher else sample_rates[-1]
+        self.set_input_format(sample_rate=sample_rate, channels=channels)
+        return sample_rate
+
+    def set_input_format(self, sample_rate: int, channels: int = 1):
+        if sample_rate == self.sample_rate and channels == self.channels:
+            self.resampler = None
+        else:
+            self.resampler = StreamingResampler(
+                input_rate=sample_rate,
+                output_rate=self.sample_rate,
+                input_channels=channels,
+                output_channels=self.channels,
+            )
+        print(f"TTS input format {sample_rate} Hz x{channels} -> track {self.sample_rate} Hz x{self.channels}")
+
+    def _write_audio(self, audio_data: bytes):
+        dropped = self.audio_buffer.dropped_samples
+        if self.resampler is None:
+            self.samples_written += self.audio_buffer.write_bytes(audio_data)
+        else:
+            self.samples_written += self.audio_buffer.write(self.resampler.process_bytes(audio_data))
+        # audio dropped past the ring's hard bound is skipped, as if it had played
+        self.samples_played += self.audio_buffer.dropped_samples - dropped
+
+    def add_interrupt_listener(self, listener: Callable[[int], None]):
+        # listener(position) runs on the loop after a barge-in, with the
+        # samples_played position the utterance was cut at
+        self._interrupt_listeners.append(listener)
+
+    def mark_position(self, callback: Callable[[int], None]):
+        """Report samples_written once all audio added before this call is in.
+
+        Goes through the same path as add_new_bytes, so the position it
+        reports is exactly the boundary between earlier and later audio.
+        """
+        if self.ingestion_mode == INGESTION_THREAD:
+            self._process_audio_task_queue.put_nowait(callback)
+        elif self._on_loop():
+            callback(self.samples_written)
+        else:
+            self.loop.call_soon_threadsafe(lambda: callback(self.samples_written))
+
+    def interrupt(self, requested_at: Optional[float] = None):
+        """Barge-in: stop the current utterance within one ptime.
+
+        Safe to call from any thread. The next frame recv() plays is a short
+        fade-out of the audio that was due, everything queued behind it and
+        any TTS bytes still in flight for the utterance are discarded. While
+        the interviewer is silent there is nothing to interrupt.
+        """
+        if self.handle_interruption != True:
+            return
+        requested_at = requested_at or time.monotonic()
+        if self._on_loop():
+            self._interrupt(requested_at)
+        else:
+            self.loop.call_soon_threadsafe(self._interrupt, requested_at)
+
+    def _in_flight(self) -> bool:
+        # audio scheduled onto the loop before the interrupt has been ingested by now
+        queued = self._process_audio_task_queue is not None and not self._process_audio_task_queue.empty()
+        return self.speaking.is_set() or self.audio_buffer.available > 0 or queued
+
+    def _interrupt(self, requested_at: float):
+        if not self._in_flight():
+            # the interviewer is silent, the candidate is just talking
+            self.audio_buffer.clear()
+            if self.resampler is not None:
+                self.resampler.reset()
+            return
+
+        # drop audio already scheduled onto the loop and anything still to arrive
+        self._generation += 1
+        self._discarding = True
+        while self._process_audio_task_queue is not None and not self._process_audio_task_queue.empty():
+            self._process_audio_task_queue.get_nowait()
+            self._process_audio_task_queue.task_done()
+
+        tail = np.zeros(self.samples, dtype=np.int16)
+        played = self.audio_buffer.read_into(tail, self.fade_out_samples)
+        self.audio_buffer.clear()
+        if self.resampler is not None:
+            self.resampler.reset()
+        self._first_bytes_at = None
+
+        # the faded tail still plays, everything after it never will
+        self.samples_played += played
+        self.samples_written = self.samples_played
+        for listener in self._interrupt_listeners:
+            try:
+                listener(self.samples_played)
+            except Exception as e:
+                traceback.print_exc()
+                print("Error in interrupt listener", e)
+
+        tail[:played] = (tail[:played] * self._fade_ramp[:played]).astype(np.int16)
+        self._fade_tail = tail
+        self._interrupt_at = requested_at
+        print("Interviewer interrupted")
+
+    def begin_utterance(self):
+        # called by the TTS before it requests new speech, ends discarding after a barge-in
+        self._discarding = False
 
     def add_new_bytes(self, bytes: Iterator[bytes]):
-        # self.interrupt()
-        self._process_audio_task_queue.put_nowait(bytes)
+        if self._discarding:
+            return
+        if self._first_bytes_at is None and not self.speaking.is_set():
+            self._first_bytes_at = time.monotonic()
+
+        if self.ingestion_mode == INGESTION_THREAD:
+            self._process_audio_task_queue.put_nowait(bytes)
+        elif self._on_loop():
+            self._ingest(bytes, self._generation)
+        else:
+            # TTS receivers run on their own threads, hop onto the loop once per message
+            self.loop.call_soon_threadsafe(self._ingest, bytes, self._generation)
+
+    def _on_loop(self) -> bool:
+        try:
+            return asyncio.get_running_loop() is self.loop
+        except RuntimeError:
+            return False
+
+    def _ingest(self, audio_data_stream: Iterator[bytes], generation: int):
+        if generation != self._generation or self._discarding:
+            # interrupted after this audio was scheduled
+            return
+        try:
+            for audio_data in audio_data_stream:
+                self._write_audio(audio_data)
+        except Exception as e:
+            traceback.print_exc()
+            print("Error while putting audio data stream", e)
+
+    def _set_speaking(self):
+        if self._first_bytes_at is not None:
+            self.first_frame_latencies.append(time.monotonic() - self._first_bytes_at)
+            self._first_bytes_at = None
+        if not self.speaking.is_set():
+            print("Interviewer is Speaking")
+            self.idle.clear()
+            self.speaking.set()
+
+    def _set_idle(self):
+        if self.speaking.is_set():
+            print("Interviewer is not speaking")
+            self.speaking.clear()
+            self.idle.set()
+
+    async def wait_until_idle(self):
+        await self.idle.wait()
 
     def process_incoming_audio(self):
+        # legacy ingestion thread, only started with ingestion_mode=INGESTION_THREAD
         while True:
             try:
                 if (self._process_audio_task_queue.empty()):
                     while True:
-                        if len(self.frame_buffer) > 0:
+                        if self.audio_buffer.available >= self.samples:
                             time.sleep(0.5)
                             continue
-                        print("Interviewer is not speaking")
                         break
             except Exception as e:
                 print("Error while updating character state")
@@ -87,22 +461,16 @@ class CustomAudioStreamTrack(AudioStreamTrack):
                 audio_data_stream = asyncio.run_coroutine_threadsafe(
                    self._process_audio_task_queue.get(), self.loop
                 ).result()
+                if callable(audio_data_stream):
+                    # position marker queued by mark_position
+                    self.loop.call_soon_threadsafe(audio_data_stream, self.samples_written)
+                    continue
                 for audio_data in audio_data_stream:
+                    if self._discarding:
+                        break
                     try:
-                        self.audio_data_buffer += audio_data
-                        print(f"Received audio data: {len(audio_data)} bytes", len(self.audio_data_buffer))
-                        while len(self.audio_data_buffer) > self.chunk_size:
-                            chunk = self.audio_data_buffer[: self.chunk_size]
-                            self.audio_data_buffer = self.audio_data_buffer[
-                                self.chunk_size :
-                            ]
-
-                            # bytes to av.AudioFrame
-                            audio_frame = build_audio_frame(chunk)
-                            
-                            # append frame into frame buffer
-                            self.frame_buffer.append(audio_frame)
-                            print("Interviewer is Speaking")
+                        self._write_audio(audio_data)
+                        print(f"Received audio data: {len(audio_data)} bytes", self.audio_buffer.available)
                     except Exception as e:
                         traceback.print_exc()
                         print("Error while putting audio data stream", e)
@@ -119,31 +487,84 @@ class CustomAudioStreamTrack(AudioStreamTrack):
         # self.chunk_size / self.channels / self.sample_width
         return pts, time_base
 
+    def _catch_up(self, lateness: float):
+        if not self._stalled:
+            self._stalled = True
+            self.pacing_stats.stalls += 1
+            print(f"Audio track stalled, {lateness * 1000:.0f} ms late ({self.pacing_policy})")
+
+        if self.pacing_policy == PACING_STRETCH:
+            # push the whole schedule back, the next frame is on time again
+            self._start += lateness
+            self.pacing_stats.stretched_ms += lateness * 1000
+        elif self.pacing_policy == PACING_DROP:
+            # skip the frames that should have played during the stall; pts
+            # jumps with them so the receiver sees a gap, not a time warp
+            missed = int(lateness * self.sample_rate) // self.samples
+            self._timestamp += missed * self.samples
+            self.frame_time += missed * self.samples
+            self.samples_played += self.audio_buffer.consume(missed * self.samples)
+            self.pacing_stats.dropped_frames += missed
+        # PACING_BURST keeps the schedule and returns frames back to back
+
     # based on ptime videosdk call recv method to get new frame
     async def recv(self) -> AudioFrame:
         try:
             if self.readyState != "live":
                 raise MediaStreamError
 
+            now = time.monotonic()
             if self._start is None:
-                self._start = time.time()
+                self._start = now
                 self._timestamp = 0
             else:
                 self._timestamp += self.samples
 
-            wait = self._start + (self._timestamp / self.sample_rate) - time.time()
+            # absolute deadline, so sleep overshoot never accumulates into drift
+            deadline = self._start + (self._timestamp / self.sample_rate)
+            wait = deadline - now
 
             if wait > 0:
                 await asyncio.sleep(wait)
+                now = time.monotonic()
+
+            lateness = now - deadline
+            self.pacing_stats.record(lateness * 1000)
+            if lateness > self.stall_threshold:
+                self._catch_up(lateness)
+            else:
+                self._stalled = False
 
             pts, time_base = self.next_timestamp()
 
-            if len(self.frame_buffer) > 0:
-                frame = self.frame_buffer.pop(0)
+            frame = None
+            if self._fade_tail is not None:
+                frame = self.frame_pool.frame()
+                np.frombuffer(frame.planes[0], dtype=np.int16)[: self.samples] = self._fade_tail
+                self._fade_tail = None
+                # the faded frame reaches silence fade_out_samples into playout
+                self.interrupt_latencies.append(
+                    time.monotonic() - self._interrupt_at + self.fade_out_samples / self.sample_rate
+                )
+                self._interrupt_at = None
+            elif self.audio_buffer.available >= self.samples:
+                frame = build_audio_frame(self.audio_buffer, self.samples, self.frame_pool.frame())
+                self.samples_played += self.samples
+            elif 0 < self.audio_buffer.available == self._partial:
+                # nothing arrived for a whole frame, the utterance drained:
+                # its last partial frame plays zero-padded instead of lingering
+                frame = self.frame_pool.frame()
+                plane = np.frombuffer(frame.planes[0], dtype=np.int16)
+                played = self.audio_buffer.read_into(plane[: self.samples], self._partial)
+                plane[played : self.samples] = 0
+                self.samples_played += played
+            self._partial = self.audio_buffer.available if frame is None else 0
+            if frame is not None:
+                self._set_speaking()
             else:
-                frame = AudioFrame(format="s16", layout="mono", samples=self.samples)
-                for p in frame.planes:
-                    p.update(bytes(p.buffer_size))
+                if not self._partial:
+                    self._set_idle()
+                frame = self.frame_pool.silence()
 
             frame.pts = pts
             frame.time_base = time_base
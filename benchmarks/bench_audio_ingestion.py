@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Benchmark | time-to-first-audio-frame per TTS ingestion mode
+
+A producer thread plays the role of the TTS receiver: once the interviewer
+is idle it streams an utterance as several messages, each arriving a little
+faster than real time. recv() is driven in real time like the WebRTC sender
+would. Stall is how much longer playout took than the audio itself.
+
+    python -m benchmarks.bench_audio_ingestion
+"""
+import asyncio
+import statistics
+import threading
+import time
+
+from agent.audio_stream_track import (INGESTION_LOOP, INGESTION_THREAD,
+                                      CustomAudioStreamTrack)
+
+UTTERANCES = 6
+MESSAGES_PER_UTTERANCE = 5
+MESSAGE_SECONDS = 0.1
+PAUSE_SECONDS = 0.1
+
+
+def producer(loop: asyncio.AbstractEventLoop, track: CustomAudioStreamTrack, stalls: list, done: threading.Event):
+    message = bytes(int(MESSAGE_SECONDS * track.sample_rate) * track.sample_width)
+    for _ in range(UTTERANCES):
+        time.sleep(PAUSE_SECONDS)
+        started = time.monotonic()
+        for _ in range(MESSAGES_PER_UTTERANCE):
+            track.add_new_bytes(iter([message]))
+            time.sleep(MESSAGE_SECONDS * 0.8)
+        asyncio.run_coroutine_threadsafe(track.speaking.wait(), loop).result()
+        asyncio.run_coroutine_threadsafe(track.wait_until_idle(), loop).result()
+        stalls.append(time.monotonic() - started - MESSAGES_PER_UTTERANCE * MESSAGE_SECONDS)
+    done.set()
+
+
+async def run(mode: str):
+    loop = asyncio.get_running_loop()
+    track = CustomAudioStreamTrack(loop=loop, ingestion_mode=mode)
+    stalls = []
+    done = threading.Event()
+    threading.Thread(target=producer, args=(loop, track, stalls, done), daemon=True).start()
+    while not done.is_set():
+        await track.recv()
+    return track.first_frame_latencies, stalls
+
+
+def main():
+    # the legacy thread never exits, so both runs share one loop
+    loop = asyncio.new_event_loop()
+    for mode in (INGESTION_THREAD, INGESTION_LOOP):
+        latencies, stalls = loop.run_until_complete(run(mode))
+        latencies = [l * 1000 for l in latencies]
+        stalls = [s * 1000 for s in stalls]
+        print(
+            f"{mode:>7}: time-to-first-frame ms median={statistics.median(latencies):.1f} "
+            f"max={max(latencies):.1f} | playout stall ms median={statistics.median(stalls):.1f} "
+            f"max={max(stalls):.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
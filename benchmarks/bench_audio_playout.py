@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark | per-frame playout cost of CustomAudioStreamTrack
+
+Compares the old bytearray + list.pop(0) playout path with the sample ring
+buffer for 1 s to 10 min of queued TTS audio. The ring is the one the track
+builds, so queueing more than it is allocated for grows it; the queued audio
+is written in TTS-sized messages and the slowest write, the one that grows
+the ring, is reported too.
+
+    python -m benchmarks.bench_audio_playout
+"""
+import time
+
+import numpy as np
+from av import AudioFrame
+
+from agent.audio_ring_buffer import AudioRingBuffer
+from agent.audio_stream_track import AUDIO_PTIME, TRACK_SAMPLE_RATE, build_audio_frame, build_playout_ring
+
+SAMPLE_RATE = TRACK_SAMPLE_RATE
+SAMPLES = int(AUDIO_PTIME * SAMPLE_RATE)
+CHUNK_SIZE = SAMPLES * 2
+FRAMES = 500
+# audio per TTS websocket message
+MESSAGE_SECONDS = 0.1
+
+
+def legacy_frame(chunk: bytes) -> AudioFrame:
+    data = np.frombuffer(chunk, dtype=np.int16).reshape(-1, 1)
+    return AudioFrame.from_ndarray(data.T, format="s16", layout="mono")
+
+
+def bench_legacy(queued_seconds: float) -> float:
+    pcm = bytes(int(queued_seconds * SAMPLE_RATE) * 2 + CHUNK_SIZE * FRAMES)
+    audio_data_buffer = bytearray(pcm)
+    frame_buffer = [None] * int(queued_seconds / AUDIO_PTIME)
+
+    start = time.perf_counter()
+    for _ in range(FRAMES):
+        # ingestion side: slice one chunk off the front of the bytearray
+        chunk = audio_data_buffer[:CHUNK_SIZE]
+        audio_data_buffer = audio_data_buffer[CHUNK_SIZE:]
+        frame_buffer.append(legacy_frame(chunk))
+        # playout side: pop the oldest frame
+        frame_buffer.pop(0)
+    return (time.perf_counter() - start) / FRAMES
+
+
+def bench_ring(queued_seconds: float) -> dict:
+    ring: AudioRingBuffer = build_playout_ring(SAMPLE_RATE)
+    message = bytes(int(MESSAGE_SECONDS * SAMPLE_RATE) * 2)
+    slowest_write = 0.0
+    for _ in range(int(queued_seconds / MESSAGE_SECONDS)):
+        started_at = time.perf_counter()
+        ring.write_bytes(message)
+        slowest_write = max(slowest_write, time.perf_counter() - started_at)
+    chunk = bytes(CHUNK_SIZE)
+
+    start = time.perf_counter()
+    for _ in range(FRAMES):
+        ring.write_bytes(chunk)
+        build_audio_frame(ring, SAMPLES)
+    return {
+        "frame": (time.perf_counter() - start) / FRAMES,
+        "slowest_write": slowest_write,
+        "stats": ring.get_stats(),
+    }
+
+
+def main():
+    print(f"{'queued':>10} {'legacy us/frame':>16} {'ring us/frame':>14} {'slowest write ms':>17} {'grows':>6} {'dropped':>8}")
+    for queued_seconds in (1, 60, 600):
+        legacy = bench_legacy(queued_seconds) * 1e6
+        ring = bench_ring(queued_seconds)
+        print(
+            f"{queued_seconds:>9}s {legacy:>16.1f} {ring['frame'] * 1e6:>14.1f} "
+            f"{ring['slowest_write'] * 1000:>17.2f} {ring['stats']['grows']:>6} {ring['stats']['dropped_samples']:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Benchmark | CPU per second of TTS audio for each track input path
+
+Feeds 60 s of speech-band audio through CustomAudioStreamTrack's ingestion
+in 100 ms TTS messages for each input format the track may negotiate.
+
+    python -m benchmarks.bench_audio_resampler
+"""
+import time
+
+import numpy as np
+
+from agent.audio_ring_buffer import AudioRingBuffer
+from agent.audio_resampler import StreamingResampler
+from agent.audio_stream_track import TRACK_SAMPLE_RATE
+
+SECONDS = 60
+MESSAGE_SECONDS = 0.1
+
+PATHS = [
+    # (tts rate, tts channels)
+    (48000, 1),
+    (24000, 1),
+    (16000, 1),
+    (44100, 2),
+    (22050, 1),
+]
+
+
+def pcm(sample_rate: int, channels: int) -> bytes:
+    t = np.arange(int(SECONDS * sample_rate)) / sample_rate
+    x = (6000 * np.sin(2 * np.pi * 220 * t) + 2000 * np.sin(2 * np.pi * 1800 * t)).astype(np.int16)
+    return np.repeat(x[:, None], channels, axis=1).tobytes()
+
+
+def bench(sample_rate: int, channels: int) -> float:
+    data = pcm(sample_rate, channels)
+    message = int(MESSAGE_SECONDS * sample_rate) * 2 * channels
+    ring = AudioRingBuffer(capacity=SECONDS * TRACK_SAMPLE_RATE * 2, max_read=TRACK_SAMPLE_RATE // 50)
+    resampler = None
+    if (sample_rate, channels) != (TRACK_SAMPLE_RATE, 1):
+        resampler = StreamingResampler(sample_rate, TRACK_SAMPLE_RATE, channels, 1)
+
+    start = time.process_time()
+    for i in range(0, len(data), message):
+        if resampler is None:
+            ring.write_bytes(data[i : i + message])
+        else:
+            ring.write(resampler.process_bytes(data[i : i + message]))
+    return (time.process_time() - start) / SECONDS
+
+
+def main():
+    print(f"{'tts format':>14} -> {TRACK_SAMPLE_RATE} Hz mono  cpu ms / s of audio")
+    for sample_rate, channels in PATHS:
+        cpu = bench(sample_rate, channels) * 1000
+        print(f"{sample_rate:>8} Hz x{channels} {'':>14} {cpu:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Benchmark | prompt tokens over a 60-minute interview, last 40 messages vs token budget
+
+Plays a synthetic interview of one exchange every 30 seconds through
+GroqIntelligence.build_messages() and reports the estimated prompt size at
+points through the hour, for the previous last-40-messages window and for
+the budgeted memory. The summarizer is a stand-in that returns notes of
+SUMMARY_WORDS words at once; the budgeting and folding are the real code.
+
+    python -m benchmarks.bench_conversation_memory
+"""
+from concurrent.futures import Executor, Future
+import random
+
+from intelligence.conversation_memory import message_tokens
+from intelligence.groq_intelligence import SUMMARY_WORDS, GroqIntelligence
+
+TURN_SECONDS = 30
+MINUTES = 60
+REPORT_AT = (5, 15, 30, 45, 60)
+# the window build_messages() used to send
+LAST_MESSAGES = 40
+
+WORDS = "the a cache database request latency we would then index key value queue service node shard replica write read lock".split()
+
+
+def sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+class InlineExecutor(Executor):
+    # summaries land by the next turn, as they do when they take less than a turn
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+
+class TTS:
+    def generate(self, text):
+        pass
+
+
+def main():
+    rng = random.Random(3)
+    intelligence = GroqIntelligence(api_key="bench", tts=TTS())
+    intelligence.memory.summarize = lambda summary, messages: sentence(rng, SUMMARY_WORDS)
+    intelligence.memory.executor = InlineExecutor()
+    system = {"role": "system", "content": intelligence.system_prompt}
+
+    # everything said, which the old window took its last 40 messages from
+    history = []
+    print(f"{'minute':>6} {'last 40 tokens':>15} {'budgeted tokens':>16}")
+    for turn in range(1, MINUTES * 60 // TURN_SECONDS + 1):
+        # answers of a few sentences, the odd long one while coding
+        answer = " ".join(sentence(rng, rng.randint(8, 25)) for _ in range(rng.choice((2, 3, 4, 12))))
+        intelligence.build_messages(answer, sender_name="bench")
+        history.append(intelligence.chat_history[-1])
+        legacy = sum(message_tokens(message) for message in [system] + history[-LAST_MESSAGES:])
+
+        intelligence.add_response(" ".join(sentence(rng, rng.randint(10, 20)) for _ in range(rng.randint(2, 4))))
+        history.append(intelligence.chat_history[-1])
+
+        minute = turn * TURN_SECONDS / 60
+        if minute in REPORT_AT:
+            print(f"{minute:>6.0f} {legacy:>15} {intelligence.memory.prompt_tokens[-1]:>16}")
+
+    stats = intelligence.get_memory_stats()
+    del stats["prompt_tokens"]
+    print(stats)
+
+
+if __name__ == "__main__":
+    main()
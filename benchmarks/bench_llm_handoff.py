@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Benchmark | STT callback thread blocking and turn latency, blocking vs loop hand-off
+
+A thread stands in for the Deepgram SDK's receive thread and delivers two
+final transcripts, the second one shortly after the first, as a candidate
+who pauses and then goes on talking does. In blocking mode the callback
+answers each one with GroqIntelligence.generate(); in hand-off mode it
+only schedules the turn, which agenerate() answers on the loop and the
+second turn cancels. Stand-in LLM and TTS clients time as in
+bench_llm_streaming.
+
+    python -m benchmarks.bench_llm_handoff
+"""
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+from benchmarks.bench_llm_streaming import FIRST_TOKEN_S, TOKENS_PER_SECOND, Completions, tokens
+from intelligence.groq_intelligence import GroqIntelligence
+from stt.deepgram_stt import DeepgramSTT
+
+# the second final transcript reaches the SDK this long after the first
+SECOND_TURN_AFTER_S = 0.3
+TURNS = [
+    ("I'd put a cache in front of the database.", "Good. How would you keep that cache consistent when two services write the same record at once?"),
+    ("Actually, with a write-through policy on the primary.", "Write-through keeps reads fresh. What does it cost you on the write path, and when would you accept that?"),
+]
+
+
+class AsyncStream:
+    def __init__(self, answer: str):
+        self.answer = answer
+
+    async def __aiter__(self):
+        for token in tokens(self.answer):
+            await asyncio.sleep(1 / TOKENS_PER_SECOND)
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=token))])
+
+    async def close(self):
+        pass
+
+
+class AsyncCompletions:
+    def __init__(self, answers: dict):
+        self.answers = answers
+
+    async def create(self, messages, stream: bool = False, **kwargs):
+        await asyncio.sleep(FIRST_TOKEN_S)
+        return AsyncStream(self.answers[messages[-1]["content"]])
+
+
+class BlockingCompletions:
+    def __init__(self, answers: dict):
+        self.answers = answers
+
+    def create(self, messages, stream: bool = False, **kwargs):
+        return Completions(self.answers[messages[-1]["content"]]).create(stream=stream)
+
+
+class TTS:
+    def __init__(self):
+        # answer text -> when its first chunk was handed over
+        self.started = {}
+
+    def generate(self, text):
+        for chunk in [text] if isinstance(text, str) else text:
+            self.started.setdefault(chunk.split(".")[0], time.monotonic())
+
+    async def agenerate(self, text):
+        async for chunk in text:
+            self.started.setdefault(chunk.split(".")[0], time.monotonic())
+
+
+def bench(handoff: bool) -> dict:
+    loop = asyncio.new_event_loop()
+    tts = TTS()
+    intelligence = GroqIntelligence(api_key="bench", tts=tts, stream=True)
+    answers = {f"Candidate (bench): {text}": answer for text, answer in TURNS}
+    intelligence.client = SimpleNamespace(chat=SimpleNamespace(completions=BlockingCompletions(answers)))
+    intelligence.async_client = SimpleNamespace(chat=SimpleNamespace(completions=AsyncCompletions(answers)))
+    stt = DeepgramSTT(loop=loop, api_key="bench", language="en-US", intelligence=intelligence, speculation_ms=None)
+    if handoff:
+        deliver = lambda text: stt.produce_text(text, peer_name="bench", is_final=True)
+    else:
+        # the callback answers on the SDK thread itself, as produce_text() did before
+        deliver = lambda text: intelligence.generate(text, sender_name="bench")
+
+    blocked = []
+    delivered = []
+
+    def receive_thread():
+        first_at = time.monotonic()
+        for index, (text, _) in enumerate(TURNS):
+            # a transcript that arrives while the thread is busy waits for it
+            arrived_at = first_at + index * SECOND_TURN_AFTER_S
+            time.sleep(max(0.0, arrived_at - time.monotonic()))
+            delivered.append(arrived_at)
+            started_at = time.monotonic()
+            deliver(text)
+            blocked.append(time.monotonic() - started_at)
+        loop.call_soon_threadsafe(loop.stop)
+
+    threading.Thread(target=receive_thread, daemon=True).start()
+    loop.run_forever()
+    # let the last turn finish
+    if stt.turn is not None:
+        loop.run_until_complete(stt.turn)
+    loop.close()
+
+    last_answer = TURNS[-1][1].split(".")[0]
+    return {
+        "blocked": max(blocked),
+        "last_turn": tts.started[last_answer] - delivered[-1],
+        "stale": sum(answer.split(".")[0] in tts.started for _, answer in TURNS[:-1]),
+    }
+
+
+def main():
+    print(f"{'mode':>9} {'max callback ms':>16} {'last turn ms':>13} {'stale answers':>14}")
+    for handoff in (False, True):
+        result = bench(handoff)
+        print(
+            f"{'hand-off' if handoff else 'blocking':>9} {result['blocked'] * 1000:>16.1f} "
+            f"{result['last_turn'] * 1000:>13.0f} {result['stale']:>14}"
+        )
+
+
+if __name__ == "__main__":
+    main()
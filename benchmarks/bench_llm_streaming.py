@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Benchmark | end of candidate speech to first interviewer audio, streaming vs blocking
+
+Runs GroqIntelligence.generate() against a stand-in Groq client that
+emits interview answers at a fixed time to first token and token rate,
+and a stand-in TTS whose first audio arrives a fixed time after the
+first chunk it is handed, plus a little per character of that chunk.
+Segmentation, cleaning and the TTS hand-off are the real code paths.
+
+    python -m benchmarks.bench_llm_streaming
+"""
+import re
+import time
+from types import SimpleNamespace
+
+from intelligence.groq_intelligence import GroqIntelligence
+
+# roughly what gpt-oss-120b on Groq and Aura websockets measure at
+FIRST_TOKEN_S = 0.35
+TOKENS_PER_SECOND = 450
+TTS_FIRST_BYTE_S = 0.12
+TTS_SECONDS_PER_CHAR = 0.0008
+
+ANSWERS = [
+    "That's a solid start, thank you. You mentioned the cache sits in front of the database, so how would you keep it consistent when two services write the same record at nearly the same time?",
+    "Good, a hash map gets you linear time. Before you write any code, walk me through what happens with duplicate values in the input, and whether your approach still returns the right pair of indices.",
+    "Let's move on to system design. Imagine you're building a URL shortener that has to handle a hundred million new links a day. Start with the API you'd expose, then tell me how you'd generate the short codes and where you'd store them. We'll get to caching and analytics after that.",
+    "Thanks for sharing that. It sounds like the migration taught you a lot about rollout planning. If you could run it again, what's the one thing you'd change first, and why?",
+]
+
+
+def tokens(text: str):
+    # about one token per short word, longer words split in two
+    for word in re.findall(r"\S+\s*", text):
+        if len(word) > 6:
+            yield word[: len(word) // 2]
+            yield word[len(word) // 2 :]
+        else:
+            yield word
+
+
+class Completions:
+    def __init__(self, answer: str):
+        self.answer = answer
+
+    def create(self, stream: bool = False, **kwargs):
+        time.sleep(FIRST_TOKEN_S)
+        if not stream:
+            parts = list(tokens(self.answer))
+            time.sleep(len(parts) / TOKENS_PER_SECOND)
+            message = SimpleNamespace(content=self.answer)
+            return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+        return self._stream()
+
+    def _stream(self):
+        for token in tokens(self.answer):
+            time.sleep(1 / TOKENS_PER_SECOND)
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=token))])
+
+
+class TTS:
+    def __init__(self):
+        self.first_audio_at = None
+
+    def generate(self, text):
+        for chunk in [text] if isinstance(text, str) else text:
+            if self.first_audio_at is None:
+                self.first_audio_at = time.monotonic() + TTS_FIRST_BYTE_S + len(chunk) * TTS_SECONDS_PER_CHAR
+
+
+def bench(stream: bool) -> list:
+    latencies = []
+    for answer in ANSWERS:
+        tts = TTS()
+        intelligence = GroqIntelligence(api_key="bench", tts=tts, stream=stream)
+        intelligence.client = SimpleNamespace(chat=SimpleNamespace(completions=Completions(answer)))
+        # the final transcript of the candidate's turn arrives now
+        ended_at = time.monotonic()
+        intelligence.generate("I'd put a cache in front of the database.", sender_name="bench")
+        latencies.append(tts.first_audio_at - ended_at)
+    return latencies
+
+
+def main():
+    print(f"{'mode':>10} {'mean ms':>8} {'max ms':>8}")
+    for stream in (False, True):
+        latencies = bench(stream)
+        print(
+            f"{'streaming' if stream else 'blocking':>10} "
+            f"{sum(latencies) / len(latencies) * 1000:>8.0f} {max(latencies) * 1000:>8.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Benchmark | websocket sends and CPU per peer for each coalescing window
+
+Streams 60 s of 16 kHz mono STT audio through FrameCoalescer into real
+masked websocket frames written to a local socket pair, like the Deepgram
+client would.
+
+    python -m benchmarks.bench_stt_coalescing
+"""
+import socket
+import threading
+import time
+
+from websockets.frames import Frame, Opcode
+
+from stt.deepgram_stt import FrameCoalescer
+
+SECONDS = 60
+SAMPLE_RATE = 16000
+FRAME = bytes(SAMPLE_RATE // 50 * 2)
+
+
+def drain(sock: socket.socket):
+    while sock.recv(1 << 16):
+        pass
+
+
+def bench(window_ms: int) -> tuple:
+    writer, reader = socket.socketpair()
+    threading.Thread(target=drain, args=(reader,), daemon=True).start()
+    coalescer = FrameCoalescer(sample_rate=SAMPLE_RATE, window_ms=window_ms)
+
+    start = time.process_time()
+    for _ in range(SECONDS * 50):
+        batch = coalescer.add(FRAME)
+        if batch:
+            writer.sendall(Frame(Opcode.BINARY, batch).serialize(mask=True))
+    cpu = time.process_time() - start
+
+    writer.close()
+    return coalescer.sends / SECONDS, cpu / SECONDS
+
+
+def main():
+    print(f"{'window':>8} {'sends/s':>8} {'cpu ms/s':>9}")
+    for window_ms in (0, 40, 60, 100):
+        sends, cpu = bench(window_ms)
+        print(f"{window_ms:>6}ms {sends:>8.1f} {cpu * 1000:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Benchmark | upstream bytes and CPU per second of candidate audio
+
+Runs 60 s of 48 kHz stereo WebRTC frames through the old raw path and
+through DeepgramSTT.convert_frame at a few target rates.
+
+    python -m benchmarks.bench_stt_downsample
+"""
+import time
+
+import numpy as np
+from av import AudioFrame
+
+from stt.deepgram_stt import DeepgramSTT, PeerSession
+
+SECONDS = 60
+SAMPLE_RATE = 48000
+SAMPLES = SAMPLE_RATE // 50
+
+
+def frames():
+    t = np.arange(SECONDS * SAMPLE_RATE) / SAMPLE_RATE
+    x = (6000 * np.sin(2 * np.pi * 220 * t)).astype(np.int16)
+    stereo = np.repeat(x[:, None], 2, axis=1).reshape(1, -1)
+    out = []
+    for i in range(0, stereo.shape[1], SAMPLES * 2):
+        frame = AudioFrame.from_ndarray(stereo[:, i : i + SAMPLES * 2], format="s16", layout="stereo")
+        frame.sample_rate = SAMPLE_RATE
+        out.append(frame)
+    return out
+
+
+def bench_raw(audio_frames) -> tuple:
+    sent = 0
+    start = time.process_time()
+    for frame in audio_frames:
+        sent += len(frame.to_ndarray().flatten().astype(np.int16).tobytes())
+    return sent / SECONDS, (time.process_time() - start) / SECONDS
+
+
+def bench_convert(audio_frames, sample_rate: int) -> tuple:
+    # convert_frame only touches the resampler state, no connection needed
+    stt = DeepgramSTT.__new__(DeepgramSTT)
+    stt.sample_rate = sample_rate
+    stt.channels = 1
+    session = PeerSession(peer_id="peer", peer_name="peer")
+    sent = 0
+    start = time.process_time()
+    for frame in audio_frames:
+        sent += len(stt.convert_frame(session, frame))
+    return sent / SECONDS, (time.process_time() - start) / SECONDS
+
+
+def main():
+    audio_frames = frames()
+    print(f"{'path':>22} {'bytes/s':>10} {'cpu ms/s':>9}")
+    sent, cpu = bench_raw(audio_frames)
+    print(f"{'raw 48 kHz stereo':>22} {sent:>10.0f} {cpu * 1000:>9.3f}")
+    for sample_rate in (24000, 16000, 8000):
+        sent, cpu = bench_convert(audio_frames, sample_rate)
+        print(f"{f'{sample_rate // 1000} kHz mono':>22} {sent:>10.0f} {cpu * 1000:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
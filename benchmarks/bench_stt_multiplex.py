@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Benchmark | connections, threads, websocket frames and CPU per panel size
+
+Streams real-time 48 kHz WebRTC frames for N peers through DeepgramSTT,
+once with one Deepgram connection per peer and once multiplexed into
+multichannel connections. The Deepgram SDK connects to a local websocket
+server standing in for the API, so handshakes, SDK threads and socket
+writes are real; no transcripts come back.
+
+    python -m benchmarks.bench_stt_multiplex
+"""
+import asyncio
+import threading
+import time
+
+import numpy as np
+from av import AudioFrame
+from deepgram import DeepgramClient, DeepgramClientOptions
+from deepgram.clients.listen.v1.websocket import client as listen_client
+from websockets.sync.client import connect
+from websockets.sync.server import serve
+
+from stt.deepgram_stt import DeepgramSTT
+
+SECONDS = 5
+SAMPLE_RATE = 48000
+SAMPLES = SAMPLE_RATE // 50
+
+
+class Counter:
+    def __init__(self):
+        self.frames = 0
+        self.bytes = 0
+        self.lock = threading.Lock()
+
+    def handler(self, websocket):
+        try:
+            for message in websocket:
+                with self.lock:
+                    self.frames += 1
+                    self.bytes += len(message)
+        except Exception:
+            pass
+
+
+class Track:
+    def __init__(self, seconds: float):
+        t = np.arange(SAMPLES) / SAMPLE_RATE
+        x = (6000 * np.sin(2 * np.pi * 220 * t)).astype(np.int16).reshape(1, -1)
+        self.frame = AudioFrame.from_ndarray(x, format="s16", layout="mono")
+        self.frame.sample_rate = SAMPLE_RATE
+        self.frames = int(seconds * 50)
+        self.deadline = None
+
+    async def recv(self):
+        # paced like a live track
+        if self.deadline is None:
+            self.deadline = time.monotonic()
+        if self.frames == 0:
+            await asyncio.sleep(3600)
+        self.frames -= 1
+        self.deadline += 0.02
+        await asyncio.sleep(max(0.0, self.deadline - time.monotonic()))
+        return self.frame
+
+
+class Stream:
+    def __init__(self, seconds: float):
+        self.track = Track(seconds)
+
+
+async def bench(url: str, counter: Counter, peers: int, multiplex: bool) -> dict:
+    loop = asyncio.get_running_loop()
+    stt = DeepgramSTT(
+        loop,
+        api_key="bench",
+        language="en",
+        intelligence=None,
+        vad_enabled=False,
+        end_of_turn=False,
+        speculation_ms=None,
+        multiplex=multiplex,
+    )
+    stt.deepgram_client = DeepgramClient(
+        api_key="bench",
+        config=DeepgramClientOptions(url=url, options={"keepalive": True}),
+    )
+    threads = threading.active_count()
+    with counter.lock:
+        counter.frames = counter.bytes = 0
+
+    for index in range(peers):
+        stt.prepare(peer_id=f"peer-{index}", peer_name=f"peer-{index}")
+    # let every handshake finish before streaming
+    connections = -(-peers // stt.multiplex_channels) if multiplex else peers
+    while stt.handshakes < connections:
+        await asyncio.sleep(0.01)
+
+    cpu = time.process_time()
+    for index in range(peers):
+        stt.start(peer_id=f"peer-{index}", peer_name=f"peer-{index}", stream=Stream(SECONDS))
+    await asyncio.sleep(SECONDS + 0.2)
+    cpu = time.process_time() - cpu
+    result = {
+        "connections": stt.handshakes,
+        "threads": threading.active_count() - threads,
+        "frames": counter.frames / SECONDS,
+        "bytes": counter.bytes / SECONDS,
+        "cpu": cpu / SECONDS,
+    }
+
+    for index in range(peers):
+        stt.close(peer_id=f"peer-{index}")
+    await asyncio.sleep(0.5)
+    return result
+
+
+async def run(url: str, counter: Counter):
+    print(f"{'peers':>5} {'mode':>12} {'conns':>6} {'threads':>8} {'frames/s':>9} {'bytes/s':>9} {'cpu ms/s':>9}")
+    for peers in (1, 2, 4):
+        for multiplex in (False, True):
+            result = await bench(url, counter, peers, multiplex)
+            print(
+                f"{peers:>5} {'multiplexed' if multiplex else 'per peer':>12} {result['connections']:>6} "
+                f"{result['threads']:>8} {result['frames']:>9.1f} {result['bytes']:>9.0f} {result['cpu'] * 1000:>9.2f}"
+            )
+
+
+def connect_plain(url, **kwargs):
+    # the SDK always builds wss:// URLs, the local stand-in speaks plain ws://
+    return connect(url.replace("wss://", "ws://", 1), **kwargs)
+
+
+def main():
+    listen_client.connect = connect_plain
+    counter = Counter()
+    server = serve(counter.handler, "127.0.0.1", 0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.socket.getsockname()[1]}"
+    try:
+        asyncio.run(run(url, counter))
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
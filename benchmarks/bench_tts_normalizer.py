@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Benchmark | microseconds per interviewer response for TTS text cleaning
+
+Runs the golden corpus through the original multi-pass regex cleaner, the
+precompiled normalizer on complete text, and the normalizer fed in
+token-sized pieces as it is when answers stream. Outputs are checked
+against the golden ones first.
+
+    python -m benchmarks.bench_tts_normalizer
+"""
+import json
+import os
+import re
+import time
+
+from intelligence.tts_normalizer import TTSNormalizer, normalize_for_tts
+
+CORPUS = os.path.join(os.path.dirname(__file__), "tts_normalizer_corpus.json")
+ROUNDS = 200
+TOKEN_CHARS = 4
+
+
+def legacy_clean(text: str) -> str:
+    # GroqIntelligence._clean_response_for_tts before the normalizer replaced it
+    text = re.sub(r'\*+', '', text)
+    text = re.sub(r'\[.*?\]', '', text)
+    text = re.sub(r'\(.*?\)', lambda m: '' if any(word in m.group().lower() for word in ['note', 'aside', 'thinking', 'pause', 'meta', 'llm', 'ai']) else m.group(), text)
+    filler_patterns = [
+        r'\b(um|uh|er|ah|hmm)\b',
+        r'\byou know\b',
+        r'\bbasically\b',
+        r'\bactually\b(?!\s+implement|coding|working)',
+        r'\blike\b(?!\s+this|that)',
+        r'\bwell\b(?=\s*[,.])',
+        r'\bso\b(?=\s*[,.])',
+        r'\bokay\b(?=\s*[,.])',
+    ]
+    for pattern in filler_patterns:
+        text = re.sub(pattern, '', text, flags=re.IGNORECASE)
+    text = re.sub(r'\s+', ' ', text)
+    text = text.strip()
+    meta_patterns = [
+        r'^\*.*?\*\s*',
+        r'\*.*?\*',
+        r'\bnow\s+(?:let\'s|let\s+us|we\s+will|we\s+should)\b',
+    ]
+    for pattern in meta_patterns:
+        text = re.sub(pattern, '', text, flags=re.IGNORECASE)
+    text = re.sub(r'\s*,\s*,', ',', text)
+    text = re.sub(r'\s*\.\s*\.', '.', text)
+    text = re.sub(r'^[,.\s]+', '', text)
+    text = re.sub(r'[,.\s]+$', '.', text)
+    if text and not text[-1] in '.!?':
+        text += '.'
+    return text.strip()
+
+
+def streamed(text: str) -> str:
+    normalizer = TTSNormalizer()
+    out = "".join(normalizer.feed(text[i : i + TOKEN_CHARS]) for i in range(0, len(text), TOKEN_CHARS))
+    return out + normalizer.flush()
+
+
+def bench(clean, texts) -> float:
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        for text in texts:
+            clean(text)
+    return (time.perf_counter() - start) / (ROUNDS * len(texts))
+
+
+def main():
+    with open(CORPUS) as f:
+        corpus = json.load(f)
+    texts = [case["input"] for case in corpus]
+    for clean in (legacy_clean, normalize_for_tts, streamed):
+        assert all(clean(case["input"]) == case["expected"] for case in corpus), clean.__name__
+
+    print(f"{'cleaner':>18} {'us/response':>12}")
+    for name, clean in (("regex passes", legacy_clean), ("normalizer", normalize_for_tts), ("normalizer stream", streamed)):
+        print(f"{name:>18} {bench(clean, texts) * 1e6:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
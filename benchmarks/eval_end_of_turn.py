@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Evaluation | end-of-turn latency and false cutoffs, replayed from event logs
+
+Replays transcript and voice events through EndOfTurnDetector and compares
+it with a fixed silence threshold and with Deepgram's own speech_final.
+Logs are written by DeepgramSTT(event_log_path=...); without one a
+synthetic corpus of slow, average and fast speakers with mid-turn
+hesitations is generated.
+
+A true turn ends at the last voiced event before a gap of --turn-gap
+seconds. A call made before that is a false cutoff; latency is measured
+from the last voiced event of the turn to the call.
+
+The detectors run alongside Deepgram, whose speech_final still ends a turn
+when it comes first, so their calls are the detector's own plus the
+Deepgram endpoints they pass through. False cutoffs are reported as counts
+and per true turn, split by where the call came from; a rate per call
+would improve just by calling more often.
+
+    python -m benchmarks.eval_end_of_turn [events.jsonl ...] [--turn-gap 2.5]
+"""
+import argparse
+import json
+import random
+from typing import Callable, Dict, List, Tuple
+
+from stt.end_of_turn import EndOfTurnDetector
+
+TICK = 0.02
+TURN_GAP = 2.5
+
+# where a call came from
+DETECTOR = "detector"
+DEEPGRAM = "deepgram"
+
+Call = Tuple[float, str]
+
+WORDS = "we built the service in python and moved it to kubernetes last year".split()
+HESITATIONS = ("and", "um", "so", "because")
+
+
+def synthetic_events(seed: int = 7, turns: int = 40) -> List[dict]:
+    rng = random.Random(seed)
+    events = []
+    for peer, wpm in (("slow", 100), ("average", 150), ("fast", 210)):
+        t = 0.0
+        word_s = 60 / wpm
+        pace = 150 / wpm
+        events.append({"t": t, "peer": peer, "type": "speed", "speed_coefficient": wpm / 150})
+        for _ in range(turns):
+            phrases = rng.randint(1, 3)
+            for index in range(phrases):
+                words = [rng.choice(WORDS) for _ in range(rng.randint(3, 9))]
+                last = index == phrases - 1
+                words[-1] = words[-1] + ("." if last else "")
+                if not last:
+                    words.append(rng.choice(HESITATIONS))
+                events.append({"t": t, "peer": peer, "type": "voice", "voiced": True})
+                for count in range(1, len(words) + 1):
+                    t += word_s
+                    events.append({"t": t + 0.15, "peer": peer, "type": "transcript",
+                                   "text": " ".join(words[:count]), "is_final": False,
+                                   "speech_final": False, "from_finalize": False})
+                events.append({"t": t, "peer": peer, "type": "voice", "voiced": False})
+                # Deepgram endpoints any pause long enough, mid-turn ones included
+                pause = min(rng.uniform(0.5, 1.5) * pace, 2.0) if not last else rng.uniform(3.0, 5.0)
+                endpoint_after = rng.uniform(0.6, 1.2)
+                speech_final = pause > endpoint_after
+                events.append({"t": t + (endpoint_after if speech_final else min(0.3, pause)),
+                               "peer": peer, "type": "transcript",
+                               "text": " ".join(words), "is_final": True,
+                               "speech_final": speech_final, "from_finalize": False})
+                t += pause
+    return events
+
+
+def load_events(paths: List[str]) -> List[dict]:
+    events = []
+    for path in paths:
+        with open(path, encoding="utf-8") as file:
+            events.extend(json.loads(line) for line in file if line.strip())
+    return events
+
+
+def true_turns(events: List[dict], turn_gap: float) -> List[tuple]:
+    # (start, end) of each turn, pauses shorter than turn_gap stay inside it
+    turns = []
+    for event in events:
+        if event["type"] != "voice":
+            continue
+        if event["voiced"]:
+            if not turns or event["t"] - turns[-1][1] >= turn_gap:
+                turns.append([event["t"], event["t"]])
+        elif turns:
+            turns[-1][1] = event["t"]
+    return [tuple(turn) for turn in turns]
+
+
+def replay(events: List[dict], make_detector: Callable[[], EndOfTurnDetector]) -> List[Call]:
+    # logs hold voice edges, the live pipeline reports every 20 ms frame
+    detector = make_detector()
+    calls = []
+    voiced = False
+    t = events[0]["t"]
+    for event in events:
+        while t + TICK <= event["t"]:
+            t += TICK
+            detector.on_voice(voiced, t)
+            if detector.check(t):
+                calls.append((t, DETECTOR))
+        kind = event["type"]
+        if kind == "voice":
+            detector.on_voice(True, event["t"])
+            voiced = event["voiced"]
+        elif kind == "transcript":
+            detector.on_transcript(event["text"], event["is_final"], event["from_finalize"], event["t"])
+            if event["speech_final"] and event["text"]:
+                # Deepgram got there first, the agent answers now either way
+                if not calls or calls[-1][0] < event["t"] - TICK:
+                    calls.append((event["t"], DEEPGRAM))
+                detector.end_turn()
+        elif kind == "speed":
+            detector.set_speed(event["speed_coefficient"])
+    return calls
+
+
+def deepgram_calls(events: List[dict]) -> List[Call]:
+    return [(e["t"], DEEPGRAM) for e in events if e["type"] == "transcript" and e["speech_final"] and e["text"]]
+
+
+def score(calls: List[Call], turns: List[tuple]) -> dict:
+    latencies = []
+    cutoffs = {DETECTOR: 0, DEEPGRAM: 0}
+    detected = set()
+    for call, source in calls:
+        ongoing = [index for index, (start, end) in enumerate(turns) if start <= call < end]
+        if ongoing:
+            cutoffs[source] += 1
+            continue
+        ended = [index for index, (start, end) in enumerate(turns) if end <= call]
+        if ended and ended[-1] not in detected:
+            detected.add(ended[-1])
+            latencies.append(call - turns[ended[-1]][1])
+    latencies.sort()
+    return {
+        "turns": len(turns),
+        "calls": len(calls),
+        "detector_calls": sum(source == DETECTOR for _, source in calls),
+        "missed": len(turns) - len(detected),
+        "cutoffs": cutoffs[DETECTOR] + cutoffs[DEEPGRAM],
+        "cutoffs_per_turn": (cutoffs[DETECTOR] + cutoffs[DEEPGRAM]) / len(turns) if turns else 0.0,
+        "detector_cutoffs": cutoffs[DETECTOR],
+        "deepgram_cutoffs": cutoffs[DEEPGRAM],
+        "p50_ms": latencies[len(latencies) // 2] * 1000 if latencies else float("nan"),
+        "p90_ms": latencies[int(len(latencies) * 0.9)] * 1000 if latencies else float("nan"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay end-of-turn event logs")
+    parser.add_argument("logs", nargs="*", help="JSONL logs from DeepgramSTT(event_log_path=...)")
+    parser.add_argument("--turn-gap", type=float, default=TURN_GAP)
+    args = parser.parse_args()
+
+    events = load_events(args.logs) if args.logs else synthetic_events()
+    by_peer: Dict[str, List[dict]] = {}
+    for event in sorted(events, key=lambda e: e["t"]):
+        by_peer.setdefault(event["peer"], []).append(event)
+
+    policies = {
+        "deepgram": None,
+        "fixed": lambda: EndOfTurnDetector(use_text=False),
+        "adaptive": EndOfTurnDetector,
+    }
+    print(
+        f"{'peer':>10} {'policy':>9} {'turns':>6} {'missed':>7} {'p50 ms':>8} {'p90 ms':>8} "
+        f"{'cutoffs':>8} {'per turn':>9} {'own calls':>10} {'own cut':>8} {'deepgram cut':>13}"
+    )
+    for peer, peer_events in by_peer.items():
+        turns = true_turns(peer_events, args.turn_gap)
+        for name, make_detector in policies.items():
+            if make_detector is None:
+                calls = deepgram_calls(peer_events)
+            elif name == "fixed":
+                # ignores the learned rate as well as the text
+                calls = replay([e for e in peer_events if e["type"] != "speed"], make_detector)
+            else:
+                calls = replay(peer_events, make_detector)
+            result = score(calls, turns)
+            print(
+                f"{peer:>10} {name:>9} {result['turns']:>6} {result['missed']:>7} "
+                f"{result['p50_ms']:>8.0f} {result['p90_ms']:>8.0f} {result['cutoffs']:>8} "
+                f"{result['cutoffs_per_turn']:>9.2f} {result['detector_calls']:>10} "
+                f"{result['detector_cutoffs']:>8} {result['deepgram_cutoffs']:>13}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+from concurrent.futures import Executor, Future
+import time
+from typing import Callable, List, Optional, Tuple
+
+# the whole prompt, system prompt and summary included, stays within this
+CONTEXT_BUDGET_TOKENS = 4000
+# older turns are summarized once the history fills this much of its share of the
+# budget, early enough for the summary to land before turns have to be left out
+FOLD_AT = 0.8
+# and down to this much, so a summary is written every few turns and not every turn
+FOLD_TO = 0.5
+# the latest messages are always sent verbatim
+KEEP_MESSAGES = 6
+# role, name and separators of every message
+MESSAGE_OVERHEAD_TOKENS = 4
+# English runs close to this many characters per token
+CHARS_PER_TOKEN = 4
+
+
+def count_tokens(text: str) -> int:
+    # a local estimate, no tokenizer round trip; the budget leaves room for its error
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def message_tokens(message: dict) -> int:
+    return count_tokens(message["content"]) + MESSAGE_OVERHEAD_TOKENS
+
+
+class ConversationMemory:
+    """Chat history sent to the LLM within a token budget.
+
+    messages is the raw history, in the same dicts callers append and edit.
+    Once it outgrows the budget, its oldest turns are summarized on the
+    executor with summarize(summary, messages), which returns the new
+    running summary; the result replaces those turns at the next prompt.
+    Until then turns that do not fit are left out, so the prompt never
+    exceeds the budget.
+    """
+
+    def __init__(
+        self,
+        summarize: Callable[[str, List[dict]], str],
+        executor: Executor,
+        budget_tokens: int = CONTEXT_BUDGET_TOKENS,
+        keep_messages: int = KEEP_MESSAGES,
+    ):
+        self.summarize = summarize
+        self.executor = executor
+        self.budget_tokens = budget_tokens
+        self.keep_messages = keep_messages
+
+        self.messages: List[dict] = []
+        self.summary = ""
+        self._folding: Optional[Tuple[Future, List[dict]]] = None
+        self.started_at: Optional[float] = None
+
+        self.summaries = 0
+        self.folded_messages = 0
+        self.summary_failures = 0
+        # prompts that left out turns not yet in the summary
+        self.truncated_prompts = 0
+        self.prompt_tokens: List[int] = []
+
+    def prompt(self, system_prompt: str, extra: Optional[List[dict]] = None, record: bool = True) -> List[dict]:
+        """Messages for the next completion: system prompt, summary, latest turns.
+
+        extra is appended after the history without being added to it.
+        """
+        if self.started_at is None:
+            self.started_at = time.monotonic()
+        self._apply_fold()
+
+        head = [{"role": "system", "content": system_prompt}]
+        if self.summary:
+            minutes = (time.monotonic() - self.started_at) / 60
+            head.append({
+                "role": "system",
+                "content": f"Summary of the interview so far, {minutes:.0f} minutes in:\n{self.summary}",
+            })
+        used = sum(message_tokens(message) for message in head)
+
+        history = self.messages + (extra or [])
+        window: List[dict] = []
+        for message in reversed(history):
+            tokens = message_tokens(message)
+            # the latest message goes in whatever it costs
+            if window and used + tokens > self.budget_tokens:
+                break
+            window.append(message)
+            used += tokens
+        window.reverse()
+
+        if record:
+            if len(window) < len(history):
+                self.truncated_prompts += 1
+            self.prompt_tokens.append(used)
+            self._maybe_fold(budget=self.budget_tokens - sum(message_tokens(message) for message in head))
+        return head + window
+
+    def _maybe_fold(self, budget: int):
+        if self._folding is not None or len(self.messages) <= self.keep_messages:
+            return
+        tokens = [message_tokens(message) for message in self.messages]
+        total = sum(tokens)
+        if total <= budget * FOLD_AT:
+            return
+        count = 0
+        last = len(self.messages) - self.keep_messages
+        while count < last and total > budget * FOLD_TO:
+            total -= tokens[count]
+            count += 1
+        # the history left behind starts with a candidate turn
+        while count < last and self.messages[count]["role"] != "user":
+            count += 1
+        if count == 0:
+            return
+        folded = self.messages[:count]
+        print(f"Summarizing {count} messages in the background")
+        self._folding = (self.executor.submit(self.summarize, self.summary, list(folded)), folded)
+
+    def _apply_fold(self):
+        if self._folding is None or not self._folding[0].done():
+            return
+        future, folded = self._folding
+        self._folding = None
+        try:
+            summary = future.result()
+        except Exception as e:
+            # the turns stay as they are, the next prompt tries again
+            print("Conversation summary failed", e)
+            self.summary_failures += 1
+            return
+        if not summary:
+            self.summary_failures += 1
+            return
+        # by identity: a barge-in may have edited or removed a message meanwhile
+        folded_ids = {id(message) for message in folded}
+        self.messages[:] = [message for message in self.messages if id(message) not in folded_ids]
+        self.summary = summary
+        self.summaries += 1
+        self.folded_messages += len(folded)
+
+    def get_stats(self) -> dict:
+        prompt_tokens = self.prompt_tokens
+        return {
+            "prompt_tokens": list(prompt_tokens),
+            "mean_prompt_tokens": sum(prompt_tokens) / len(prompt_tokens) if prompt_tokens else 0.0,
+            "max_prompt_tokens": max(prompt_tokens) if prompt_tokens else 0,
+            "summaries": self.summaries,
+            "summary_failures": self.summary_failures,
+            "folded_messages": self.folded_messages,
+            "truncated_prompts": self.truncated_prompts,
+            "summary_tokens": count_tokens(self.summary),
+            "history_messages": len(self.messages),
+        }
@@ -1,19 +1,138 @@
-from typing import Optional
+import asyncio
+from concurrent.futures import Future, ThreadPoolExecutor
+import difflib
+import re
+import time
+from typing import AsyncIterator, Iterator, List, Optional, Tuple
 
-from groq import Groq
+from groq import AsyncGroq, Groq
 
+from intelligence.conversation_memory import CONTEXT_BUDGET_TOKENS, ConversationMemory, count_tokens
 from intelligence.intelligence import Intelligence
+from intelligence.tts_normalizer import TTSNormalizer, normalize_for_tts
 from tts.tts import TTS
 
+# a speculative answer is used when its transcript is this close to the final one
+SPECULATION_SIMILARITY = 0.9
+# streamed answers are cut into TTS chunks: the first one short so speech starts early,
+# later ones whole sentences so the voice keeps its prosody
+FIRST_CLAUSE_MIN_CHARS = 12
+CLAUSE_MIN_CHARS = 60
+CLAUSE_MAX_CHARS = 200
+SENTENCE_END_CHARS = ".!?"
+CLAUSE_END_CHARS = ",;:"
+# older turns are folded into a running summary of about this length
+SUMMARY_WORDS = 250
+SUMMARY_PROMPT = f"""You keep the notes of a technical interview that follows a fixed 60-minute plan: introduction and background, technical fundamentals, coding challenges, system design, behavioral questions, candidate questions and wrap-up.
+
+Update the notes with the new part of the transcript. Keep, in at most {SUMMARY_WORDS} words:
+- the stage the interview is in and the stages already covered
+- each question asked and how well the candidate answered it, with any hints given
+- the problem currently being worked on and where the candidate stands with it
+- facts about the candidate worth referring back to
+
+Write plain sentences, no formatting. Reply with the updated notes only."""
+
+
+def transcript_similarity(a: str, b: str) -> float:
+    # word-level, case and punctuation do not count
+    words_a = re.findall(r"[\w']+", a.lower())
+    words_b = re.findall(r"[\w']+", b.lower())
+    if not words_a and not words_b:
+        return 1.0
+    return difflib.SequenceMatcher(None, words_a, words_b).ratio()
+
+
+class ClauseSegmenter:
+    """Cuts streamed LLM tokens into speakable chunks as they arrive.
+
+    The first chunk ends at the first clause or sentence boundary past
+    first_min_chars. Later chunks end at a sentence boundary past
+    min_chars, or at a clause boundary once max_chars is passed. A
+    boundary is punctuation followed by whitespace, so "3.5" never splits.
+    """
+
+    def __init__(
+        self,
+        first_min_chars: int = FIRST_CLAUSE_MIN_CHARS,
+        min_chars: int = CLAUSE_MIN_CHARS,
+        max_chars: int = CLAUSE_MAX_CHARS,
+    ):
+        self.first_min_chars = first_min_chars
+        self.min_chars = min_chars
+        self.max_chars = max_chars
+        self.buffer = ""
+        # characters of buffer already checked for boundaries
+        self._scanned = 0
+        self.chunks = 0
+
+    def feed(self, token: str) -> List[str]:
+        text = self.buffer + token
+        chunks = []
+        start = 0
+        i = self._scanned
+        # the last character waits for the next token to tell if it ends a clause
+        while i < len(text) - 1:
+            char = text[i]
+            if (char in SENTENCE_END_CHARS or char in CLAUSE_END_CHARS) and text[i + 1].isspace():
+                length = i + 1 - start
+                if self.chunks == 0:
+                    cut = length >= self.first_min_chars
+                else:
+                    cut = length >= self.max_chars or (char in SENTENCE_END_CHARS and length >= self.min_chars)
+                if cut:
+                    chunk = text[start : i + 1].strip()
+                    if chunk:
+                        chunks.append(chunk)
+                        self.chunks += 1
+                    start = i + 1
+            i += 1
+        self.buffer = text[start:]
+        self._scanned = i - start
+        return chunks
+
+    def flush(self) -> str:
+        chunk = self.buffer.strip()
+        self.buffer = ""
+        self._scanned = 0
+        if chunk:
+            self.chunks += 1
+        return chunk
+
+
+class Speculation:
+    """A completion started on an interim transcript, kept off the chat history."""
+
+    __slots__ = ("text", "sender_name", "future", "started_at", "done_at", "tokens")
+
+    def __init__(self, text: str, sender_name: str):
+        self.text = text
+        self.sender_name = sender_name
+        self.future: Optional[Future] = None
+        self.started_at = time.monotonic()
+        self.done_at: Optional[float] = None
+        self.tokens = 0
+
 
 class GroqIntelligence(Intelligence):
-    def __init__(self, api_key: str, tts: TTS, model: Optional[str] = None, system_prompt: Optional[str] = None):
+    def __init__(
+        self,
+        api_key: str,
+        tts: TTS,
+        model: Optional[str] = None,
+        system_prompt: Optional[str] = None,
+        stream: bool = False,
+        context_budget_tokens: int = CONTEXT_BUDGET_TOKENS,
+    ):
         self.client = Groq(
             api_key=api_key,
         )
+        # used by agenerate(), which answers on the event loop
+        self.async_client = AsyncGroq(
+            api_key=api_key,
+        )
 
         self.tts = tts
-        self.chat_history = []
         self.model = model or "openai/gpt-oss-120b"  # Default to GPT OSS 120B model
         self.system_prompt = system_prompt or """You are an experienced Software Development Engineer (SDE) interviewer conducting a technical interview for a software engineering position.
 
@@ -86,36 +205,80 @@ Assessment Focus Areas:
 Remember: Speak naturally and directly to the candidate. Your responses will be converted to speech, so ensure they sound natural when spoken aloud. Avoid any text formatting or meta-commentary."""
 
         self.pubsub = None
+
+        # answers drafted on stable interim transcripts, committed if the final one matches
+        self.speculation_similarity = SPECULATION_SIMILARITY
+        self.speculation: Optional[Speculation] = None
+        self.executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="groq-speculation")
+        self.speculations = 0
+        self.speculation_hits = 0
+        self.wasted_tokens = 0
+        self.latency_saved: List[float] = []
+
+        # prompts stay within the budget, older turns are summarized on the executor
+        self.memory = ConversationMemory(
+            summarize=self.summarize,
+            executor=self.executor,
+            budget_tokens=context_budget_tokens,
+        )
+        self.chat_history = self.memory.messages
+
+        # stream tokens and speak each clause as soon as it is complete
+        self.stream = stream
+        # set by a barge-in, stops the answer being streamed
+        self._cut_off = False
+        self.first_clause_latencies: List[float] = []
+
+        # keep chat_history to what the candidate heard when they cut the interviewer off
+        if hasattr(self.tts, "set_interrupt_handler"):
+            self.tts.set_interrupt_handler(self.truncate_response)
     
     def set_pubsub(self, pubsub):
         self.pubsub = pubsub
 
-    def build_messages(self, text: str, sender_name: str):
+    def build_messages(self, text: str, sender_name: str, speculative: bool = False):
         # Build the message with proper context
         human_message = {
             "role": "user",
             "content": f"Candidate ({sender_name}): {text}",
         }
 
+        if speculative:
+            # same context as the real turn would get, without touching the history
+            return self.memory.prompt(self.system_prompt, extra=[human_message], record=False)
+
         # Add message to history
         self.chat_history.append(human_message)
 
-        # Local chat history for context (keep more messages for interview continuity)
-        chat_history = []
-
-        # Add system message with interviewer context
-        chat_history.append(
-            {
-                "role": "system",
-                "content": self.system_prompt,
-            }
+        # System prompt, summary of the older turns and as many recent ones as the budget holds
+        messages = self.memory.prompt(self.system_prompt)
+        print(
+            f"Prompt: {self.memory.prompt_tokens[-1]} tokens, {len(messages)} messages, "
+            f"summary {count_tokens(self.memory.summary)} tokens"
         )
+        return messages
 
-        # Add conversation history (last 40 messages for better interview flow and context retention)
-        chat_history = chat_history + self.chat_history[-40:]
+    def summarize(self, summary: str, messages: List[dict]) -> str:
+        """Fold messages into the running summary, runs on the executor."""
+        transcript = "\n".join(
+            f"Interviewer: {message['content']}" if message["role"] == "assistant" else message["content"]
+            for message in messages
+        )
+        completion = self.client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": SUMMARY_PROMPT},
+                {"role": "user", "content": f"Notes so far:\n{summary or 'None yet.'}\n\nNew transcript:\n{transcript}"},
+            ],
+            temperature=0.2,
+            max_completion_tokens=1024,
+            reasoning_effort="low",
+            stream=False,
+        )
+        return completion.choices[0].message.content.strip()
 
-        # Return local chat history
-        return chat_history
+    def get_memory_stats(self) -> dict:
+        return self.memory.get_stats()
     
     def add_response(self, text):
         ai_message = {
@@ -125,6 +288,31 @@ Remember: Speak naturally and directly to the candidate. Your responses will be
 
         self.chat_history.append(ai_message)
 
+    def truncate_response(self, text: str, spoken: str):
+        """Cut the last response at the TTS chunk ``text`` to its ``spoken`` prefix.
+
+        Everything the interviewer would have said after that point never
+        reached the candidate, so it is dropped from the context as well.
+        """
+        for index in range(len(self.chat_history) - 1, -1, -1):
+            message = self.chat_history[index]
+            if message["role"] != "assistant":
+                continue
+            content = message["content"]
+            # chunk splitting can touch up punctuation, so match on its opening
+            start = content.find(text[:32])
+            if start == -1:
+                return
+            # an answer still streaming stops here as well
+            self._cut_off = True
+            truncated = f"{content[:start]}{spoken}".strip()
+            if truncated:
+                message["content"] = truncated
+            else:
+                del self.chat_history[index]
+            print(f"Response truncated to what was spoken: {truncated!r}")
+            return
+
     def text_generator(self, response):
         """Generate text chunks from streaming response"""
         for chunk in response:
@@ -132,69 +320,319 @@ Remember: Speak naturally and directly to the candidate. Your responses will be
             if content:
                 yield content
 
+    def completion_params(self, messages) -> dict:
+        return dict(
+            model=self.model,
+            messages=messages,
+            temperature=0.7,  # More controlled temperature for professional responses
+            max_completion_tokens=2048,  # Significantly increased for longer, complete responses
+            top_p=0.9,  # More focused responses
+            reasoning_effort="medium",
+            stop=None
+        )
+
+    def complete(self, messages) -> Tuple[str, int]:
+        # generate llm completion using Groq with improved parameters for complete responses
+        completion = self.client.chat.completions.create(
+            **self.completion_params(messages),
+            stream=False,  # Use non-streaming for complete responses
+        )
+        tokens = completion.usage.total_tokens if completion.usage is not None else 0
+
+        # Extract response text directly from non-streaming response
+        return completion.choices[0].message.content.strip(), tokens
+
+    async def acomplete(self, messages) -> Tuple[str, int]:
+        completion = await self.async_client.chat.completions.create(**self.completion_params(messages), stream=False)
+        tokens = completion.usage.total_tokens if completion.usage is not None else 0
+        return completion.choices[0].message.content.strip(), tokens
+
+    def complete_stream(self, messages):
+        return self.client.chat.completions.create(**self.completion_params(messages), stream=True)
+
+    async def acomplete_stream(self, messages):
+        return await self.async_client.chat.completions.create(**self.completion_params(messages), stream=True)
+
+    def stream_clauses(self, response) -> Iterator[str]:
+        """Yield TTS-ready clauses of a streamed completion as they complete.
+
+        Tokens are cleaned as they arrive, so the clauses are cut from the
+        same text _clean_response_for_tts() gives for the whole answer.
+        """
+        normalizer = TTSNormalizer()
+        segmenter = ClauseSegmenter()
+        for token in self.text_generator(response):
+            if self._cut_off:
+                # the candidate took over, the rest of the answer is not needed
+                if hasattr(response, "close"):
+                    response.close()
+                return
+            for clause in segmenter.feed(normalizer.feed(token)):
+                yield clause
+        for clause in segmenter.feed(normalizer.flush()):
+            yield clause
+        tail = segmenter.flush()
+        if tail:
+            yield tail
+
+    async def astream_clauses(self, response) -> AsyncIterator[str]:
+        """stream_clauses() for a completion streamed by the async client."""
+        normalizer = TTSNormalizer()
+        segmenter = ClauseSegmenter()
+        try:
+            async for chunk in response:
+                if self._cut_off:
+                    return
+                token = chunk.choices[0].delta.content
+                if not token:
+                    continue
+                for clause in segmenter.feed(normalizer.feed(token)):
+                    yield clause
+            for clause in segmenter.feed(normalizer.flush()):
+                yield clause
+            tail = segmenter.flush()
+            if tail:
+                yield tail
+        finally:
+            # cut off or cancelled, the rest of the answer is not needed
+            if hasattr(response, "close"):
+                await response.close()
+
+    def _add_clause(self, clause: str, spoken: List[str], message: Optional[dict], started_at: float) -> dict:
+        # the answer goes into chat_history with its first clause and grows with each one after
+        if not spoken:
+            self.first_clause_latencies.append(time.monotonic() - started_at)
+        spoken.append(clause)
+        if message is None:
+            message = {"role": "assistant", "content": clause}
+            self.chat_history.append(message)
+        elif not self._cut_off:
+            message["content"] = " ".join(spoken)
+        return message
+
+    def speak_stream(self, response, started_at: float) -> str:
+        """Speak a streamed completion clause by clause, returns what was generated.
+
+        The answer goes into chat_history with its first clause and grows
+        with each one after, so a barge-in can truncate it mid-stream.
+        """
+        self._cut_off = False
+        spoken: List[str] = []
+        message = None
+
+        def clauses() -> Iterator[str]:
+            nonlocal message
+            for clause in self.stream_clauses(response):
+                message = self._add_clause(clause, spoken, message, started_at)
+                yield clause
+
+        # the iterator is consumed here, each clause goes to the TTS as it completes
+        self.tts.generate(text=clauses())
+        return " ".join(spoken)
+
+    async def aspeak_stream(self, response, started_at: float) -> str:
+        """speak_stream() on the event loop, for a completion from the async client."""
+        self._cut_off = False
+        spoken: List[str] = []
+        message = None
+
+        async def clauses() -> AsyncIterator[str]:
+            nonlocal message
+            stream = self.astream_clauses(response)
+            try:
+                async for clause in stream:
+                    message = self._add_clause(clause, spoken, message, started_at)
+                    yield clause
+            finally:
+                await stream.aclose()
+
+        await self.tts.agenerate(text=clauses())
+        return " ".join(spoken)
+
+    def speculate(self, text: str, sender_name: str):
+        """Start a completion for an interim transcript that has stopped changing.
+
+        Runs on the executor and leaves chat_history alone; generate() uses
+        the result if the final transcript matches, otherwise it is dropped.
+        """
+        current = self.speculation
+        if current is not None and current.text == text and current.sender_name == sender_name:
+            return
+        self.cancel_speculation()
+
+        speculation = Speculation(text=text, sender_name=sender_name)
+        messages = self.build_messages(text, sender_name=sender_name, speculative=True)
+        speculation.future = self.executor.submit(self._run_speculation, speculation, messages)
+        self.speculation = speculation
+        self.speculations += 1
+
+    def _run_speculation(self, speculation: Speculation, messages):
+        try:
+            response_text, speculation.tokens = self.complete(messages)
+            return response_text
+        finally:
+            speculation.done_at = time.monotonic()
+
+    def cancel_speculation(self):
+        speculation = self.speculation
+        if speculation is None:
+            return
+        self.speculation = None
+        # a request already in flight cannot be aborted, its tokens count as wasted once it returns
+        if not speculation.future.cancel():
+            speculation.future.add_done_callback(lambda _: self._add_wasted(speculation))
+
+    def _add_wasted(self, speculation: Speculation):
+        self.wasted_tokens += speculation.tokens
+
+    def _match_speculation(self, text: str, sender_name: str) -> Optional[Speculation]:
+        speculation = self.speculation
+        if speculation is None:
+            return None
+        if speculation.sender_name != sender_name or transcript_similarity(speculation.text, text) < self.speculation_similarity:
+            print(f"Speculation missed: {speculation.text!r} != {text!r}")
+            self.cancel_speculation()
+            return None
+        self.speculation = None
+        return speculation
+
+    def _count_hit(self, speculation: Speculation, final_at: float):
+        # without speculation the completion would only have started at final_at
+        self.speculation_hits += 1
+        self.latency_saved.append(
+            final_at + (speculation.done_at - speculation.started_at) - max(final_at, speculation.done_at)
+        )
+
+    def _take_speculation(self, text: str, sender_name: str) -> Optional[str]:
+        speculation = self._match_speculation(text, sender_name)
+        if speculation is None:
+            return None
+        final_at = time.monotonic()
+        try:
+            response_text = speculation.future.result()
+        except Exception as e:
+            print("Speculative generation failed", e)
+            return None
+        self._count_hit(speculation, final_at)
+        return response_text
+
+    async def _await_speculation(self, speculation: Speculation) -> Optional[str]:
+        final_at = time.monotonic()
+        try:
+            # the draft is still on the executor, the loop keeps running meanwhile
+            response_text = await asyncio.wrap_future(speculation.future)
+        except asyncio.CancelledError:
+            # a request already in flight cannot be aborted, as in cancel_speculation()
+            speculation.future.add_done_callback(lambda _: self._add_wasted(speculation))
+            raise
+        except Exception as e:
+            print("Speculative generation failed", e)
+            return None
+        self._count_hit(speculation, final_at)
+        return response_text
+
+    def get_speculation_stats(self) -> dict:
+        return {
+            "speculations": self.speculations,
+            "hits": self.speculation_hits,
+            "hit_rate": self.speculation_hits / self.speculations if self.speculations else 0.0,
+            "wasted_tokens": self.wasted_tokens,
+            "mean_latency_saved": sum(self.latency_saved) / len(self.latency_saved) if self.latency_saved else 0.0,
+        }
+
     def generate(self, text: str, sender_name: str):
         try:
+            started_at = time.monotonic()
+            # a draft started on the interim transcript saves the whole LLM round trip
+            response_text = self._take_speculation(text, sender_name=sender_name)
+
             # build message history
             messages = self.build_messages(text, sender_name=sender_name)
 
-            # generate llm completion using Groq with improved parameters for complete responses
-            completion = self.client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                temperature=0.7,  # More controlled temperature for professional responses
-                max_completion_tokens=2048,  # Significantly increased for longer, complete responses
-                top_p=0.9,  # More focused responses
-                reasoning_effort="medium",
-                stream=False,  # Use non-streaming for complete responses
-                stop=None
-            )
-
-            # Extract response text directly from non-streaming response
-            response_text = completion.choices[0].message.content.strip()
-            
-            # Clean the response for TTS
-            cleaned_response = self._clean_response_for_tts(response_text)
-
-            if cleaned_response:
-                # Generate TTS for the complete response without chunking to preserve context
-                # Only chunk if response is extremely long (>500 characters)
-                if len(cleaned_response) > 500:
-                    chunks = self._split_response_for_tts(cleaned_response, max_chunk_length=400)
-                    print(f"[SDE Interviewer]: {cleaned_response}")
-                    
-                    # Generate TTS for each chunk with slight delay to ensure proper delivery
-                    for i, chunk in enumerate(chunks):
-                        if chunk.strip():
-                            self.tts.generate(text=chunk.strip())
-                            # Small delay between chunks for better TTS processing
-                            if i < len(chunks) - 1:
-                                import time
-                                time.sleep(0.1)
-                else:
-                    # For shorter responses, send as single TTS request
-                    print(f"[SDE Interviewer]: {cleaned_response}")
-                    self.tts.generate(text=cleaned_response)
-                
-                # publish message in meeting chat
-                if self.pubsub is not None:
-                    self.pubsub(message=f"[SDE Interviewer]: {cleaned_response}")
-
-                # add response to history
-                self.add_response(cleaned_response)
-            else:
-                print("No response generated from Groq")
-                fallback_text = "Could you please repeat that? I want to make sure I understand your response correctly."
-                self.tts.generate(text=fallback_text)
-                if self.pubsub is not None:
-                    self.pubsub(message=f"[SDE Interviewer]: {fallback_text}")
+            if response_text is None and self.stream:
+                # spoken and added to chat_history clause by clause while it streams in
+                if self._publish_streamed(self.speak_stream(self.complete_stream(messages), started_at=started_at)):
+                    return
+                response_text = ""
+            elif response_text is None:
+                response_text, _ = self.complete(messages)
+
+            self._speak_response(response_text, started_at)
 
         except Exception as e:
             print(f"Error generating response with Groq: {e}")
             # Improved fallback response for interviewer context
-            fallback_text = "I'm experiencing some technical difficulties. Let's continue with the next question."
-            self.tts.generate(text=fallback_text)
+            self._speak_fallback("I'm experiencing some technical difficulties. Let's continue with the next question.")
+
+    async def agenerate(self, text: str, sender_name: str):
+        """generate() on the event loop with the async client, as one cancellable turn.
+
+        Cancelling the task stops the completion and the speech it started.
+        """
+        try:
+            started_at = time.monotonic()
+            speculation = self._match_speculation(text, sender_name)
+            # before the first await, the candidate's words stay in the history if the turn is cancelled
+            messages = self.build_messages(text, sender_name=sender_name)
+            response_text = await self._await_speculation(speculation) if speculation is not None else None
+
+            if response_text is None and self.stream:
+                if self._publish_streamed(await self.aspeak_stream(await self.acomplete_stream(messages), started_at=started_at)):
+                    return
+                response_text = ""
+            elif response_text is None:
+                response_text, _ = await self.acomplete(messages)
+
+            self._speak_response(response_text, started_at)
+
+        except asyncio.CancelledError:
+            print(f"Answer to {text!r} cancelled")
+            raise
+        except Exception as e:
+            print(f"Error generating response with Groq: {e}")
+            self._speak_fallback("I'm experiencing some technical difficulties. Let's continue with the next question.")
+
+    def _publish_streamed(self, cleaned_response: str) -> bool:
+        if not cleaned_response:
+            return False
+        print(f"[SDE Interviewer]: {cleaned_response}")
+        if self.pubsub is not None:
+            self.pubsub(message=f"[SDE Interviewer]: {cleaned_response}")
+        return True
+
+    def _speak_response(self, response_text: str, started_at: float):
+        # Clean the response for TTS
+        cleaned_response = self._clean_response_for_tts(response_text)
+
+        if cleaned_response:
+            # add response to history before speaking, so a barge-in can truncate it
+            self.add_response(cleaned_response)
+
+            # Generate TTS for the complete response without chunking to preserve context
+            # Only chunk if response is extremely long (>500 characters)
+            if len(cleaned_response) > 500:
+                chunks = self._split_response_for_tts(cleaned_response, max_chunk_length=400)
+                print(f"[SDE Interviewer]: {cleaned_response}")
+
+                # Send all chunks as one utterance, so a barge-in cancels the rest of them
+                self.tts.generate(text=iter([chunk.strip() for chunk in chunks if chunk.strip()]))
+            else:
+                # For shorter responses, send as single TTS request
+                print(f"[SDE Interviewer]: {cleaned_response}")
+                self.tts.generate(text=cleaned_response)
+            self.first_clause_latencies.append(time.monotonic() - started_at)
+
+            # publish message in meeting chat
             if self.pubsub is not None:
-                self.pubsub(message=f"[SDE Interviewer]: {fallback_text}")
+                self.pubsub(message=f"[SDE Interviewer]: {cleaned_response}")
+        else:
+            print("No response generated from Groq")
+            self._speak_fallback("Could you please repeat that? I want to make sure I understand your response correctly.")
+
+    def _speak_fallback(self, fallback_text: str):
+        self.tts.generate(text=fallback_text)
+        if self.pubsub is not None:
+            self.pubsub(message=f"[SDE Interviewer]: {fallback_text}")
 
     def _split_response_for_tts(self, text: str, max_chunk_length: int = 400):
         """Split long responses into larger chunks for better TTS delivery while preserving context"""
@@ -240,52 +678,4 @@ Remember: Speak naturally and directly to the candidate. Your responses will be
 
     def _clean_response_for_tts(self, text: str) -> str:
         """Clean the response text to make it TTS-friendly"""
-        import re
-        
-        # Remove asterisks and markdown formatting
-        text = re.sub(r'\*+', '', text)
-        
-        # Remove brackets and parenthetical comments that look like stage directions
-        text = re.sub(r'\[.*?\]', '', text)
-        text = re.sub(r'\(.*?\)', lambda m: '' if any(word in m.group().lower() for word in ['note', 'aside', 'thinking', 'pause', 'meta', 'llm', 'ai']) else m.group(), text)
-        
-        # Remove common filler words and phrases
-        filler_patterns = [
-            r'\b(um|uh|er|ah|hmm)\b',
-            r'\byou know\b',
-            r'\bbasically\b',
-            r'\bactually\b(?!\s+implement|coding|working)',  # Keep "actually implement" but remove standalone "actually"
-            r'\blike\b(?!\s+this|that)',  # Keep "like this" but remove standalone "like"
-            r'\bwell\b(?=\s*[,.])',  # Remove "well" when followed by punctuation
-            r'\bso\b(?=\s*[,.])',    # Remove "so" when followed by punctuation
-            r'\bokay\b(?=\s*[,.])',  # Remove "okay" when followed by punctuation
-        ]
-        
-        for pattern in filler_patterns:
-            text = re.sub(pattern, '', text, flags=re.IGNORECASE)
-        
-        # Remove excessive whitespace and normalize
-        text = re.sub(r'\s+', ' ', text)
-        text = text.strip()
-        
-        # Remove any meta-commentary patterns
-        meta_patterns = [
-            r'^\*.*?\*\s*',  # Remove leading asterisk comments
-            r'\*.*?\*',      # Remove any remaining asterisk comments
-            r'\bnow\s+(?:let\'s|let\s+us|we\s+will|we\s+should)\b',  # Remove "now let's" transitions
-        ]
-        
-        for pattern in meta_patterns:
-            text = re.sub(pattern, '', text, flags=re.IGNORECASE)
-        
-        # Clean up punctuation issues caused by removals
-        text = re.sub(r'\s*,\s*,', ',', text)  # Remove double commas
-        text = re.sub(r'\s*\.\s*\.', '.', text)  # Remove double periods
-        text = re.sub(r'^[,.\s]+', '', text)  # Remove leading punctuation
-        text = re.sub(r'[,.\s]+$', '.', text)  # Ensure proper ending
-        
-        # Ensure the response ends with proper punctuation
-        if text and not text[-1] in '.!?':
-            text += '.'
-        
-        return text.strip()
+        return normalize_for_tts(text)
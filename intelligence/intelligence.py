@@ -1,3 +1,4 @@
+import asyncio
 from abc import ABC, abstractmethod
 from videosdk import Stream
 
@@ -11,3 +12,11 @@ class Intelligence(ABC):
     def generate(self, text: str, sender_name: str):
         """generate new message based on text."""
         pass
+
+    async def agenerate(self, text: str, sender_name: str):
+        """generate on the event loop, runs generate() on a worker thread by default."""
+        await asyncio.get_running_loop().run_in_executor(None, self.generate, text, sender_name)
+
+    def speculate(self, text: str, sender_name: str):
+        """start generating for a transcript that may still change, optional."""
+        pass
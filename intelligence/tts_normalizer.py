@@ -0,0 +1,156 @@
+import re
+
+# markup the LLM should not produce but sometimes does; [^...\n] is what .*? matched
+BRACKETED = re.compile(r"\[[^\]\n]*\]")
+PARENTHESIZED = re.compile(r"\([^)\n]*\)")
+# a parenthetical is dropped when it reads like a stage direction
+ASIDE_WORDS = ("note", "aside", "thinking", "pause", "meta", "llm", "ai")
+
+# filler removal keeps the order of the original passes: the lookaheads of the
+# later ones see the text with the earlier ones already removed. The first
+# three never interact, so they share one pass.
+FILLER_PASSES = (
+    re.compile(r"\b(?:um|uh|er|ah|hmm|basically)\b|\byou know\b", re.IGNORECASE),
+    re.compile(r"\bactually\b(?!\s+implement|coding|working)", re.IGNORECASE),
+    re.compile(r"\blike\b(?!\s+this|that)", re.IGNORECASE),
+    re.compile(r"\bwell\b(?=\s*[,.])", re.IGNORECASE),
+    re.compile(r"\bso\b(?=\s*[,.])", re.IGNORECASE),
+    re.compile(r"\bokay\b(?=\s*[,.])", re.IGNORECASE),
+)
+WHITESPACE = re.compile(r"\s+")
+TRANSITION = re.compile(r"\bnow\s+(?:let\'s|let\s+us|we\s+will|we\s+should)\b", re.IGNORECASE)
+DOUBLE_COMMA = re.compile(r"\s*,\s*,")
+DOUBLE_PERIOD = re.compile(r"\s*\.\s*\.")
+LEADING_PUNCTUATION = re.compile(r"^[,.\s]+")
+
+# no filler or transition match contains these, and every lookahead before one
+# is decided by it, so text can be cleaned in pieces cut right after them
+WORD_STAGE_CUTS = ".,!?;:"
+# a run of these at the end can still merge with what comes next
+PUNCTUATION_TAIL = re.compile(r"[,.\s]*\Z")
+
+
+def _aside(match: re.Match) -> str:
+    text = match.group()
+    return "" if any(word in text.lower() for word in ASIDE_WORDS) else text
+
+
+def _open_from(text: str, opener: str, closer: str) -> int:
+    # start of an opener that may still be closed by text yet to come
+    start = max(text.rfind(closer), text.rfind("\n")) + 1
+    index = text.find(opener, start)
+    return len(text) if index == -1 else index
+
+
+class TTSNormalizer:
+    """Turns LLM output into text fit for TTS, chunk by chunk as it streams.
+
+    feed() returns the cleaned text that can no longer change, flush()
+    the rest; together they equal normalize_for_tts() of the whole text.
+    Markup is removed as soon as it closes, fillers and transitions once a
+    punctuation mark ends the words around them, and punctuation runs once
+    a word follows them. Every pattern is compiled once at import.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self._brackets = ""
+        self._parens = ""
+        self._words = ""
+        self._tail = ""
+        # nothing but whitespace and punctuation emitted so far
+        self._words_at_start = True
+        self._at_start = True
+        self._last = ""
+
+    def feed(self, text: str) -> str:
+        return self._punctuation(self._word_stage(self._markup(text)))
+
+    def flush(self) -> str:
+        text = self._markup_flush()
+        text = self._word_stage(text, final=True)
+        out = self._punctuation(text)
+        tail = self._clean_punctuation(self._tail)
+        self._tail = ""
+        if self._at_start:
+            tail = LEADING_PUNCTUATION.sub("", tail)
+        if tail:
+            # a trailing punctuation run becomes one period
+            out += "."
+        elif self._last and self._last not in ".!?":
+            out += "."
+        self.reset()
+        return out
+
+    def _markup(self, text: str) -> str:
+        if not (self._brackets or self._parens or "*" in text or "[" in text or "(" in text):
+            # most tokens carry no markup at all
+            return text
+        # asterisks go first, then brackets, then parentheticals, as in the original passes
+        text = self._brackets + text.replace("*", "")
+        text = BRACKETED.sub("", text)
+        cut = _open_from(text, "[", "]")
+        self._brackets = text[cut:]
+
+        text = self._parens + text[:cut]
+        text = PARENTHESIZED.sub(_aside, text)
+        cut = _open_from(text, "(", ")")
+        self._parens = text[cut:]
+        return text[:cut]
+
+    def _markup_flush(self) -> str:
+        # an opener never closed stays as it is
+        text = PARENTHESIZED.sub(_aside, self._parens + self._brackets)
+        self._brackets = self._parens = ""
+        return text
+
+    def _word_stage(self, text: str, final: bool = False) -> str:
+        if final:
+            cut = len(self._words) + len(text)
+        else:
+            cut = max(text.rfind(char) for char in WORD_STAGE_CUTS) + 1
+            if not cut:
+                self._words += text
+                return ""
+            cut += len(self._words)
+        text = self._words + text
+        self._words = text[cut:]
+        text = text[:cut]
+        if not text:
+            return ""
+
+        for pattern in FILLER_PASSES:
+            text = pattern.sub("", text)
+        text = WHITESPACE.sub(" ", text)
+        if self._words_at_start:
+            text = text.lstrip()
+            self._words_at_start = not text
+        if final:
+            text = text.rstrip()
+        return TRANSITION.sub("", text)
+
+    def _clean_punctuation(self, text: str) -> str:
+        text = DOUBLE_COMMA.sub(",", text)
+        return DOUBLE_PERIOD.sub(".", text)
+
+    def _punctuation(self, text: str) -> str:
+        if not text:
+            return ""
+        text = self._tail + text
+        cut = PUNCTUATION_TAIL.search(text).start()
+        self._tail = text[cut:]
+        text = self._clean_punctuation(text[:cut])
+        if not text:
+            return ""
+        if self._at_start:
+            text = LEADING_PUNCTUATION.sub("", text)
+            self._at_start = False
+        self._last = text[-1]
+        return text
+
+
+def normalize_for_tts(text: str) -> str:
+    normalizer = TTSNormalizer()
+    return normalizer.feed(text) + normalizer.flush()
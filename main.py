@@ -14,6 +14,7 @@ from agent.agent import AIInterviewer
 from agent.audio_stream_track import CustomAudioStreamTrack
 from intelligence.groq_intelligence import GroqIntelligence
 from stt.deepgram_stt import DeepgramSTT
+from tts.audio_cache import AudioCache
 from tts.deepgram_tts import DeepgramTTS
 
 load_dotenv()
@@ -47,6 +48,8 @@ async def run():
         tts_client = DeepgramTTS(
             api_key=stt_api_key,
             output_track=audio_track,
+            loop=loop,
+            cache=AudioCache(),
         )
         
         # intelligence client - SDE Interviewer
@@ -54,6 +57,7 @@ async def run():
             api_key=llm_api_key, 
             model="openai/gpt-oss-120b", 
             tts=tts_client,
+            stream=True,
             system_prompt=(
                 "You are a Senior Software Development Engineer conducting a comprehensive technical interview. "
                 "Your goal is to assess the candidate's technical skills, problem-solving abilities, and overall fit for software engineering roles. "
@@ -1,6 +1,11 @@
 from asyncio.log import logger
+import asyncio
+from collections import deque
+import json
+import threading
+import time
 import traceback
-from typing import Dict, List
+from typing import Callable, Deque, Dict, List, Optional, Tuple, Union
 from deepgram import (
     DeepgramClient,
     DeepgramClientOptions,
@@ -8,13 +13,16 @@ from deepgram import (
     LiveOptions,
     ListenWebSocketClient
 )
-from asyncio import AbstractEventLoop, Task
+from asyncio import AbstractEventLoop, Task, TimerHandle
 import numpy as np
 from datetime import datetime, timezone
 from vsaiortc.mediastreams import MediaStreamError
 from videosdk import Stream
 from stt.stt import STT
 from intelligence.intelligence import Intelligence
+from agent.audio_ring_buffer import AudioRingBuffer
+from agent.audio_resampler import StreamingResampler
+from stt.end_of_turn import EndOfTurnDetector, TurnEventLog
 
 LEARNING_RATE = 0.1
 LENGTH_THRESHOLD = 5
@@ -22,6 +30,613 @@ SMOOTHING_FACTOR = 3
 BASE_WPM = 150.0
 VAD_THRESHOLD_MS = 25
 UTTERANCE_CUTOFF_MS = 300
+# candidate audio is downmixed and resampled to this before it goes to Deepgram
+STT_SAMPLE_RATE = 16000
+STT_CHANNELS = 1
+# local voice-activity gate in front of Deepgram
+VAD_MARGIN_DB = 10          # speech is this far above the tracked noise floor
+VAD_MIN_SPEECH_DBFS = -45   # and never quieter than this
+VAD_ONSET_MS = 40           # speech needed before the gate opens
+VAD_HANGOVER_MS = 400       # silence kept open after speech, lets Deepgram endpoint
+VAD_PREROLL_MS = 300        # audio replayed ahead of an onset so words are not clipped
+KEEPALIVE_INTERVAL_S = 5    # Deepgram closes idle sockets after 10 s without data
+# audio batched into one websocket write, 0 sends every 20 ms frame on its own
+COALESCE_WINDOW_MS = 60
+# batches a peer's writer may hold before the full-queue policy kicks in
+WRITER_QUEUE_SIZE = 50
+# audio kept per peer and replayed into a new connection after a drop
+REPLAY_SECONDS = 5
+RECONNECT_BACKOFF_S = 0.25
+RECONNECT_BACKOFF_MAX_S = 8.0
+# peers sharing one multichannel connection in multiplexed mode
+MULTIPLEX_CHANNELS = 4
+# audio a channel holds beyond a window before it is read, absorbs frame jitter
+MULTIPLEX_JITTER_MS = 20
+# a warm connection whose peer has no audio stream is closed after this long
+IDLE_TIMEOUT_S = 120
+# interim transcript unchanged this long starts a speculative LLM answer
+SPECULATION_STABLE_MS = 300
+
+
+def frame_to_ndarray(frame) -> np.ndarray:
+    # (samples, channels) int16 view of a WebRTC audio frame, packed or planar
+    channels = len(frame.layout.channels)
+    audio_data = frame.to_ndarray()
+    if frame.format.is_planar:
+        return audio_data.T
+    return audio_data.reshape(-1, channels)
+
+
+class VoiceActivityGate:
+    """Energy VAD with an adaptive noise floor, onset, hangover and pre-roll.
+
+    Feeds on the converted STT audio of one peer and returns the audio that
+    should be streamed: nothing while the peer is silent, the buffered
+    pre-roll plus the current frame when speech starts.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int,
+        margin_db: float = VAD_MARGIN_DB,
+        min_speech_dbfs: float = VAD_MIN_SPEECH_DBFS,
+        onset_ms: int = VAD_ONSET_MS,
+        hangover_ms: int = VAD_HANGOVER_MS,
+        preroll_ms: int = VAD_PREROLL_MS,
+    ):
+        self.sample_rate = sample_rate
+        self.margin_db = margin_db
+        self.min_speech_dbfs = min_speech_dbfs
+        self.onset_samples = sample_rate * onset_ms // 1000
+        self.hangover_samples = sample_rate * hangover_ms // 1000
+        self.preroll_samples = sample_rate * preroll_ms // 1000
+
+        self.noise_floor_dbfs = -60.0
+        self.is_speech = False
+        # raw decision for the last frame, before onset and hangover smoothing
+        self.voiced = False
+        self._voiced_samples = 0
+        self._silent_samples = 0
+        self._preroll: Deque[bytes] = deque()
+        self._preroll_size = 0
+
+        self.speech_samples = 0
+        self.silence_samples = 0
+
+    def level_dbfs(self, samples: np.ndarray) -> float:
+        if len(samples) == 0:
+            return -120.0
+        rms = np.sqrt(np.mean(np.square(samples, dtype=np.float32)))
+        return float(20 * np.log10(max(rms, 1.0) / 32768))
+
+    def process(self, pcm_frame: bytes) -> bytes:
+        samples = np.frombuffer(pcm_frame, dtype=np.int16)
+        n = len(samples)
+        level = self.level_dbfs(samples)
+        voiced = level > max(self.noise_floor_dbfs + self.margin_db, self.min_speech_dbfs)
+        self.voiced = voiced
+
+        if not voiced:
+            # floor drops fast and creeps up slowly, so speech does not drag it along
+            rate = 0.5 if level < self.noise_floor_dbfs else 0.02
+            self.noise_floor_dbfs += rate * (level - self.noise_floor_dbfs)
+
+        if self.is_speech:
+            self._silent_samples = 0 if voiced else self._silent_samples + n
+            if self._silent_samples > self.hangover_samples:
+                self.is_speech = False
+                self._voiced_samples = 0
+        else:
+            self._voiced_samples = self._voiced_samples + n if voiced else 0
+            if self._voiced_samples >= self.onset_samples:
+                self.is_speech = True
+                self._silent_samples = 0
+                preroll = b"".join(self._preroll)
+                self._preroll.clear()
+                self._preroll_size = 0
+                self.speech_samples += n
+                return preroll + pcm_frame
+
+        if self.is_speech:
+            self.speech_samples += n
+            return pcm_frame
+
+        self.silence_samples += n
+        self._preroll.append(pcm_frame)
+        self._preroll_size += n
+        while self._preroll_size - len(self._preroll[0]) // 2 >= self.preroll_samples:
+            self._preroll_size -= len(self._preroll.popleft()) // 2
+        return b""
+
+    @property
+    def speech_ratio(self) -> float:
+        total = self.speech_samples + self.silence_samples
+        return self.speech_samples / total if total else 0.0
+
+    def get_stats(self) -> dict:
+        return {
+            "speech_seconds": self.speech_samples / self.sample_rate,
+            "silence_seconds": self.silence_samples / self.sample_rate,
+            "speech_ratio": self.speech_ratio,
+            "noise_floor_dbfs": self.noise_floor_dbfs,
+        }
+
+
+class FrameCoalescer:
+    """Batches converted audio into one websocket write per window."""
+
+    __slots__ = (
+        "window_samples",
+        "_pending",
+        "_pending_samples",
+        "_pending_voiced",
+        "last_voiced",
+        "sends",
+        "bytes_sent",
+    )
+
+    def __init__(self, sample_rate: int, window_ms: int = COALESCE_WINDOW_MS):
+        self.window_samples = sample_rate * window_ms // 1000
+        self._pending = bytearray()
+        self._pending_samples = 0
+        self._pending_voiced = False
+        # whether the batch last returned held any voiced frame
+        self.last_voiced = False
+        self.sends = 0
+        self.bytes_sent = 0
+
+    def add(self, pcm_frame: bytes, voiced: bool = True) -> bytes:
+        # returns the batch once the window is full, b"" while it is filling
+        self._pending += pcm_frame
+        self._pending_samples += len(pcm_frame) // 2
+        self._pending_voiced = self._pending_voiced or voiced
+        if self._pending_samples >= self.window_samples:
+            return self.flush()
+        return b""
+
+    def flush(self) -> bytes:
+        if not self._pending:
+            return b""
+        batch = bytes(self._pending)
+        self._pending.clear()
+        self._pending_samples = 0
+        self.last_voiced = self._pending_voiced
+        self._pending_voiced = False
+        self.sends += 1
+        self.bytes_sent += len(batch)
+        return batch
+
+
+class AudioWriter:
+    """Per-peer writer thread draining a bounded queue into a Deepgram connection.
+
+    The Deepgram client sends synchronously, so all socket I/O for a peer,
+    the opening handshake included, happens here and the event loop never
+    waits on STT network I/O. When the
+    queue is full the oldest silent item is dropped; if there is none, put()
+    waits asynchronously, which only holds back that peer's stream task.
+
+    The last few seconds of audio sent are kept. If the connection drops,
+    a new one is opened with exponential backoff and that audio is replayed
+    into it, so speech in flight at the time of the drop is not lost.
+
+    connect(writer, base) opens a connection that reports its drops to the
+    writer it is given. The thread only runs once start() is called, after
+    the owner has stored the writer wherever its callbacks look for it.
+    """
+
+    def __init__(
+        self,
+        loop: AbstractEventLoop,
+        connect: Callable[["AudioWriter", float], ListenWebSocketClient],
+        name: str,
+        max_queue: int = WRITER_QUEUE_SIZE,
+        samples_per_second: int = STT_SAMPLE_RATE * STT_CHANNELS,
+        replay_seconds: float = REPLAY_SECONDS,
+    ):
+        self.loop = loop
+        self._connect = connect
+        self.connection: Optional[ListenWebSocketClient] = None
+        self.max_queue = max_queue
+        self._queue: Deque[tuple] = deque()
+        self._cond = threading.Condition()
+        self._space = asyncio.Event()
+        self._waiting = False
+        self._closed = False
+        self._stopping = threading.Event()
+        self._reconnect_requested = False
+
+        # replay window, and the audio clock shared by every connection of the peer
+        self.samples_per_second = samples_per_second
+        replay_samples = int(samples_per_second * replay_seconds)
+        self._replay = AudioRingBuffer(capacity=replay_samples, max_read=replay_samples)
+        self.samples_sent = 0
+        self.reconnects = 0
+        self.connect_failures = 0
+        self.replayed_seconds = 0.0
+
+        self.max_depth = 0
+        self.dropped = 0
+        self.dropped_bytes = 0
+        self.blocked_seconds = 0.0
+        self.sent = 0
+
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    @property
+    def depth(self) -> int:
+        return len(self._queue)
+
+    def _drop_silence(self) -> bool:
+        for index, (data, silent) in enumerate(self._queue):
+            if silent:
+                del self._queue[index]
+                self.dropped += 1
+                self.dropped_bytes += len(data)
+                return True
+        return False
+
+    def _append(self, data: Union[bytes, str], silent: bool):
+        self._queue.append((data, silent))
+        self.max_depth = max(self.max_depth, len(self._queue))
+        self._cond.notify()
+
+    async def put(self, data: Union[bytes, str], silent: bool = False):
+        while True:
+            with self._cond:
+                if self._closed:
+                    return
+                if len(self._queue) < self.max_queue or self._drop_silence():
+                    self._append(data, silent)
+                    return
+                self._waiting = True
+                self._space.clear()
+            # only this peer's stream task waits, the loop keeps running
+            waited_at = time.monotonic()
+            await self._space.wait()
+            self.blocked_seconds += time.monotonic() - waited_at
+
+    def put_control(self, message: str):
+        # control messages are never dropped and do not count against the bound
+        with self._cond:
+            if not self._closed:
+                self._append(message, False)
+
+    def close(self):
+        # everything already queued is still sent, then the connection is finished
+        with self._cond:
+            self._closed = True
+            self._stopping.set()
+            self._cond.notify()
+
+    def request_reconnect(self):
+        # called from the Deepgram client's threads when the socket closes under us
+        with self._cond:
+            if not self._closed:
+                self._reconnect_requested = True
+                self._cond.notify()
+
+    def _remember(self, data: bytes):
+        samples = np.frombuffer(data[: len(data) - len(data) % 2], dtype=np.int16)
+        samples = samples[-self._replay.capacity :]
+        overflow = self._replay.available + len(samples) - self._replay.capacity
+        if overflow > 0:
+            self._replay.consume(overflow)
+        self._replay.write(samples)
+        self.samples_sent += len(data) // 2
+
+    def _open(self) -> Optional[ListenWebSocketClient]:
+        # the new connection's clock starts at the first replayed sample
+        replay = self._replay.view(self._replay.available)
+        replay = replay.tobytes() if replay is not None else b""
+        base = (self.samples_sent - len(replay) // 2) / self.samples_per_second
+        delay = RECONNECT_BACKOFF_S
+        while not self._stopping.is_set():
+            try:
+                connection = self._connect(self, base)
+                if replay:
+                    connection.send(replay)
+                    self.replayed_seconds += len(replay) / 2 / self.samples_per_second
+                return connection
+            except Exception as e:
+                self.connect_failures += 1
+                print(f"Error while connecting to STT Server, retrying in {delay}s", e)
+            self._stopping.wait(delay)
+            delay = min(delay * 2, RECONNECT_BACKOFF_MAX_S)
+        return None
+
+    def _reconnect(self):
+        connection = self.connection
+        self.connection = None
+        if connection is not None:
+            try:
+                connection.finish()
+            except Exception as e:
+                print("Error while closing STT connection", e)
+        self.reconnects += 1
+        self.connection = self._open()
+
+    def _run(self):
+        # audio queued while the handshake is in flight is sent once it completes
+        self.connection = self._open()
+
+        while True:
+            with self._cond:
+                while not self._queue and not self._closed and not self._reconnect_requested:
+                    self._cond.wait()
+                reconnect = self._reconnect_requested and not self._closed
+                self._reconnect_requested = False
+                if self._queue:
+                    data, _ = self._queue.popleft()
+                    if self._waiting:
+                        self._waiting = False
+                        self.loop.call_soon_threadsafe(self._space.set)
+                elif reconnect:
+                    data = None
+                else:
+                    break
+            if reconnect:
+                print("STT connection closed, reconnecting")
+                self._reconnect()
+            if data is None:
+                continue
+            if isinstance(data, bytes):
+                self._remember(data)
+            if self.connection is None:
+                continue
+            try:
+                sent = self.connection.send(data)
+            except Exception as e:
+                print("Error while writing audio to STT Server", e)
+                sent = False
+            if sent:
+                self.sent += 1
+            elif not self._closed:
+                print("STT connection lost, reconnecting")
+                self._reconnect()
+                # the audio is in the replay, control messages have to go again
+                if isinstance(data, str) and self.connection is not None:
+                    self.connection.send(data)
+
+        if self.connection is not None:
+            try:
+                # finish() joins the SDK threads, so it belongs here and not on the loop
+                self.connection.finish()
+            except Exception as e:
+                print("Error while closing STT connection", e)
+
+    def get_stats(self) -> dict:
+        return {
+            "depth": self.depth,
+            "max_depth": self.max_depth,
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "dropped_bytes": self.dropped_bytes,
+            "blocked_seconds": self.blocked_seconds,
+            "reconnects": self.reconnects,
+            "connect_failures": self.connect_failures,
+            "replayed_seconds": self.replayed_seconds,
+        }
+
+
+class ChannelMultiplexer:
+    """Interleaves the audio of several peers into the channels of one connection.
+
+    Each peer gets a channel slot. A task on the loop emits one window every
+    window_ms with all channels time aligned; a channel without audio gets
+    silence, and a channel is only read once it holds a window plus a jitter
+    margin, or its speech has ended. Windows where no channel has audio are
+    not sent, so the local VAD still keeps silence off the socket.
+    """
+
+    def __init__(
+        self,
+        loop: AbstractEventLoop,
+        connect: Callable[["ChannelMultiplexer", AudioWriter, float], ListenWebSocketClient],
+        name: str,
+        channels: int = MULTIPLEX_CHANNELS,
+        sample_rate: int = STT_SAMPLE_RATE,
+        window_ms: int = COALESCE_WINDOW_MS,
+        jitter_ms: int = MULTIPLEX_JITTER_MS,
+    ):
+        self.loop = loop
+        self.name = name
+        self.channels = channels
+        self.sample_rate = sample_rate
+        self.window = sample_rate * window_ms // 1000
+        self.jitter = sample_rate * jitter_ms // 1000
+        self.slots: List[Optional["PeerSession"]] = [None] * channels
+        self._rings = [AudioRingBuffer(capacity=sample_rate * 2, max_read=self.window) for _ in range(channels)]
+        self._primed = [False] * channels
+        self._ended = [False] * channels
+        self._block = np.zeros((self.window, channels), dtype=np.int16)
+        self._closed = False
+
+        self.windows_sent = 0
+        self.underruns = 0
+
+        self.writer = AudioWriter(
+            loop=loop,
+            connect=lambda writer, base: connect(self, writer, base),
+            name=name,
+            samples_per_second=sample_rate * channels,
+        )
+        self.writer.start()
+        self._task = loop.create_task(self._run())
+
+    @property
+    def free(self) -> int:
+        return self.slots.count(None)
+
+    def allocate(self, session: "PeerSession") -> Optional[int]:
+        for index, slot in enumerate(self.slots):
+            if slot is None:
+                self.slots[index] = session
+                self._reset(index)
+                return index
+        return None
+
+    def release(self, index: int) -> bool:
+        # True once no peer is left on the connection
+        self.slots[index] = None
+        self._reset(index)
+        return self.free == self.channels
+
+    def session_for(self, channel: int) -> Optional["PeerSession"]:
+        return self.slots[channel] if 0 <= channel < self.channels else None
+
+    def _reset(self, index: int):
+        self._rings[index].clear()
+        self._primed[index] = False
+        self._ended[index] = False
+
+    def push(self, index: int, pcm_frame: bytes):
+        self._rings[index].write_bytes(pcm_frame)
+        self._ended[index] = False
+
+    def end(self, index: int):
+        # the peer stopped speaking, what is left is read without waiting for a full window
+        self._ended[index] = True
+
+    def flush(self):
+        # everything buffered goes out now, ahead of a Finalize
+        while True:
+            batch = self._emit(force=True)
+            if not batch:
+                return
+            self.writer.put_control(batch)
+
+    def _emit(self, force: bool = False, catch_up: bool = False) -> bytes:
+        block = self._block
+        block.fill(0)
+        audio = False
+        for index, ring in enumerate(self._rings):
+            if self.slots[index] is None:
+                continue
+            available = ring.available
+            ended = self._ended[index] or force
+            if catch_up and available < self.window + self.jitter:
+                continue
+            if not self._primed[index]:
+                if available >= self.window + self.jitter or (available and ended):
+                    self._primed[index] = True
+                else:
+                    continue
+            if available < self.window and not ended:
+                # a late frame, the channel waits for its margin again
+                self.underruns += 1
+                self._primed[index] = False
+                continue
+            if ring.read_into(block[:, index], self.window):
+                audio = True
+            if ended and not ring.available:
+                self._primed[index] = False
+        if not audio:
+            return b""
+        self.windows_sent += 1
+        return block.tobytes()
+
+    async def _run(self):
+        try:
+            period = self.window / self.sample_rate
+            deadline = time.monotonic()
+            last_sent = deadline
+            while not self._closed:
+                deadline += period
+                await asyncio.sleep(max(0.0, deadline - time.monotonic()))
+                batch = self._emit()
+                while batch:
+                    await self.writer.put(batch)
+                    last_sent = time.monotonic()
+                    # a pre-roll burst leaves a backlog, catch up instead of carrying the latency
+                    batch = self._emit(catch_up=True)
+                if time.monotonic() - last_sent >= KEEPALIVE_INTERVAL_S:
+                    self.writer.put_control(json.dumps({"type": "KeepAlive"}))
+                    last_sent = time.monotonic()
+        except Exception as e:
+            traceback.print_exc()
+            print("Error while multiplexing audio to STT Server", e)
+
+    def close(self):
+        self._closed = True
+        self._task.cancel()
+        self.writer.close()
+
+    def get_stats(self) -> dict:
+        return {
+            "channels": self.channels,
+            "peers": self.channels - self.free,
+            "windows_sent": self.windows_sent,
+            "underruns": self.underruns,
+            "writer": self.writer.get_stats(),
+        }
+
+
+class PeerSession:
+    """Transcription state of one participant: connection, buffers and WPM model."""
+
+    __slots__ = (
+        "peer_id",
+        "peer_name",
+        "connection",
+        "task",
+        "finalize_called",
+        "buffer",
+        "words_buffer",
+        "wpm",
+        "speed_coefficient",
+        "resampler",
+        "vad_gate",
+        "coalescer",
+        "writer",
+        "idle_handle",
+        "keepalive_handle",
+        "stream_started_at",
+        "end_of_turn",
+        "interim_text",
+        "interim_changed_at",
+        "speculated_text",
+        "transcribed_until",
+        "awaiting_finalize",
+        "multiplexer",
+        "channel",
+    )
+
+    def __init__(self, peer_id: str, peer_name: str, wpm: float = BASE_WPM):
+        self.peer_id = peer_id
+        self.peer_name = peer_name
+        self.connection: Optional[ListenWebSocketClient] = None
+        self.task: Optional[Task] = None
+        self.finalize_called = False
+        self.buffer = ""
+        self.words_buffer = []
+        self.wpm = wpm
+        self.speed_coefficient = wpm / BASE_WPM
+        self.resampler: Optional[StreamingResampler] = None
+        self.vad_gate: Optional[VoiceActivityGate] = None
+        self.coalescer: Optional[FrameCoalescer] = None
+        self.writer: Optional[AudioWriter] = None
+        # warm-connection timers while the peer has no audio stream
+        self.idle_handle: Optional[TimerHandle] = None
+        self.keepalive_handle: Optional[TimerHandle] = None
+        # set when a stream starts, cleared by its first transcript
+        self.stream_started_at: Optional[float] = None
+        self.end_of_turn: Optional[EndOfTurnDetector] = None
+        # finals plus the latest interim, and what was last handed to speculation
+        self.interim_text = ""
+        self.interim_changed_at = 0.0
+        self.speculated_text = ""
+        # end of the last final result on the peer's audio clock, across reconnects
+        self.transcribed_until = 0.0
+        # a Finalize was sent because the local end-of-turn detector fired
+        self.awaiting_finalize = False
+        # shared connection and channel slot in multiplexed mode
+        self.multiplexer: Optional[ChannelMultiplexer] = None
+        self.channel = 0
+
 
 class DeepgramSTT(STT):
 
@@ -30,81 +645,228 @@ class DeepgramSTT(STT):
         loop: AbstractEventLoop,
         api_key,
         language,
-        intelligence:Intelligence
+        intelligence:Intelligence,
+        sample_rate: int = STT_SAMPLE_RATE,
+        vad_enabled: bool = True,
+        coalesce_ms: int = COALESCE_WINDOW_MS,
+        idle_timeout_s: float = IDLE_TIMEOUT_S,
+        end_of_turn: bool = True,
+        event_log_path: Optional[str] = None,
+        speculation_ms: Optional[int] = SPECULATION_STABLE_MS,
+        multiplex: bool = False,
+        multiplex_channels: int = MULTIPLEX_CHANNELS,
     ) -> None:
         self.loop = loop
 
+        # format sent to Deepgram, every peer is converted to it on the way out
+        self.sample_rate = sample_rate
+        self.channels = STT_CHANNELS
+
+        # only speech is streamed when the local VAD gate is on
+        self.vad_enabled = vad_enabled
+        # websocket writes are batched to this window, flushed early on onset and finalize
+        self.coalesce_ms = coalesce_ms
+
         self.vad_threshold_ms: int = VAD_THRESHOLD_MS
         self.utterance_cutoff_ms: int = UTTERANCE_CUTOFF_MS
         self.model = "nova-2"
-        self.speed_coefficient: float = 1.0
-        self.wpm_0 = BASE_WPM * self.speed_coefficient
-        self.wpm = self.wpm_0
-        self.speed_coefficient = self.speed_coefficient
-
-        self.buffer = ""
-        self.words_buffer = []
+        # speaking rate every new peer starts from, each session then tracks its own
+        self.wpm_0 = BASE_WPM
 
         self.deepgram_client = DeepgramClient(
             api_key=api_key,
             config=DeepgramClientOptions(options={"keepalive": True}),
         )
         self.language = language
-        self.deepgram_connections:Dict[str,ListenWebSocketClient] = {}
-        self.audio_tasks:Dict[str, Task] = {}
 
-        self.finalize_called: Dict[str, bool] = {}
+        # one session per participant being transcribed
+        self.sessions: Dict[str, PeerSession] = {}
+
+        # connections are opened when a participant joins and survive mic toggles
+        self.idle_timeout_s = idle_timeout_s
+        self.handshakes = 0
+        self.handshake_seconds: List[float] = []
+        self.first_transcript_latencies: List[float] = []
+
+        # turns are finalized locally instead of waiting for Deepgram's speech_final
+        self.end_of_turn_enabled = end_of_turn
+        # transcript and voice events for offline end-of-turn evaluation
+        self.event_log = TurnEventLog(event_log_path) if event_log_path else None
+        # None waits for the final transcript before the LLM is asked
+        self.speculation_ms = speculation_ms
+
+        # peers share multichannel connections instead of one connection each
+        self.multiplex = multiplex
+        self.multiplex_channels = multiplex_channels
+        self.multiplexers: List[ChannelMultiplexer] = []
 
         # intelligence
         self.intelligence = intelligence
         self.pubsub = None
+        # answers are generated in a task on the loop, a newer turn cancels the one in flight
+        self.turn: Optional[Task] = None
+        # time the SDK's receive threads spent in our transcript callbacks
+        self.callbacks = 0
+        self.callback_seconds = 0.0
+        self.max_callback_seconds = 0.0
+
+        # called when a candidate starts speaking, so the agent can stop talking
+        self.barge_in = None
     
     def set_pubsub(self, pubsub):
         self.pubsub = pubsub
 
-    def start(self, peer_id: str, peer_name: str, stream:Stream):
+    def set_barge_in(self, barge_in):
+        self.barge_in = barge_in
+
+    def prepare(self, peer_id: str, peer_name: str) -> PeerSession:
+        """Open the peer's Deepgram connection ahead of its audio stream.
+
+        Called when a participant joins, so the websocket handshake is done
+        by the time they unmute. The handshake runs on the peer's writer
+        thread; audio queued meanwhile is sent as soon as it completes.
+        """
+        session = self.sessions.get(peer_id)
+        if session is not None:
+            return session
+        session = PeerSession(peer_id=peer_id, peer_name=peer_name, wpm=self.wpm_0)
+        # nothing to finalize until a stream starts
+        session.finalize_called = True
+        if self.vad_enabled:
+            session.vad_gate = VoiceActivityGate(sample_rate=self.sample_rate)
+        if self.end_of_turn_enabled:
+            session.end_of_turn = EndOfTurnDetector()
+            session.end_of_turn.set_speed(session.speed_coefficient)
+        if self.multiplex:
+            self.allocate_channel(session)
+        else:
+            session.coalescer = FrameCoalescer(sample_rate=self.sample_rate, window_ms=self.coalesce_ms)
+            session.writer = AudioWriter(
+                loop=self.loop,
+                connect=lambda writer, base: self.open_connection(session, writer, base=base),
+                name=f"stt-writer-{peer_id}",
+                samples_per_second=self.sample_rate * self.channels,
+            )
+            session.writer.start()
+        self.sessions[peer_id] = session
+        self._schedule_idle(session)
+        return session
+
+    def allocate_channel(self, session: PeerSession):
+        for multiplexer in self.multiplexers:
+            channel = multiplexer.allocate(session)
+            if channel is not None:
+                break
+        else:
+            multiplexer = ChannelMultiplexer(
+                loop=self.loop,
+                connect=self.open_multiplexed_connection,
+                name=f"stt-mux-{len(self.multiplexers)}",
+                channels=self.multiplex_channels,
+                sample_rate=self.sample_rate,
+                window_ms=max(self.coalesce_ms, 20),
+            )
+            self.multiplexers.append(multiplexer)
+            channel = multiplexer.allocate(session)
+        session.multiplexer = multiplexer
+        session.channel = channel
+        session.writer = multiplexer.writer
+        print(f"{session.peer_name} on channel {channel} of {multiplexer.name}")
+
+    def live_options(self, channels: int, speed_coefficient: float, multichannel: bool = False) -> LiveOptions:
+        return LiveOptions(
+            model=self.model,
+            language=self.language,
+            smart_format=True,
+            encoding="linear16",
+            channels=channels,
+            multichannel=multichannel or None,
+            sample_rate=self.sample_rate,
+            interim_results=True,
+            vad_events=True,
+            filler_words=True,
+            punctuate=True,
+            endpointing=int(self.vad_threshold_ms * (1 / speed_coefficient)),
+            utterance_end_ms=max(
+                int(self.utterance_cutoff_ms * (1 / speed_coefficient)), 1000
+            ),
+            no_delay=True,
+        )
+
+    def open_connection(self, session: PeerSession, writer: AudioWriter, base: float = 0.0) -> ListenWebSocketClient:
+        # base is where this connection's audio starts on the peer's audio clock
+        deepgram_connection = self.start_connection(
+            options=self.live_options(channels=self.channels, speed_coefficient=session.speed_coefficient),
+            name=session.peer_name,
+            writer=writer,
+            session_for=lambda channel: session,
+            base=base,
+        )
+        session.connection = deepgram_connection
+        return deepgram_connection
+
+    def open_multiplexed_connection(
+        self, multiplexer: ChannelMultiplexer, writer: AudioWriter, base: float = 0.0
+    ) -> ListenWebSocketClient:
+        # endpointing is per connection, so it cannot follow each peer's speaking rate here
+        return self.start_connection(
+            options=self.live_options(channels=multiplexer.channels, speed_coefficient=1.0, multichannel=True),
+            name=multiplexer.name,
+            writer=writer,
+            session_for=multiplexer.session_for,
+            base=base,
+        )
+
+    def start_connection(
+        self,
+        options: LiveOptions,
+        name: str,
+        writer: AudioWriter,
+        session_for: Callable[[int], Optional[PeerSession]],
+        base: float,
+    ) -> ListenWebSocketClient:
+        # results are routed to the peer on the channel they came in on
 
         def on_deepgram_stt_text_available(connection, result, **kwargs):
-            self.on_deepgram_stt_text_available(peer_id=peer_id, peer_name=peer_name, result=result)
+            started_at = time.monotonic()
+            # bound to the session, late results after stop() still reach its buffers
+            session = session_for(result.channel_index[0] if result.channel_index else 0)
+            if session is not None:
+                self.on_deepgram_stt_text_available(session=session, result=result, base=base)
+            # no further results are read from this connection until we return
+            blocked = time.monotonic() - started_at
+            self.callbacks += 1
+            self.callback_seconds += blocked
+            self.max_callback_seconds = max(self.max_callback_seconds, blocked)
 
         def on_utterance_end(connection, utterance_end, **kwargs):
-            self.on_utterance_end(peer_id=peer_id, peer_name=peer_name)
+            session = session_for(utterance_end.channel[0] if utterance_end.channel else 0)
+            if session is not None:
+                self.on_utterance_end(peer_id=session.peer_id, peer_name=session.peer_name)
         
         def on_open(connection, open, **kwargs):
-            self.on_open(peer_id=peer_id, peer_name=peer_name)
+            self.on_open(peer_id=None, peer_name=name)
 
         def on_metadata(connection, metadata, **kwargs):
-            self.on_metadata(peer_id=peer_id, peer_name=peer_name, metadata=metadata)
+            self.on_metadata(peer_id=None, peer_name=name, metadata=metadata)
 
         def on_speech_started(connection, speech_started, **kwargs):
-            self.on_speech_started(peer_id=peer_id, peer_name=peer_name)
+            session = session_for(speech_started.channel[0] if speech_started.channel else 0)
+            if session is not None:
+                self.on_speech_started(peer_id=session.peer_id, peer_name=session.peer_name)
             
         def on_close(connection, close, **kwargs):
-            self.on_close(peer_id=peer_id, peer_name=peer_name)
+            self.on_close(peer_id=None, peer_name=name)
+            # only a drop of the live connection is reconnected, not one we closed
+            if writer.connection is deepgram_connection:
+                writer.request_reconnect()
 
         def on_error(connection, error, **kwargs):
-            self.on_error(peer_id=peer_id, peer_name=peer_name, error=error)
+            self.on_error(peer_id=None, peer_name=name, error=error)
 
         def on_unhandled(connection, unhandled, **kwargs):
-            self.on_unhandled(peer_id=peer_id, peer_name=peer_name, unhandled=unhandled)
+            self.on_unhandled(peer_id=None, peer_name=name, unhandled=unhandled)
 
-        deepgram_options = LiveOptions(
-            model=self.model,
-            language=self.language,
-            smart_format=True,
-            encoding="linear16",
-            channels=2,
-            sample_rate=48000,
-            interim_results=True,
-            vad_events=True,
-            filler_words=True,
-            punctuate=True,
-            endpointing=int(self.vad_threshold_ms * (1 / self.speed_coefficient)),
-            utterance_end_ms=max(
-                int(self.utterance_cutoff_ms * (1 / self.speed_coefficient)), 1000
-            ),
-            no_delay=True,
-        )
         deepgram_connection = self.deepgram_client.listen.live.v("1")
 
         deepgram_connection.on(
@@ -123,91 +885,304 @@ class DeepgramSTT(STT):
         deepgram_connection.on(
             LiveTranscriptionEvents.Unhandled, on_unhandled
         )
-        deepgram_connection.start(
-            deepgram_options,
+        started_at = time.monotonic()
+        if not deepgram_connection.start(
+            options,
             addons={"no_delay": "true"},
-        )
+        ):
+            raise ConnectionError("Deepgram live connection did not start")
+        self.handshakes += 1
+        self.handshake_seconds.append(time.monotonic() - started_at)
+        print(f"STT connection for {name} opened in {self.handshake_seconds[-1]:.3f}s")
+        return deepgram_connection
 
-        self.deepgram_connections[peer_id] = deepgram_connection
+    def start(self, peer_id: str, peer_name: str, stream:Stream):
+        # reuses the connection opened at join or before the last mute
+        session = self.prepare(peer_id=peer_id, peer_name=peer_name)
+        if session.task is not None:
+            session.task.cancel()
+        self._cancel_timers(session)
 
-        self.finalize_called[peer_id] = False
-        self.task = self.loop.create_task(
-            self.add_peer_stream(
-                stream=stream, peer_id=peer_id, peer_name=peer_name
-            )
+        session.finalize_called = False
+        session.stream_started_at = time.monotonic()
+        session.task = self.loop.create_task(
+            self.add_peer_stream(stream=stream, session=session)
         )
 
     def stop(self, peer_id):
-        if peer_id in self.deepgram_connections:
-            print("stop peer audio connection", peer_id)
-            self.deepgram_connections[peer_id].finalize()
-            self.deepgram_connections[peer_id].finish()
-            self.finalize_called[peer_id] = True    
-            del self.deepgram_connections[peer_id]
+        # audio stream disabled: finalize what was said but keep the connection warm
+        session = self.sessions.get(peer_id)
+        if session is None or session.finalize_called:
+            return
+        print("stop peer audio stream", peer_id)
+        session.finalize_called = True
+        session.stream_started_at = None
+        if session.task is not None:
+            session.task.cancel()
+            session.task = None
+        self._finalize(session)
+        self._schedule_idle(session)
+
+    def close(self, peer_id):
+        # participant left or idled out, the connection is torn down
+        session = self.sessions.pop(peer_id, None)
+        if session is None:
+            return
+        print("close peer audio connection", peer_id)
+        self._cancel_timers(session)
+        if session.task is not None:
+            session.task.cancel()
+            session.task = None
+        if not session.finalize_called:
+            session.finalize_called = True
+            self._finalize(session)
+        if session.multiplexer is None:
+            session.writer.close()
+        elif session.multiplexer.release(session.channel):
+            # last peer on the shared connection
+            self.multiplexers.remove(session.multiplexer)
+            session.multiplexer.close()
+        if session.vad_gate is not None:
+            print(f"VAD stats {peer_id}: {session.vad_gate.get_stats()}")
+        print(f"Send stats {peer_id}: {self.get_session_send_stats(session)}")
+
+    def _finalize(self, session: PeerSession):
+        # audio still being batched has to reach Deepgram before Finalize
+        if session.multiplexer is not None:
+            # Finalize flushes every channel, the other peers' results stay in their buffers
+            session.multiplexer.end(session.channel)
+            session.multiplexer.flush()
+        else:
+            batch = session.coalescer.flush()
+            if batch:
+                session.writer.put_control(batch)
+        session.writer.put_control(json.dumps({"type": "Finalize"}))
+
+    def _schedule_idle(self, session: PeerSession):
+        self._cancel_timers(session)
+        session.idle_handle = self.loop.call_later(self.idle_timeout_s, self._on_idle_timeout, session)
+        if session.multiplexer is None:
+            # a multiplexed connection is kept alive by its multiplexer
+            session.keepalive_handle = self.loop.call_later(KEEPALIVE_INTERVAL_S, self._keep_alive, session)
+
+    def _cancel_timers(self, session: PeerSession):
+        for handle in (session.idle_handle, session.keepalive_handle):
+            if handle is not None:
+                handle.cancel()
+        session.idle_handle = None
+        session.keepalive_handle = None
+
+    def _keep_alive(self, session: PeerSession):
+        # no stream task is running, so the warm socket needs its own KeepAlives
+        session.writer.put_control(json.dumps({"type": "KeepAlive"}))
+        session.keepalive_handle = self.loop.call_later(KEEPALIVE_INTERVAL_S, self._keep_alive, session)
+
+    def _on_idle_timeout(self, session: PeerSession):
+        if self.sessions.get(session.peer_id) is session:
+            print(f"STT connection for {session.peer_name} idle for {self.idle_timeout_s}s, closing")
+            self.close(session.peer_id)
 
     def get_usage(self):
         current_usage = self.usage
         self.usage = 0
         return current_usage
 
-    async def add_peer_stream(self, stream: Stream, peer_id: str, peer_name: str):
+    def get_connection_stats(self) -> dict:
+        return {
+            "handshakes": self.handshakes,
+            "handshake_seconds": list(self.handshake_seconds),
+            "first_transcript_latencies": list(self.first_transcript_latencies),
+            "warm_connections": len(self.multiplexers) if self.multiplex else len(self.sessions),
+            "callbacks": self.callbacks,
+            "mean_callback_seconds": self.callback_seconds / self.callbacks if self.callbacks else 0.0,
+            "max_callback_seconds": self.max_callback_seconds,
+        }
+
+    def get_turn_stats(self) -> Dict[str, dict]:
+        return {
+            peer_id: session.end_of_turn.get_stats()
+            for peer_id, session in self.sessions.items()
+            if session.end_of_turn is not None
+        }
+
+    def get_session_send_stats(self, session: PeerSession) -> dict:
+        if session.multiplexer is not None:
+            return session.multiplexer.get_stats()
+        return {
+            "sends": session.coalescer.sends,
+            "bytes": session.coalescer.bytes_sent,
+            "writer": session.writer.get_stats(),
+        }
+
+    def get_send_stats(self) -> Dict[str, dict]:
+        return {peer_id: self.get_session_send_stats(session) for peer_id, session in self.sessions.items()}
+
+    def get_vad_stats(self) -> Dict[str, dict]:
+        return {
+            peer_id: session.vad_gate.get_stats()
+            for peer_id, session in self.sessions.items()
+            if session.vad_gate is not None
+        }
+
+    async def add_peer_stream(self, stream: Stream, session: PeerSession):
         try:
             track = stream.track
+            last_sent = time.monotonic()
 
-            while not self.finalize_called[peer_id]:
+            coalescer = session.coalescer
+            gate = session.vad_gate
+            writer = session.writer
+            end_of_turn = session.end_of_turn
+            multiplexer = session.multiplexer
+            was_voiced = False
+
+            while not session.finalize_called:
                 frame = await track.recv()
-                audio_data = frame.to_ndarray()
-                pcm_frame = audio_data.flatten().astype(np.int16).tobytes()
-                self.deepgram_connections[peer_id].send(pcm_frame)
+                pcm_frame = self.convert_frame(session, frame)
+                voiced = True
+                if gate is not None:
+                    was_speech = gate.is_speech
+                    pcm_frame = gate.process(pcm_frame)
+                    voiced = gate.voiced
+                    if end_of_turn is not None:
+                        end_of_turn.on_voice(voiced, time.monotonic())
+                    if self.event_log is not None and voiced != was_voiced:
+                        self.event_log.write(session.peer_id, "voice", voiced=voiced)
+                    was_voiced = voiced
+                if multiplexer is not None:
+                    # the multiplexer paces, batches and keeps alive the shared connection
+                    if pcm_frame:
+                        multiplexer.push(session.channel, pcm_frame)
+                    if gate is not None and was_speech and not gate.is_speech:
+                        multiplexer.end(session.channel)
+                else:
+                    batch = coalescer.add(pcm_frame, voiced=voiced) if pcm_frame else b""
+                    if gate is not None and gate.is_speech != was_speech:
+                        # onset and end of speech are latency sensitive, send right away
+                        batch += coalescer.flush()
+                    if batch:
+                        # hangover-only batches are the first to go if the socket falls behind
+                        await writer.put(batch, silent=not coalescer.last_voiced)
+                        last_sent = time.monotonic()
+                    elif time.monotonic() - last_sent >= KEEPALIVE_INTERVAL_S:
+                        # silence is not streamed, keep the socket open instead
+                        await writer.put(json.dumps({"type": "KeepAlive"}), silent=True)
+                        last_sent = time.monotonic()
+                if self.speculation_ms is not None:
+                    self.maybe_speculate(session)
+                if end_of_turn is not None and end_of_turn.check(time.monotonic()):
+                    # confident the turn is over, have Deepgram return what it holds now
+                    session.awaiting_finalize = True
+                    self._finalize(session)
+                    if self.event_log is not None:
+                        self.event_log.write(session.peer_id, "finalize")
         except Exception as e:
             traceback.print_exc()
             print("Error while sending audio to STT Server", e)
 
-    def on_deepgram_stt_text_available(self, peer_id, peer_name, result):
+    def maybe_speculate(self, session: PeerSession):
+        text = session.interim_text
+        if not text or text == session.speculated_text:
+            return
+        if (time.monotonic() - session.interim_changed_at) * 1000 < self.speculation_ms:
+            return
+        session.speculated_text = text
+        self.intelligence.speculate(text=text, sender_name=session.peer_name)
+
+    def convert_frame(self, session: PeerSession, frame) -> bytes:
+        # downmix + resample to the STT format, keeping filter state per peer
+        audio_data = frame_to_ndarray(frame)
+        resampler = session.resampler
+        if resampler is None or resampler.input_rate != frame.sample_rate or resampler.input_channels != audio_data.shape[1]:
+            resampler = StreamingResampler(
+                input_rate=frame.sample_rate,
+                output_rate=self.sample_rate,
+                input_channels=audio_data.shape[1],
+                output_channels=self.channels,
+            )
+            session.resampler = resampler
+        return resampler.process(audio_data).tobytes()
+
+    def on_deepgram_stt_text_available(self, session: PeerSession, result, base: float = 0.0):
         try:
             top_choice = result.channel.alternatives[0]
+            # reply to a Finalize sent when the local end-of-turn detector fired
+            from_finalize = bool(getattr(result, "from_finalize", False))
+            transcript, words = self.dedup_transcript(session, result, base)
 
-            if len(top_choice.transcript) == 0:
+            if self.event_log is not None:
+                self.event_log.write(
+                    session.peer_id,
+                    "transcript",
+                    text=transcript,
+                    is_final=bool(result.is_final),
+                    speech_final=bool(result.speech_final),
+                    from_finalize=from_finalize,
+                )
+
+            if len(transcript) == 0 and not (from_finalize and session.buffer):
                 return
 
+            if session.end_of_turn is not None:
+                session.end_of_turn.on_transcript(
+                    transcript, result.is_final, from_finalize, time.monotonic()
+                )
+
+            if transcript and session.stream_started_at is not None:
+                # unmute to first words, the handshake is no longer part of it
+                self.first_transcript_latencies.append(time.monotonic() - session.stream_started_at)
+                session.stream_started_at = None
+
             # Check for transcript, confidentce and
             if (
-                top_choice.transcript
+                transcript
                 and top_choice.confidence > 0.0
                 and result.is_final
             ):
                 # Get words
-                words = top_choice.words
                 if words:
                     # Add words to buffer
-                    self.words_buffer.extend(words)
+                    session.words_buffer.extend(words)
 
-                self.buffer = f"{self.buffer} {top_choice.transcript}"
-                print(f"Buffer {self.buffer}")
+                session.buffer = f"{session.buffer} {transcript}"
+                print(f"Buffer [{session.peer_name}] {session.buffer}")
 
-            if (self.buffer and self.is_endpoint(result)) or self.finalize_called[peer_id]:
+            # on a shared connection another peer's Finalize flushes this one too
+            if (session.buffer and (self.is_endpoint(result) or (from_finalize and session.awaiting_finalize))) or session.finalize_called:
 
-                duration_seconds = self.calculate_duration(self.words_buffer)
+                duration_seconds = self.calculate_duration(session.words_buffer)
                 # print("Duration seconds", duration_seconds)
 
                 if duration_seconds is not None:
                     wpm = (
-                        60 * len(self.buffer.split()) / duration_seconds
+                        60 * len(session.buffer.split()) / duration_seconds
                         if duration_seconds
                         else None
                     )
                     print("WPM", wpm)
                     if wpm is not None:
-                        self.update_speed_coefficient(wpm=wpm, message=self.buffer)
+                        self.update_speed_coefficient(session, wpm=wpm, message=session.buffer)
 
-                self.produce_text(self.buffer, peer_name=peer_name, is_final=True)
+                text = session.buffer
+                session.buffer = ""
+                session.words_buffer = []
+                session.interim_text = ""
+                session.speculated_text = ""
+                session.awaiting_finalize = False
+                if session.end_of_turn is not None:
+                    session.end_of_turn.end_turn()
+                self.produce_text(text, peer_name=session.peer_name, is_final=True)
                 
 
-            if top_choice.transcript and top_choice.confidence > 0.0:
+            if transcript and top_choice.confidence > 0.0:
                 if not result.is_final:
-                    interim_message = f"{self.buffer} {top_choice.transcript}"
+                    interim_message = f"{session.buffer} {transcript}"
                 else:
-                    interim_message = self.buffer
+                    interim_message = session.buffer
+                interim_message = interim_message.strip()
+                if interim_message != session.interim_text:
+                    session.interim_text = interim_message
+                    session.interim_changed_at = time.monotonic()
 
                 # if interim_message:
                 #     self.produce_text(interim_message, peer_name=peer_name,is_final=False)
@@ -215,6 +1190,29 @@ class DeepgramSTT(STT):
         except Exception as e:
             print("Error while transcript processing", e)
 
+    def dedup_transcript(self, session: PeerSession, result, base: float) -> Tuple[str, List[dict]]:
+        """Text and words of a result that were not transcribed before.
+
+        Audio replayed into a new connection after a drop is transcribed a
+        second time; words whose midpoint falls before the end of the last
+        final result are dropped. Word times are moved onto the peer's audio
+        clock so durations stay right across connections.
+        """
+        top_choice = result.channel.alternatives[0]
+        words = [
+            {"word": word.punctuated_word or word.word, "start": base + word.start, "end": base + word.end}
+            for word in top_choice.words or []
+        ]
+        transcript = top_choice.transcript
+        if base + result.start < session.transcribed_until:
+            kept = [word for word in words if (word["start"] + word["end"]) / 2 > session.transcribed_until]
+            if len(kept) < len(words):
+                transcript = " ".join(word["word"] for word in kept)
+                words = kept
+        if result.is_final:
+            session.transcribed_until = max(session.transcribed_until, base + result.start + result.duration)
+        return transcript, words
+
     def on_open(self, peer_id, peer_name):
         print(f"Connection Open")
 
@@ -223,7 +1221,8 @@ class DeepgramSTT(STT):
 
     def on_speech_started(self, peer_id, peer_name):
         # print(f"[{peer_name}] Speech Started")
-        pass
+        if self.barge_in is not None:
+            self.barge_in(peer_id=peer_id, peer_name=peer_name)
 
     def on_utterance_end(self, peer_id, peer_name):
         print(f"Utterance End")
@@ -257,12 +1256,8 @@ class DeepgramSTT(STT):
             if is_final and text:
                 # peer final message after speech
                 print(f"[{peer_name}]:", text)
-                if self.pubsub is not None:
-                    # publish in meeting
-                    self.pubsub(message=f"[{peer_name}]: {text}")
-                self.intelligence.generate(text=text, sender_name=peer_name)
-                self.buffer = ""
-                self.words_buffer = []
+                # this runs on the SDK's thread, the turn is answered on the loop
+                self.loop.call_soon_threadsafe(self.start_turn, text, peer_name)
 
             if text:
                 # print(f"[{peer_name}]:", text)
@@ -270,7 +1265,20 @@ class DeepgramSTT(STT):
         except Exception as e:
             print("Error while producing text", e)
 
-    def update_speed_coefficient(self, wpm: int, message: str):
+    def start_turn(self, text: str, peer_name: str):
+        if self.pubsub is not None:
+            # publish in meeting
+            self.pubsub(message=f"[{peer_name}]: {text}")
+        self.cancel_turn()
+        self.turn = self.loop.create_task(self.intelligence.agenerate(text=text, sender_name=peer_name))
+
+    def cancel_turn(self):
+        # the candidate said more, an answer to what came before is stale
+        if self.turn is not None and not self.turn.done():
+            self.turn.cancel()
+        self.turn = None
+
+    def update_speed_coefficient(self, session: PeerSession, wpm: int, message: str):
         if wpm is not None:
             length = len(message.strip().split())
             p_t = min(
@@ -278,6 +1286,11 @@ class DeepgramSTT(STT):
                 LEARNING_RATE
                 * ((length + SMOOTHING_FACTOR) / (LENGTH_THRESHOLD + SMOOTHING_FACTOR)),
             )
-            self.wpm = self.wpm * (1 - p_t) + wpm * p_t
-            self.speed_coefficient = self.wpm / BASE_WPM
-            logger.info(f"Set speed coefficient to {self.speed_coefficient}")
\ No newline at end of file
+            session.wpm = session.wpm * (1 - p_t) + wpm * p_t
+            session.speed_coefficient = session.wpm / BASE_WPM
+            # the learned rate drives how long a pause has to be to end this peer's turn
+            if session.end_of_turn is not None:
+                session.end_of_turn.set_speed(session.speed_coefficient)
+            if self.event_log is not None:
+                self.event_log.write(session.peer_id, "speed", speed_coefficient=session.speed_coefficient)
+            logger.info(f"Set speed coefficient of {session.peer_name} to {session.speed_coefficient}")
\ No newline at end of file
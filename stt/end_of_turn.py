@@ -0,0 +1,181 @@
+import json
+import threading
+import time
+from typing import List, Optional
+
+# silence after the last voiced frame before a turn is called, at the base speaking rate
+EOT_BASE_SILENCE_MS = 700
+EOT_MIN_SILENCE_MS = 250
+EOT_MAX_SILENCE_MS = 2500
+# interim text unchanged for this long is considered stable
+EOT_STABLE_MS = 250
+# new words this soon after a call mean the candidate was cut off
+EOT_CUTOFF_WINDOW_MS = 2000
+# threshold multipliers for how the text so far ends
+EOT_COMPLETE_FACTOR = 0.6
+EOT_CONTINUATION_FACTOR = 1.8
+# a false cutoff makes the peer's threshold this much longer, clean turns walk it back
+EOT_PENALTY_STEP = 1.25
+EOT_PENALTY_MAX = 2.5
+EOT_PENALTY_DECAY = 0.95
+
+# words a sentence rarely ends on, the candidate is most likely still thinking
+CONTINUATION_WORDS = frozenset(
+    {
+        "a", "an", "and", "are", "as", "at", "because", "but", "for", "from",
+        "i", "if", "in", "is", "like", "mean", "my", "of", "or", "so", "that",
+        "the", "then", "to", "uh", "um", "was", "we", "were", "which", "with",
+    }
+)
+
+
+class EndOfTurnDetector:
+    """Local end-of-turn decision for one peer.
+
+    Combines how long the peer has been silent, whether the interim
+    transcript has stopped changing, how the text ends and the learned
+    speaking rate. Fast talkers get a shorter silence threshold and slow
+    ones a longer one; a turn that turns out to have been cut off makes
+    the threshold longer for that peer. Timestamps are passed in, so logged
+    events can be replayed offline through the same code.
+    """
+
+    def __init__(
+        self,
+        base_silence_ms: float = EOT_BASE_SILENCE_MS,
+        min_silence_ms: float = EOT_MIN_SILENCE_MS,
+        max_silence_ms: float = EOT_MAX_SILENCE_MS,
+        stable_ms: float = EOT_STABLE_MS,
+        cutoff_window_ms: float = EOT_CUTOFF_WINDOW_MS,
+        use_text: bool = True,
+    ):
+        self.base_silence_ms = base_silence_ms
+        self.min_silence_ms = min_silence_ms
+        self.max_silence_ms = max_silence_ms
+        self.stable_ms = stable_ms
+        self.cutoff_window_ms = cutoff_window_ms
+        self.use_text = use_text
+
+        self.speed_coefficient = 1.0
+        self.penalty = 1.0
+        self._lock = threading.Lock()
+
+        # without voice activity the transcript times stand in for it
+        self._voice_fed = False
+        self._last_voiced: Optional[float] = None
+        self._text = ""
+        self._text_changed_at: Optional[float] = None
+        self._pending = False
+        self._called_at: Optional[float] = None
+        self._called_text = ""
+
+        self.turns = 0
+        self.false_cutoffs = 0
+        self.latencies: List[float] = []
+
+    def set_speed(self, speed_coefficient: float):
+        with self._lock:
+            self.speed_coefficient = max(speed_coefficient, 0.1)
+
+    def on_voice(self, voiced: bool, now: float):
+        if voiced:
+            with self._lock:
+                self._voice_fed = True
+                self._last_voiced = now
+
+    def on_transcript(self, text: str, is_final: bool, from_finalize: bool, now: float):
+        text = text.strip()
+        if not text:
+            return
+        with self._lock:
+            if from_finalize:
+                # Deepgram returning what it held when the turn was called
+                return
+            if self._called_at is not None:
+                if self._called_text.startswith(text):
+                    # an interim that was already in flight when the turn was called
+                    return
+                if (now - self._called_at) * 1000 < self.cutoff_window_ms:
+                    self.false_cutoffs += 1
+                    self.penalty = min(self.penalty * EOT_PENALTY_STEP, EOT_PENALTY_MAX)
+                self._called_at = None
+            if not self._voice_fed:
+                self._last_voiced = now
+            if text != self._text:
+                self._text = text
+                self._text_changed_at = now
+            self._pending = True
+
+    def silence_threshold_ms(self) -> float:
+        with self._lock:
+            return self._threshold_ms()
+
+    def _threshold_ms(self) -> float:
+        threshold = self.base_silence_ms / self.speed_coefficient * self.penalty
+        if self.use_text and self._text:
+            if self._text[-1] in ".?!":
+                threshold *= EOT_COMPLETE_FACTOR
+            elif self._text[-1] in ",-" or self._text.split()[-1].lower() in CONTINUATION_WORDS:
+                threshold *= EOT_CONTINUATION_FACTOR
+        return min(max(threshold, self.min_silence_ms), self.max_silence_ms)
+
+    def check(self, now: float) -> bool:
+        """True once per turn, when the turn should be finalized."""
+        with self._lock:
+            if not self._pending or self._last_voiced is None:
+                return False
+            silence_ms = (now - self._last_voiced) * 1000
+            if silence_ms < self._threshold_ms():
+                return False
+            if self.use_text and (now - self._text_changed_at) * 1000 < self.stable_ms:
+                return False
+
+            self.turns += 1
+            self.latencies.append(now - self._last_voiced)
+            self.penalty = max(1.0, self.penalty * EOT_PENALTY_DECAY)
+            self._called_at = now
+            self._called_text = self._text
+            self._reset()
+            return True
+
+    def end_turn(self):
+        # Deepgram endpointed on its own, nothing left to call
+        with self._lock:
+            self._reset()
+
+    def _reset(self):
+        self._pending = False
+        self._text = ""
+        self._text_changed_at = None
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {
+                "turns": self.turns,
+                "false_cutoffs": self.false_cutoffs,
+                "mean_latency": sum(self.latencies) / len(self.latencies) if self.latencies else None,
+                "speed_coefficient": self.speed_coefficient,
+                "penalty": self.penalty,
+            }
+
+
+class TurnEventLog:
+    """Appends the events end-of-turn decisions are made from as JSON lines.
+
+    The log can be replayed offline with benchmarks.eval_end_of_turn.
+    """
+
+    def __init__(self, path: str):
+        self._file = open(path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def write(self, peer_id: str, type: str, **fields):
+        record = {"t": time.monotonic(), "peer": peer_id, "type": type, **fields}
+        line = json.dumps(record)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            self._file.close()
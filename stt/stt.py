@@ -7,6 +7,10 @@ class STT(ABC):
         """Initialize the STT interface."""
         pass
 
+    def prepare(self, peer_id, peer_name):
+        """Open resources for a peer ahead of its audio stream, optional."""
+        pass
+
     @abstractmethod
     def start(self, peer_id, peer_name, stream: Stream):
         """Start the speech-to-text listening process."""
@@ -17,3 +21,6 @@ class STT(ABC):
         """Stop the speech-to-text listening process."""
         pass
 
+    def close(self, peer_id):
+        """Release everything held for a peer, defaults to stop()."""
+        self.stop(peer_id=peer_id)
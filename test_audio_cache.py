@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Tests for the TTS audio cache's disk tier
+
+get() and put() run on the event loop, so they only touch memory, short
+of mapping a file known to be on disk; file writes, disk eviction and
+scans of the directory are left to the cache's executor.
+"""
+from concurrent.futures import Executor, Future
+import os
+
+from tts import audio_cache
+from tts.audio_cache import AudioCache
+
+
+class DeferredExecutor(Executor):
+    # holds submitted calls until run() is called
+    def __init__(self):
+        self.calls = []
+
+    def submit(self, fn, *args, **kwargs):
+        self.calls.append((fn, args, kwargs))
+        return Future()
+
+    def run(self):
+        calls, self.calls = self.calls, []
+        for fn, args, kwargs in calls:
+            fn(*args, **kwargs)
+
+
+def test_put_leaves_disk_writes_to_the_executor(tmp_path):
+    executor = DeferredExecutor()
+    cache = AudioCache(cache_dir=str(tmp_path), executor=executor, admit_uses=2)
+    key = cache.key("Tell me about yourself.", model="aura", sample_rate=48000)
+    audio = b"\x01\x00" * 480
+
+    executor.run()
+    cache.put(key, audio)
+    assert cache.get(key) == audio
+    # admitted on its second use, but nothing is on disk until the executor runs
+    assert len(executor.calls) == 1
+    assert os.listdir(tmp_path) == []
+    assert cache.get_stats()["disk_writes"] == 0
+
+    executor.run()
+    assert os.listdir(tmp_path) == [f"{key}.pcm"]
+    assert cache.get_stats()["disk_writes"] == 1
+
+
+def test_disk_eviction_runs_on_the_executor(tmp_path):
+    executor = DeferredExecutor()
+    cache = AudioCache(cache_dir=str(tmp_path), executor=executor, admit_uses=1, disk_bytes=1500)
+    keys = [cache.key(f"Question {index}.", model="aura", sample_rate=48000) for index in range(3)]
+    for key in keys:
+        cache.put(key, b"\x00" * 1000)
+    assert os.listdir(tmp_path) == []
+
+    executor.run()
+    # each write evicts down to the budget, one file fits
+    assert len(os.listdir(tmp_path)) == 1
+    assert cache.get_stats()["disk_writes"] == 3
+
+
+def test_miss_does_not_touch_the_filesystem(tmp_path, monkeypatch):
+    executor = DeferredExecutor()
+    cache = AudioCache(cache_dir=str(tmp_path), executor=executor)
+    executor.run()
+
+    def no_disk(*args, **kwargs):
+        raise AssertionError("filesystem touched on the event loop")
+
+    monkeypatch.setattr(audio_cache, "open", no_disk, raising=False)
+    monkeypatch.setattr(audio_cache.os, "utime", no_disk)
+    assert cache.get(cache.key("Never said.", model="aura", sample_rate=48000)) is None
+    assert cache.get_stats()["misses"] == 1
+
+
+def test_file_from_another_agent_is_found_after_a_rescan(tmp_path, monkeypatch):
+    executor = DeferredExecutor()
+    cache = AudioCache(cache_dir=str(tmp_path), executor=executor)
+    executor.run()
+    key = cache.key("Walk me through your last project.", model="aura", sample_rate=48000)
+    audio = b"\x02\x00" * 480
+    # written by another process after this one scanned the directory
+    with open(os.path.join(tmp_path, f"{key}.pcm"), "wb") as f:
+        f.write(audio)
+
+    assert cache.get(key) is None
+    assert executor.calls == []
+
+    monkeypatch.setattr(audio_cache, "DISK_INDEX_REFRESH_S", 0)
+    assert cache.get(key) is None
+    executor.run()
+    # memory-mapped, not copied
+    assert cache.get(key)[:] == audio
+    assert cache.get_stats()["disk_hits"] == 1
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Tests for frame reuse in the outbound audio track
+
+recv() recycles AudioFrame objects; a frame the consumer still holds must
+keep its samples and timestamp however many frames come after it.
+"""
+import asyncio
+
+import numpy as np
+
+from agent.audio_stream_track import FRAME_POOL_SIZE, AudioFramePool, CustomAudioStreamTrack
+
+HELD = FRAME_POOL_SIZE * 3
+
+
+def samples_of(frame):
+    return np.frombuffer(frame.planes[0], dtype=np.int16)[: frame.samples].copy()
+
+
+def test_held_frames_are_not_reused():
+    loop = asyncio.new_event_loop()
+    try:
+        track = CustomAudioStreamTrack(loop=loop)
+        for index in range(HELD):
+            track.audio_buffer.write(np.full(track.samples, index + 1, dtype=np.int16))
+
+        async def play(count):
+            return [await track.recv() for _ in range(count)]
+
+        # every speech frame and the silence after them, all held at once
+        frames = loop.run_until_complete(play(HELD * 2))
+        expected = [(frame.pts, samples_of(frame)) for frame in frames]
+        assert len({id(frame) for frame in frames}) == len(frames)
+
+        # the pool hands out frames again once they are released
+        frames.extend(loop.run_until_complete(play(FRAME_POOL_SIZE)))
+        for index, (pts, samples) in enumerate(expected):
+            assert frames[index].pts == pts
+            assert (samples_of(frames[index]) == samples).all()
+            assert (samples == (index + 1 if index < HELD else 0)).all()
+    finally:
+        loop.close()
+
+
+def test_released_frames_are_reused():
+    pool = AudioFramePool(samples=960, sample_rate=48000)
+    first = [id(pool.frame()) for _ in range(FRAME_POOL_SIZE * 2)]
+    assert len(set(first)) == FRAME_POOL_SIZE
+    assert pool.allocations == 0
+
+    held = [pool.frame() for _ in range(FRAME_POOL_SIZE + 1)]
+    assert len({id(frame) for frame in held}) == len(held)
+    assert pool.allocations == 1
+    del held
+    assert pool.allocations_avoided > 0
+
+
+def test_pool_growth_is_bounded():
+    pool = AudioFramePool(samples=960, sample_rate=48000, max_size=6)
+    held = [pool.silence() for _ in range(10)]
+    assert len({id(frame) for frame in held}) == 10
+    assert len(pool._silence) == 6
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Tests for the sample ring's capacity
+
+A write that does not fit grows the ring up to its hard bound; only past
+it are the oldest queued samples dropped, and the ring reports both.
+"""
+import numpy as np
+
+from agent.audio_ring_buffer import AudioRingBuffer
+from agent.audio_stream_track import AUDIO_BUFFER_SECONDS, TRACK_SAMPLE_RATE, build_playout_ring
+
+
+def test_overflow_drops_oldest():
+    ring = AudioRingBuffer(capacity=8, max_read=8)
+    ring.write(np.arange(6))
+    assert ring.write(np.arange(6, 10)) == 4
+
+    out = np.zeros(8, dtype=np.int16)
+    assert ring.read_into(out) == 8
+    assert out.tolist() == list(range(2, 10))
+    assert ring.capacity == 8
+    stats = ring.get_stats()
+    assert stats["overruns"] == 1
+    assert stats["dropped_samples"] == 2
+
+
+def test_write_larger_than_capacity_keeps_latest():
+    ring = AudioRingBuffer(capacity=8, max_read=8)
+    ring.write(np.arange(3))
+    assert ring.write(np.arange(100, 120)) == 20
+
+    out = np.zeros(8, dtype=np.int16)
+    assert ring.read_into(out) == 8
+    assert out.tolist() == list(range(112, 120))
+    assert ring.get_stats()["dropped_samples"] == 15
+
+
+def test_views_stay_contiguous_after_overflow():
+    ring = AudioRingBuffer(capacity=8, max_read=4)
+    for start in range(0, 40, 3):
+        ring.write(np.arange(start, start + 3))
+    # the last 8 of 0..41
+    assert ring.view(4).tolist() == list(range(34, 38))
+    ring.consume(4)
+    assert ring.view(4).tolist() == list(range(38, 42))
+
+
+def test_grows_instead_of_dropping_up_to_max_capacity():
+    ring = AudioRingBuffer(capacity=8, max_read=4, max_capacity=64)
+    ring.write(np.arange(6))
+    ring.consume(4)
+    # wrapped around the end of the storage when it has to grow
+    ring.write(np.arange(6, 40))
+
+    assert ring.capacity == 64
+    assert ring.get_stats()["grows"] == 1
+    assert ring.get_stats()["dropped_samples"] == 0
+    read = []
+    while ring.available:
+        read.extend(ring.view(min(4, ring.available)).tolist())
+        ring.consume(4)
+    assert read == list(range(4, 40))
+
+
+def test_drops_only_past_max_capacity():
+    ring = AudioRingBuffer(capacity=8, max_read=8, max_capacity=16)
+    ring.write(np.arange(20))
+    assert ring.capacity == 16
+    assert ring.get_stats()["dropped_samples"] == 4
+    out = np.zeros(8, dtype=np.int16)
+    ring.read_into(out)
+    assert out.tolist() == list(range(4, 12))
+
+
+def test_playout_ring_keeps_an_answer_longer_than_it_was_allocated_for():
+    ring = build_playout_ring(TRACK_SAMPLE_RATE)
+    message = np.ones(TRACK_SAMPLE_RATE, dtype=np.int16)
+    seconds = AUDIO_BUFFER_SECONDS + 30
+    for _ in range(seconds):
+        ring.write(message)
+    assert ring.available == seconds * TRACK_SAMPLE_RATE
+    assert ring.get_stats()["dropped_samples"] == 0
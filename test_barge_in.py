@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Tests for barge-in on the outbound audio track
+
+A candidate talking while the interviewer is silent interrupts nothing;
+talking over speech cuts it and reports where, and only what the
+candidate did not hear is taken back.
+"""
+import asyncio
+
+import numpy as np
+
+from agent.audio_stream_track import CustomAudioStreamTrack
+from tts.deepgram_tts import DeepgramTTS, SpeechChunk
+
+
+def make_track():
+    loop = asyncio.new_event_loop()
+    track = CustomAudioStreamTrack(loop=loop)
+    positions = []
+    track.add_interrupt_listener(positions.append)
+    return loop, track, positions
+
+
+def settle(loop):
+    # run what interrupt() and add_new_bytes() scheduled onto the loop
+    loop.run_until_complete(asyncio.sleep(0))
+
+
+def samples_of(frame):
+    return np.frombuffer(frame.planes[0], dtype=np.int16)[: frame.samples].copy()
+
+
+def play(loop, track, count):
+    async def frames():
+        return [await track.recv() for _ in range(count)]
+
+    return loop.run_until_complete(frames())
+
+
+def test_interrupt_while_silent_is_ignored():
+    loop, track, positions = make_track()
+    try:
+        play(loop, track, 2)
+        track.interrupt()
+        settle(loop)
+        assert positions == []
+        assert track.interrupt_latencies == []
+        assert not track._discarding
+
+        # the next answer is not dropped
+        track.add_new_bytes(iter([np.ones(track.samples, dtype=np.int16).tobytes()]))
+        settle(loop)
+        assert track.audio_buffer.available == track.samples
+    finally:
+        loop.close()
+
+
+def test_interrupt_while_speaking_cuts_the_utterance():
+    loop, track, positions = make_track()
+    try:
+        track.add_new_bytes(iter([np.ones(track.samples * 10, dtype=np.int16).tobytes()]))
+        settle(loop)
+        play(loop, track, 3)
+        assert track.speaking.is_set()
+
+        track.interrupt()
+        settle(loop)
+        assert positions == [track.samples * 3 + track.fade_out_samples]
+        assert track._discarding
+        assert track.audio_buffer.available == 0
+        track.add_new_bytes(iter([np.ones(track.samples, dtype=np.int16).tobytes()]))
+        settle(loop)
+        assert track.audio_buffer.available == 0
+
+        play(loop, track, 1)
+        assert len(track.interrupt_latencies) == 1
+    finally:
+        loop.close()
+
+
+def test_drained_partial_frame_is_played():
+    loop, track, positions = make_track()
+    try:
+        extra = track.samples // 4
+        track.add_new_bytes(iter([np.ones(track.samples * 2 + extra, dtype=np.int16).tobytes()]))
+        settle(loop)
+        frames = [samples_of(frame) for frame in play(loop, track, 4)]
+        # held back for a frame in case the rest was on its way, then padded
+        assert (frames[2] == 0).all()
+        assert (frames[3][:extra] == 1).all() and (frames[3][extra:] == 0).all()
+        assert track.audio_buffer.available == 0
+        assert track.samples_played == track.samples_written
+
+        # once drained a barge-in has nothing to cut
+        play(loop, track, 1)
+        track.interrupt()
+        settle(loop)
+        assert positions == []
+    finally:
+        loop.close()
+
+
+def test_chunk_ending_within_a_frame_counts_as_spoken():
+    loop, track, positions = make_track()
+    tts = DeepgramTTS(api_key="test", output_track=track, loop=loop)
+    truncated = []
+    tts.set_interrupt_handler(lambda text, spoken: truncated.append((text, spoken)))
+    try:
+        track.add_new_bytes(iter([np.ones(track.samples * 10, dtype=np.int16).tobytes()]))
+        settle(loop)
+        play(loop, track, 2)
+        cut_at = track.samples * 2 + track.fade_out_samples
+
+        first = SpeechChunk("All of this was heard.", utterance_id=1)
+        first.end = cut_at + track.samples // 2
+        second = SpeechChunk("None of this was.", utterance_id=1)
+        tts._chunks = [first, second]
+        track.interrupt()
+        settle(loop)
+        assert positions == [cut_at]
+        assert truncated == [("None of this was.", "")]
+    finally:
+        tts.close()
+        settle(loop)
+        loop.close()
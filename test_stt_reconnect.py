@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Tests for STT connection drops and reconnects
+
+A fake Deepgram client stands in for the SDK: its connections record what
+is sent to them and can be closed from the server side, the way the SDK
+reports a dropped socket through the Close event.
+"""
+import asyncio
+import time
+from types import SimpleNamespace
+
+from deepgram import LiveTranscriptionEvents
+import numpy as np
+
+from stt.deepgram_stt import REPLAY_SECONDS, STT_SAMPLE_RATE, DeepgramSTT
+
+
+class FakeConnection:
+    def __init__(self):
+        self.handlers = {}
+        self.sent = []
+        self.finished = False
+
+    def on(self, event, handler):
+        self.handlers[event] = handler
+
+    def start(self, options, addons=None):
+        return True
+
+    def send(self, data):
+        self.sent.append(data)
+        return True
+
+    def finish(self):
+        self.finished = True
+
+    def drop(self):
+        # the server closed the socket, the SDK calls back on its own thread
+        self.handlers[LiveTranscriptionEvents.Close](self, None)
+
+
+class FakeDeepgram:
+    def __init__(self):
+        self.connections = []
+        self.listen = SimpleNamespace(live=SimpleNamespace(v=self._connection))
+
+    def _connection(self, version):
+        connection = FakeConnection()
+        self.connections.append(connection)
+        return connection
+
+
+def wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+def make_stt(**kwargs):
+    loop = asyncio.new_event_loop()
+    stt = DeepgramSTT(
+        loop=loop, api_key="test", language="en-US", intelligence=None,
+        vad_enabled=False, end_of_turn=False, speculation_ms=None, **kwargs,
+    )
+    deepgram = FakeDeepgram()
+    stt.deepgram_client = deepgram
+    return loop, stt, deepgram
+
+
+def close(loop, writer):
+    writer.close()
+    writer._thread.join(timeout=2)
+    loop.close()
+
+
+def test_server_close_reconnects():
+    loop, stt, deepgram = make_stt()
+    session = stt.prepare("peer", "Peer")
+    try:
+        wait_for(lambda: session.writer.connection is not None)
+        first = deepgram.connections[0]
+        first.drop()
+
+        wait_for(lambda: session.writer.connection is not None and session.writer.connection is not first)
+        assert len(deepgram.connections) == 2
+        assert first.finished
+        assert session.writer.get_stats()["reconnects"] == 1
+    finally:
+        close(loop, session.writer)
+
+
+def test_drop_mid_stream_replays_recent_audio():
+    loop, stt, deepgram = make_stt()
+    bases = []
+    open_connection = stt.open_connection
+
+    def recording_open_connection(session, writer, base=0.0):
+        bases.append(base)
+        return open_connection(session, writer, base=base)
+
+    stt.open_connection = recording_open_connection
+    session = stt.prepare("peer", "Peer")
+    # half a second of audio per chunk, each chunk its own sample value
+    chunk_samples = STT_SAMPLE_RATE // 2
+    chunks = [np.full(chunk_samples, index, dtype=np.int16).tobytes() for index in range(REPLAY_SECONDS * 2 + 2)]
+    try:
+        wait_for(lambda: session.writer.connection is not None)
+        first = deepgram.connections[0]
+        for chunk in chunks:
+            loop.run_until_complete(session.writer.put(chunk))
+        wait_for(lambda: len(first.sent) == len(chunks))
+
+        first.drop()
+        wait_for(lambda: len(deepgram.connections) == 2 and deepgram.connections[1].sent)
+        second = deepgram.connections[1]
+        # the last REPLAY_SECONDS go again, on a clock that starts where they did
+        assert second.sent[0] == b"".join(chunks[2:])
+        assert bases == [0.0, 1.0]
+
+        later = np.full(chunk_samples, 99, dtype=np.int16).tobytes()
+        loop.run_until_complete(session.writer.put(later))
+        wait_for(lambda: len(second.sent) == 2)
+        assert second.sent[1] == later
+        assert len(first.sent) == len(chunks)
+
+        stats = session.writer.get_stats()
+        assert stats["reconnects"] == 1
+        assert stats["replayed_seconds"] == REPLAY_SECONDS
+    finally:
+        close(loop, session.writer)
+
+
+def test_multiplexed_connection_opens_first_time_and_reconnects():
+    loop, stt, deepgram = make_stt(multiplex=True)
+    sessions = [stt.prepare(f"peer-{index}", f"Peer {index}") for index in range(2)]
+    writer = sessions[0].writer
+    try:
+        assert sessions[1].writer is writer
+        wait_for(lambda: writer.connection is not None)
+        assert len(deepgram.connections) == 1
+        assert writer.get_stats()["connect_failures"] == 0
+
+        first = deepgram.connections[0]
+        first.drop()
+        wait_for(lambda: writer.connection is not None and writer.connection is not first)
+        assert writer.get_stats()["reconnects"] == 1
+        assert writer.get_stats()["connect_failures"] == 0
+    finally:
+        for multiplexer in stt.multiplexers:
+            multiplexer.close()
+            loop.run_until_complete(asyncio.gather(multiplexer._task, return_exceptions=True))
+        close(loop, writer)
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Golden-output tests for the streaming TTS normalizer
+
+Every case in benchmarks/tts_normalizer_corpus.json holds an interviewer
+response and the text the original regex cleaner made of it. The
+normalizer has to reproduce it exactly, whole and when fed in pieces.
+"""
+import json
+import os
+import random
+
+from intelligence.tts_normalizer import TTSNormalizer, normalize_for_tts
+
+CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks", "tts_normalizer_corpus.json")
+
+
+def load_corpus():
+    with open(CORPUS) as f:
+        return json.load(f)
+
+
+def feed_in_pieces(text, sizes):
+    normalizer = TTSNormalizer()
+    out = ""
+    index = 0
+    while index < len(text):
+        size = next(sizes)
+        out += normalizer.feed(text[index : index + size])
+        index += size
+    return out + normalizer.flush()
+
+
+def test_complete_text_matches_golden():
+    for case in load_corpus():
+        assert normalize_for_tts(case["input"]) == case["expected"], case["input"]
+
+
+def test_single_characters_match_golden():
+    for case in load_corpus():
+        sizes = iter(lambda: 1, None)
+        assert feed_in_pieces(case["input"], sizes) == case["expected"], case["input"]
+
+
+def test_token_sized_pieces_match_golden():
+    rng = random.Random(7)
+    for case in load_corpus():
+        for _ in range(20):
+            sizes = iter(lambda: rng.randint(1, 8), None)
+            assert feed_in_pieces(case["input"], sizes) == case["expected"], case["input"]
+
+
+def test_markup_split_across_pieces():
+    normalizer = TTSNormalizer()
+    pieces = ["Good. *", "*Step", " 1:*", "* Think [ins", "ert hint] about it (note: ", "slow down). Ready", "?"]
+    out = "".join(normalizer.feed(piece) for piece in pieces) + normalizer.flush()
+    assert out == "Good. Step 1: Think about it . Ready?"
+
+
+def test_normalizer_is_reusable_after_flush():
+    normalizer = TTSNormalizer()
+    normalizer.feed("Um, first answer")
+    assert normalizer.flush() == "first answer."
+    assert normalizer.feed("Second answer!") + normalizer.flush() == "Second answer!"
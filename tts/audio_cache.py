@@ -0,0 +1,229 @@
+from concurrent.futures import Executor, ThreadPoolExecutor
+import hashlib
+import mmap
+import os
+import tempfile
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set, Union
+
+# chunks longer than this are one-off answers, not recurring phrases
+CACHE_MAX_CHARS = 300
+MEMORY_CACHE_BYTES = 16 * 1024 * 1024
+DISK_CACHE_BYTES = 256 * 1024 * 1024
+# a phrase is written to disk, and shared with other agents, once it is used this often
+DISK_ADMIT_USES = 2
+# how stale the index of files on disk may get before a miss rescans it for
+# phrases other agents wrote
+DISK_INDEX_REFRESH_S = 30
+DEFAULT_CACHE_DIR = os.path.join(tempfile.gettempdir(), "videosdk-agent-tts-cache")
+
+Audio = Union[bytes, mmap.mmap]
+
+
+def normalize_text(text: str) -> str:
+    # whitespace never changes the synthesized audio, case and punctuation can
+    return " ".join(text.split())
+
+
+class AudioCache:
+    """Content-addressed cache of synthesized PCM, in memory and on disk.
+
+    Entries are keyed by a hash of model, encoding, rate and normalized
+    text. The memory tier is an LRU bounded in bytes. The disk tier is a
+    directory of raw PCM files shared by every agent process on the host;
+    files are written atomically and read back memory-mapped, so all
+    processes share the same page cache.
+
+    get() and put() run on the event loop. Which keys are on disk is kept
+    in memory, so a miss never touches the filesystem; only a disk hit
+    maps its file. Writing files, evicting old ones, refreshing recency
+    and rescanning the directory happen on the executor.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = DEFAULT_CACHE_DIR,
+        memory_bytes: int = MEMORY_CACHE_BYTES,
+        disk_bytes: int = DISK_CACHE_BYTES,
+        max_chars: int = CACHE_MAX_CHARS,
+        admit_uses: int = DISK_ADMIT_USES,
+        executor: Optional[Executor] = None,
+    ):
+        self.cache_dir = cache_dir
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        self.max_chars = max_chars
+        self.admit_uses = admit_uses
+        if cache_dir is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+        # one writer, so admissions and evictions never race each other
+        self.executor = executor or ThreadPoolExecutor(max_workers=1, thread_name_prefix="tts-cache")
+
+        self._memory: "OrderedDict[str, Audio]" = OrderedDict()
+        self._memory_size = 0
+        self._uses: Dict[str, int] = {}
+        # keys with a file on disk, replaced by every scan of the directory
+        self._on_disk: Set[str] = set()
+        self._indexed_at = time.monotonic()
+        if cache_dir is not None:
+            self.executor.submit(self._scan)
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        self.disk_writes = 0
+
+    def key(self, text: str, model: str, sample_rate: int, encoding: str = "linear16") -> Optional[str]:
+        """Cache key of a chunk, None when it is not worth caching."""
+        text = normalize_text(text)
+        if not text or len(text) > self.max_chars:
+            return None
+        return hashlib.sha256(f"{model}\0{encoding}\0{sample_rate}\0{text}".encode()).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.pcm")
+
+    def get(self, key: str) -> Optional[Audio]:
+        audio = self._memory.get(key)
+        if audio is not None:
+            self._memory.move_to_end(key)
+        elif key in self._on_disk:
+            audio = self._read(key)
+            if audio is not None:
+                self.disk_hits += 1
+                self._remember(key, audio)
+            else:
+                # evicted by another agent since the last scan
+                self._on_disk.discard(key)
+
+        if audio is None:
+            self.misses += 1
+            self._maybe_rescan()
+            return None
+        self.hits += 1
+        self.bytes_saved += len(audio)
+        self._use(key, audio)
+        return audio
+
+    def put(self, key: str, audio: bytes):
+        if not audio:
+            return
+        self._remember(key, audio)
+        self._use(key, audio)
+
+    def _use(self, key: str, audio: Audio):
+        uses = self._uses.get(key, 0) + 1
+        self._uses[key] = uses
+        if uses == self.admit_uses and not isinstance(audio, mmap.mmap) and self.cache_dir is not None:
+            # recurring, worth sharing with every agent on the host
+            self.executor.submit(self._write, key, audio)
+
+    def _remember(self, key: str, audio: Audio):
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_size -= len(previous)
+        self._memory[key] = audio
+        self._memory_size += len(audio)
+        while self._memory_size > self.memory_bytes and len(self._memory) > 1:
+            evicted_key, evicted = self._memory.popitem(last=False)
+            self._memory_size -= len(evicted)
+            self._uses.pop(evicted_key, None)
+            # a mapping still referenced by queued audio stays open until it is played
+
+    def _maybe_rescan(self):
+        now = time.monotonic()
+        if self.cache_dir is None or now - self._indexed_at < DISK_INDEX_REFRESH_S:
+            return
+        # set here, so misses until the scan lands do not queue more of them
+        self._indexed_at = now
+        self.executor.submit(self._scan)
+
+    def _read(self, key: str) -> Optional[mmap.mmap]:
+        # only for keys known to be on disk; mapping reads nothing yet
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                audio = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            # recently used files are the last to be evicted
+            self.executor.submit(self._touch, path)
+            return audio
+        except (FileNotFoundError, ValueError):
+            # missing, or empty and so not mappable
+            return None
+        except OSError as e:
+            print(f"TTS cache read failed: {e}")
+            return None
+
+    def _touch(self, path: str):
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def _write(self, key: str, audio: bytes):
+        # on the executor
+        path = self._path(key)
+        if os.path.exists(path):
+            self._on_disk.add(key)
+            return
+        # other processes only ever see a complete file
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(audio)
+            os.replace(tmp_path, path)
+            self._on_disk.add(key)
+            self.disk_writes += 1
+        except OSError as e:
+            print(f"TTS cache write failed: {e}")
+            return
+        self._evict_disk()
+
+    def _scan(self) -> Optional[List[tuple]]:
+        # on the executor: (mtime, size, key) of every file, and a fresh index
+        entries = []
+        try:
+            with os.scandir(self.cache_dir) as it:
+                for entry in it:
+                    if entry.name.endswith(".pcm"):
+                        stat = entry.stat()
+                        entries.append((stat.st_mtime, stat.st_size, entry.name[: -len(".pcm")]))
+        except OSError as e:
+            # another process evicted a file under us, the next scan tries again
+            print(f"TTS cache scan failed: {e}")
+            return None
+        self._on_disk = {key for _, _, key in entries}
+        self._indexed_at = time.monotonic()
+        return entries
+
+    def _evict_disk(self):
+        entries = self._scan()
+        if entries is None:
+            return
+        total = sum(size for _, size, _ in entries)
+        if total <= self.disk_bytes:
+            return
+        for _, size, key in sorted(entries):
+            try:
+                # a process that has it mapped keeps reading it after the unlink
+                os.remove(self._path(key))
+            except OSError:
+                continue
+            self._on_disk.discard(key)
+            total -= size
+            if total <= self.disk_bytes:
+                return
+
+    def get_stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "bytes_saved": self.bytes_saved,
+            "memory_bytes": self._memory_size,
+            "disk_writes": self.disk_writes,
+        }
@@ -1,69 +1,601 @@
 import json
-import threading
 import asyncio
-from typing import Iterator, Union
-from websockets.sync.client import connect
+import itertools
+import time
+import traceback
+from asyncio import AbstractEventLoop, Task
+from collections import deque
+from typing import AsyncIterator, Callable, Deque, Dict, Iterator, List, Optional, Union
+from websockets.asyncio.client import ClientConnection, connect
+from websockets.protocol import State
+from tts.audio_cache import AudioCache
 from tts.tts import TTS
 from videosdk.stream import MediaStreamTrack
 
+# linear16 rates Aura can synthesize at
+SUPPORTED_SAMPLE_RATES = (8000, 16000, 24000, 32000, 48000)
+DEFAULT_SAMPLE_RATE = 24000
+DEFAULT_MODEL = "aura-stella-en"
+# speaking rate assumed for a chunk whose synthesized length is not known yet
+CHARS_PER_SECOND = 15
+# the active connection plus warm spares
+POOL_SIZE = 2
+# every pooled socket is pinged this often, which also keeps idle ones open
+HEALTH_CHECK_INTERVAL_S = 10
+PING_TIMEOUT_S = 5
+RECONNECT_BACKOFF_S = 0.25
+RECONNECT_BACKOFF_MAX_S = 8.0
+
+
+def spoken_prefix(text: str, fraction: float) -> str:
+    # words fully heard when playback stopped `fraction` of the way through text
+    if fraction >= 1:
+        return text
+    cut = text.rfind(" ", 0, int(len(text) * max(0.0, fraction)) + 1)
+    return text[:cut].rstrip() if cut > 0 else ""
+
+
+class SpeechChunk:
+    """One chunk of text sent for synthesis, or served from the audio cache."""
+
+    __slots__ = ("text", "utterance_id", "end", "flushed", "sent", "received", "skip", "cache_key", "audio", "captured")
+
+    def __init__(self, text: str, utterance_id: int, cache_key: Optional[str] = None, audio=None):
+        self.text = text
+        self.utterance_id = utterance_id
+        # track sample position its audio stops at, once known
+        self.end: Optional[int] = None
+        # set once all of its audio is in the track
+        self.flushed = False
+        self.sent = False
+        # bytes of its audio put in the track, and of a resynthesis to skip after a failover
+        self.received = 0
+        self.skip = 0
+        self.cache_key = cache_key
+        # audio served from the cache, played instead of sending the text
+        self.audio = audio
+        # synthesized audio collected for the cache
+        self.captured = bytearray() if cache_key is not None and audio is None else None
+
+
+class TTSConnectionPool:
+    """Aura sockets for one endpoint: the active one plus warm spares.
+
+    A maintenance task pings every socket each health_interval_s, which
+    also keeps idle ones open, and replaces any that fail or close. When
+    the active socket is lost, acquire() promotes a spare at once and a
+    replacement spare is opened in the background.
+    """
+
+    def __init__(
+        self,
+        loop: AbstractEventLoop,
+        url: str,
+        headers: Dict[str, str],
+        size: int = POOL_SIZE,
+        health_interval_s: float = HEALTH_CHECK_INTERVAL_S,
+        ping_timeout_s: float = PING_TIMEOUT_S,
+    ):
+        self.loop = loop
+        self.url = url
+        self.headers = headers
+        self.size = max(1, size)
+        self.health_interval_s = health_interval_s
+        self.ping_timeout_s = ping_timeout_s
+        self.active: Optional[ClientConnection] = None
+        self.spares: Deque[ClientConnection] = deque()
+        self._opening = 0
+        self._lost_at: Optional[float] = None
+        self._closed = False
+
+        self.connects = 0
+        self.connect_failures = 0
+        self.health_failures = 0
+        self.failovers = 0
+        self.connect_seconds: List[float] = []
+        # active socket lost -> next one serving
+        self.failover_seconds: List[float] = []
+
+        self._task: Task = loop.create_task(self._maintain())
+
+    async def _open(self) -> ClientConnection:
+        started_at = time.monotonic()
+        try:
+            socket = await connect(self.url, additional_headers=self.headers)
+        except Exception:
+            self.connect_failures += 1
+            raise
+        self.connects += 1
+        self.connect_seconds.append(time.monotonic() - started_at)
+        return socket
+
+    async def _fill(self):
+        while not self._closed and len(self.spares) + self._opening < self.size - 1:
+            self._opening += 1
+            try:
+                socket = await self._open()
+            except Exception as e:
+                print(f"Failed to open spare TTS connection: {e}")
+                return
+            finally:
+                self._opening -= 1
+            if self._closed:
+                await socket.close()
+                return
+            self.spares.append(socket)
+
+    async def acquire(self) -> ClientConnection:
+        """The socket to speak on, a warm spare if the active one was lost."""
+        if self.active is not None and self.active.state is State.OPEN:
+            return self.active
+        socket = None
+        while self.spares:
+            spare = self.spares.popleft()
+            if spare.state is State.OPEN:
+                socket = spare
+                break
+        if socket is None:
+            # no spare to take over, connect while the caller waits
+            socket = await self._open()
+        self.active = socket
+        if self._lost_at is not None:
+            self.failover_seconds.append(time.monotonic() - self._lost_at)
+            self._lost_at = None
+        self.loop.create_task(self._fill())
+        return socket
+
+    def lost(self, socket: ClientConnection):
+        # the active socket ended without close()
+        if socket is self.active:
+            self.active = None
+            self.failovers += 1
+            self._lost_at = time.monotonic()
+        self.loop.create_task(socket.close())
+
+    async def _healthy(self, socket: ClientConnection) -> bool:
+        if socket.state is not State.OPEN:
+            return False
+        try:
+            pong = await socket.ping()
+            await asyncio.wait_for(pong, self.ping_timeout_s)
+            return True
+        except Exception:
+            return False
+
+    async def _maintain(self):
+        try:
+            await self._fill()
+            while not self._closed:
+                await asyncio.sleep(self.health_interval_s)
+                for socket in [self.active, *self.spares]:
+                    if socket is None or await self._healthy(socket):
+                        continue
+                    self.health_failures += 1
+                    print("TTS connection failed its health check")
+                    if socket in self.spares:
+                        self.spares.remove(socket)
+                    # closing the active socket ends its receive loop, which fails over
+                    await socket.close()
+                await self._fill()
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            traceback.print_exc()
+            print("Error while maintaining TTS connections", e)
+
+    async def close(self):
+        self._closed = True
+        self._task.cancel()
+        sockets = [self.active, *self.spares]
+        self.active = None
+        self.spares.clear()
+        for socket in sockets:
+            if socket is not None:
+                await socket.close()
+
+    def get_stats(self) -> dict:
+        return {
+            "spares": len(self.spares),
+            "connects": self.connects,
+            "connect_failures": self.connect_failures,
+            "health_failures": self.health_failures,
+            "failovers": self.failovers,
+            "connect_seconds": list(self.connect_seconds),
+            "failover_seconds": list(self.failover_seconds),
+        }
+
 
 class DeepgramTTS(TTS):
-    def __init__(self, api_key: str, output_track: MediaStreamTrack):
-        base_url = f"wss://api.deepgram.com/v1/speak?encoding=linear16&sample_rate=24000&&model=aura-stella-en"
-        print(f"Connecting to {base_url}")
+    """Aura websocket client running on the agent's event loop.
+
+    Sockets come from a TTSConnectionPool and are served by a task on the
+    loop. generate() may be called from any thread: chunks hop onto the
+    loop and are queued for a sender task, and the receive loop writes
+    audio straight into the output track. When a socket is lost, chunks
+    still being synthesized are sent again on the next one.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        output_track: MediaStreamTrack,
+        loop: Optional[AbstractEventLoop] = None,
+        model: str = DEFAULT_MODEL,
+        cache: Optional[AudioCache] = None,
+        pool_size: int = POOL_SIZE,
+    ):
+        self.loop = loop or asyncio.get_event_loop()
+        # let the track choose the rate it can play out most cheaply
+        if hasattr(output_track, "negotiate_input_format"):
+            self.sample_rate = output_track.negotiate_input_format(SUPPORTED_SAMPLE_RATES, channels=1)
+        else:
+            self.sample_rate = DEFAULT_SAMPLE_RATE
+        self.model = model
+        self.base_url = f"wss://api.deepgram.com/v1/speak?encoding=linear16&sample_rate={self.sample_rate}&model={model}"
         self.output_track = output_track
         self.api_key = api_key
-        self._socket = None
-        self._exit = threading.Event()
+        self._socket: Optional[ClientConnection] = None
+        self._closed = False
+        self.pool = TTSConnectionPool(
+            loop=self.loop,
+            url=self.base_url,
+            headers={"Authorization": f"Token {self.api_key}"},
+            size=pool_size,
+        )
+
+        # chunks and control messages waiting for the sender task, in order
+        self._send_queue: asyncio.Queue = asyncio.Queue()
+
+        # every generate() is one utterance; cancel() drops all up to the latest begun
+        self._utterance_ids = itertools.count(1)
+        self._utterance_id = 0
+        self._cancelled_through = 0
+        # Clear messages whose Cleared has not come back, audio until then is stale
+        self._clearing = 0
+        self.clears = 0
+        self.wasted_bytes = 0
+
+        # chunks not yet known to be fully played, oldest first
+        self._chunks: List[SpeechChunk] = []
+        self._chunks_start = 0
+        self._samples_per_char = self.sample_rate / CHARS_PER_SECOND
+        self.interrupt_handler: Optional[Callable[[str, str], None]] = None
+        if hasattr(output_track, "add_interrupt_listener"):
+            output_track.add_interrupt_listener(self._on_interrupted)
+
+        # time to first byte: first Speak of an utterance sent -> first audio back
+        self._awaiting_first_byte = False
+        self._requested_at: Optional[float] = None
+        self.first_byte_latencies: List[float] = []
+        self.bytes_received = 0
+
+        # recurring phrases are played from here without a round trip
+        self.cache = cache
+
+        self._task: Task = self.loop.create_task(self._run())
 
+    def set_interrupt_handler(self, interrupt_handler: Callable[[str, str], None]):
+        # interrupt_handler(text, spoken) gets the chunk a barge-in cut short
+        # and the prefix of it the candidate actually heard
+        self.interrupt_handler = interrupt_handler
+
+    def _on_loop(self) -> bool:
+        try:
+            return asyncio.get_running_loop() is self.loop
+        except RuntimeError:
+            return False
+
+    async def _run(self):
+        print(f"Connecting to {self.base_url}")
+        backoff = RECONNECT_BACKOFF_S
+        try:
+            while not self._closed:
+                try:
+                    socket = await self.pool.acquire()
+                except Exception as e:
+                    print(f"Failed to connect to WebSocket: {e}")
+                    await asyncio.sleep(backoff)
+                    backoff = min(backoff * 2, RECONNECT_BACKOFF_MAX_S)
+                    continue
+                backoff = RECONNECT_BACKOFF_S
+                print("WebSocket connection established.")
+                await self._serve(socket)
+                if not self._closed:
+                    print("TTS connection lost, failing over")
+                    self.pool.lost(socket)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            await self.pool.close()
+
+    async def _serve(self, socket: ClientConnection):
+        self._socket = socket
+        # a Clear sent on a lost socket is never answered on this one
+        self._clearing = 0
+        sender = self.loop.create_task(self._send_loop(socket))
         try:
-            self._socket = connect(
-                base_url, additional_headers={"Authorization": f"Token {self.api_key}"}
-            )
-            print("WebSocket connection established.")
+            async for message in socket:
+                if isinstance(message, str):
+                    print(f"Received message: {message}")
+                    self._on_message(json.loads(message))
+                else:
+                    self._on_audio(message)
         except Exception as e:
-            print(f"Failed to connect to WebSocket: {e}")
+            print(f"receiver: {e}")
+        finally:
+            sender.cancel()
+            self._socket = None
+
+    async def _send_chunk(self, socket: ClientConnection, chunk: SpeechChunk):
+        if self._awaiting_first_byte and self._requested_at is None:
+            self._requested_at = time.monotonic()
+        chunk.sent = True
+        await socket.send(json.dumps({"type": "Speak", "text": chunk.text}))
+        # Flushed comes back once this chunk's audio is out, marking its end
+        await socket.send(json.dumps({"type": "Flush"}))
+
+    async def _send_loop(self, socket: ClientConnection):
+        try:
+            # chunks the lost socket did not finish, the audio already played is skipped
+            for chunk in [c for c in self._chunks if c.sent and not c.flushed]:
+                chunk.skip = chunk.received
+                await self._send_chunk(socket, chunk)
+            while True:
+                chunk = await self._send_queue.get()
+                if isinstance(chunk, dict):
+                    await socket.send(json.dumps(chunk))
+                else:
+                    await self._send_chunk(socket, chunk)
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            traceback.print_exc()
+            print("Error while sending to TTS Server", e)
+            # ends the receive loop, the next socket takes over
+            await socket.close()
+
+    def _on_audio(self, message: bytes):
+        self.bytes_received += len(message)
+        if self._clearing > 0:
+            # synthesized for a cancelled utterance before the server saw the Clear
+            self.wasted_bytes += len(message)
             return
+        if self._requested_at is not None:
+            self.first_byte_latencies.append(time.monotonic() - self._requested_at)
+            self._requested_at = None
+            self._awaiting_first_byte = False
+        # audio arrives in order, it belongs to the oldest chunk not flushed yet
+        chunk = next((c for c in self._chunks if not c.flushed), None)
+        if chunk is not None:
+            if chunk.skip:
+                # resynthesized after a failover, this part was already played
+                skipped = min(chunk.skip, len(message))
+                chunk.skip -= skipped
+                message = message[skipped:]
+                if not message:
+                    return
+            chunk.received += len(message)
+            if chunk.captured is not None:
+                chunk.captured += message
+        # on the loop, the track ingests it inline
+        self.output_track.add_new_bytes(iter([message]))
 
-        async def receiver():
-            try:
-                while True:
-                    if self._socket is None or self._exit.is_set():
-                        break
+    def _on_message(self, message: dict):
+        if message.get("type") == "Cleared":
+            self._clearing = max(0, self._clearing - 1)
+            return
+        if message.get("type") != "Flushed" or self._clearing > 0:
+            # a Flushed for a cancelled chunk
+            return
+        chunk = next((c for c in self._chunks if not c.flushed), None)
+        if chunk is None:
+            return
+        # all audio for this chunk has arrived
+        if chunk.captured is not None:
+            self.cache.put(chunk.cache_key, bytes(chunk.captured))
+            chunk.captured = None
+        self._mark_flushed(chunk)
+        # cached chunks queued behind it play now, in order
+        self._play_cached()
 
-                    message = self._socket.recv()
-                    if message is None:
-                        continue
+    def _mark_flushed(self, chunk: SpeechChunk):
+        # find where its audio ends on the track
+        chunk.flushed = True
+        if hasattr(self.output_track, "mark_position"):
+            self.output_track.mark_position(lambda position, chunk=chunk: self._set_chunk_end(chunk, position))
 
-                    if isinstance(message, str):
-                        print(f"Received message: {message}")
-                    elif isinstance(message, bytes):
-                        print(f"Received bytes: {len(message)} bytes")
-                        self.output_track.add_new_bytes(iter([message]))  # Send entire byte chunk
+    def _play_cached(self):
+        for chunk in self._chunks:
+            if chunk.flushed:
+                continue
+            if chunk.audio is None:
+                # still waiting on the server
+                return
+            self.output_track.add_new_bytes(iter([chunk.audio]))
+            chunk.audio = None
+            self._mark_flushed(chunk)
 
-            except Exception as e:
-                print(f"receiver: {e}")
+    def _set_chunk_end(self, chunk: SpeechChunk, position: int):
+        index = next((i for i, c in enumerate(self._chunks) if c is chunk), None)
+        if index is None:
+            return
+        start = self._chunks[index - 1].end if index > 0 else self._chunks_start
+        chunk.end = position
+        if start is not None and chunk.text and position > start:
+            self._samples_per_char = (position - start) / len(chunk.text)
+
+    def _prune_chunks(self):
+        played = getattr(self.output_track, "samples_played", 0)
+        while self._chunks and self._chunks[0].end is not None and self._chunks[0].end <= played:
+            self._chunks_start = self._chunks.pop(0).end
+
+    def _on_interrupted(self, position: int):
+        # the track still reports speaking here, it learns of the cut at its next frame;
+        # if nothing had started playing there is no answer to truncate
+        speaking = getattr(self.output_track, "speaking", None)
+        if speaking is None or speaking.is_set():
+            self._truncate_spoken(position)
 
-        self._receiver_thread = threading.Thread(target=asyncio.run, args=(receiver(),))
-        self._receiver_thread.start()
+        self._cancel_pending()
+        self._chunks = []
+        self._chunks_start = position
 
-    def generate(self, text: Union[str, Iterator[str]]):
-        if self._socket is None:
-            print("WebSocket is not connected.")
+    def _truncate_spoken(self, position: int):
+        # the track plays whole frames, audio within one of a chunk's end was heard
+        frame = max(getattr(self.output_track, "samples", 0), 1)
+        start = self._chunks_start
+        for chunk in self._chunks:
+            end = chunk.end
+            if end is not None and end - position < frame:
+                start = end
+                continue
+            # first chunk the candidate did not hear to the end
+            length = end - start if end is not None else len(chunk.text) * self._samples_per_char
+            spoken = spoken_prefix(chunk.text, (position - start) / length if length > 0 else 0.0)
+            print(f"Interrupted after: {spoken!r}")
+            if self.interrupt_handler is not None:
+                self.interrupt_handler(text=chunk.text, spoken=spoken)
             return
 
+    def _cancel_pending(self):
+        # chunks of every utterance begun so far, and any still to come for them, are dropped
+        self._cancelled_through = self._utterance_id
+        while not self._send_queue.empty():
+            self._send_queue.get_nowait()
+        if any(c.sent and not c.flushed for c in self._chunks):
+            # the server stops synthesizing and drops the text it still holds
+            self._send_queue.put_nowait({"type": "Clear"})
+            self._clearing += 1
+            self.clears += 1
+        # played audio is already in the track, only unplayed chunks go
+        self._chunks = [c for c in self._chunks if c.flushed]
+        self._awaiting_first_byte = False
+        self._requested_at = None
+
+    def cancel(self, utterance_id: Optional[int] = None):
+        """Stop synthesizing, all utterances or only if utterance_id is still pending.
+
+        Safe to call from any thread. Audio already in the output track is
+        left to the track, interrupt it to silence that as well.
+        """
+        if not self._on_loop():
+            self.loop.call_soon_threadsafe(self.cancel, utterance_id)
+            return
+        if utterance_id is not None and utterance_id <= self._cancelled_through:
+            return
+        if utterance_id is not None and not any(c.utterance_id == utterance_id and not c.flushed for c in self._chunks):
+            # already fully synthesized, a late cancel must not cut a newer answer
+            return
+        print(f"TTS cancelled through utterance {self._utterance_id}")
+        self._cancel_pending()
+
+    def _unavailable(self) -> bool:
+        # while the pool reconnects chunks queue up, they are only refused once closed
+        return self._closed
+
+    def _begin_utterance(self, utterance_id: int) -> bool:
+        if self._unavailable():
+            print("TTS is closed.")
+            return False
+        if utterance_id <= self._cancelled_through:
+            return False
+        self._utterance_id = utterance_id
+        # new speech after a barge-in, let the track accept audio again
+        if hasattr(self.output_track, "begin_utterance"):
+            self.output_track.begin_utterance()
+        self._prune_chunks()
+        self._awaiting_first_byte = True
+        self._requested_at = None
+        return True
+
+    def _speak(self, text: str, utterance_id: int):
+        if self._unavailable() or utterance_id <= self._cancelled_through:
+            return
+        cache_key = self.cache.key(text, model=self.model, sample_rate=self.sample_rate) if self.cache is not None else None
+        audio = self.cache.get(cache_key) if cache_key is not None else None
+        if audio is not None:
+            print(f"Cached: {text}")
+            self._chunks.append(SpeechChunk(text, utterance_id, cache_key=cache_key, audio=audio))
+            if self._requested_at is None:
+                # nothing sent for this utterance yet, there is no round trip to time
+                self._awaiting_first_byte = False
+            # plays right away unless audio for earlier chunks is still on its way
+            self._play_cached()
+            return
+        print(f"Sending: {text}")
+        chunk = SpeechChunk(text, utterance_id, cache_key=cache_key)
+        self._chunks.append(chunk)
+        self._send_queue.put_nowait(chunk)
+
+    def generate(self, text: Union[str, Iterator[str]]) -> Optional[int]:
+        """Queue speech as one utterance, returns its id for cancel().
+
+        Safe to call from any thread, it never waits for the socket. An
+        iterator is consumed on the calling thread and each chunk is handed
+        to the loop as it comes; chunks arriving after the utterance was
+        cancelled are dropped.
+        """
         if isinstance(text, str):
-            print(f"Sending: {text}")
-            self._socket.send(json.dumps({"type": "Speak", "text": text}))
+            chunks = iter([text])
         elif isinstance(text, Iterator):
-            for t in text:
-                print(f"Sending: {t}")
-                self._socket.send(json.dumps({"type": "Speak", "text": t}))
+            chunks = text
         else:
             print("Invalid input: text must be a str or an Iterator of str.")
+            return None
+
+        utterance_id = next(self._utterance_ids)
+        if self._on_loop():
+            if self._begin_utterance(utterance_id):
+                for t in chunks:
+                    self._speak(t, utterance_id)
+            return utterance_id
+        # call_soon_threadsafe keeps the order the chunks were generated in
+        self.loop.call_soon_threadsafe(self._begin_utterance, utterance_id)
+        for t in chunks:
+            if utterance_id <= self._cancelled_through:
+                break
+            self.loop.call_soon_threadsafe(self._speak, t, utterance_id)
+        return utterance_id
+
+    async def agenerate(self, text: AsyncIterator[str]) -> Optional[int]:
+        """Speak chunks as one utterance as they are produced, returns its id.
+
+        Runs on the TTS loop and returns once the iterator is exhausted.
+        Cancelling the awaiting task cancels the utterance as well.
+        """
+        utterance_id = next(self._utterance_ids)
+        try:
+            if not self._begin_utterance(utterance_id):
+                return None
+            async for t in text:
+                if utterance_id <= self._cancelled_through:
+                    break
+                self._speak(t, utterance_id)
+        except asyncio.CancelledError:
+            self.cancel(utterance_id)
+            raise
+        finally:
+            # a producer cut short closes whatever feeds it
+            if hasattr(text, "aclose"):
+                await text.aclose()
+        return utterance_id
+
+    def get_stats(self) -> dict:
+        latencies = self.first_byte_latencies
+        return {
+            "first_byte_latencies": list(latencies),
+            "mean_first_byte_latency": sum(latencies) / len(latencies) if latencies else 0.0,
+            "bytes_received": self.bytes_received,
+            "clears": self.clears,
+            "wasted_bytes": self.wasted_bytes,
+            "pool": self.pool.get_stats(),
+            "cache": self.cache.get_stats() if self.cache is not None else None,
+        }
 
     def close(self):
-        self._exit.set()
-        if self._socket:
-            self._socket.close()
-        self._receiver_thread.join()
\ No newline at end of file
+        # safe from any thread, the pool closes its sockets as the task unwinds
+        self._closed = True
+        if self._on_loop():
+            self._task.cancel()
+        else:
+            self.loop.call_soon_threadsafe(self._task.cancel)
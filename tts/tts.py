@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Iterator, Union
+from typing import AsyncIterator, Iterator, Union
 
 class TTS(ABC):
     @abstractmethod
@@ -12,4 +12,6 @@ class TTS(ABC):
         """Start the text-to-speech listening process."""
         pass
 
-
+    async def agenerate(self, text: AsyncIterator[str]):
+        """Speak chunks produced on the event loop, all at once by default."""
+        return self.generate(text=iter([chunk async for chunk in text]))